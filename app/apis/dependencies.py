@@ -1,39 +1,135 @@
 # app/api/dependencies.py
-from fastapi import Depends
+from typing import Optional, Tuple
+from fastapi import FastAPI, Request
+from app.core.cache import CacheBackend, build_cache
+from app.database.dataloader import DataLoader
 from app.database.dynamodb_connector import get_db_client
 from app.repositories.user import UserRepository
 from app.repositories.event import EventRepository
 from app.repositories.user_event import UserEventRepository
+from app.repositories.factory import create_repositories
+from app.repositories.email_job import EmailJobRepository
+from app.repositories.analytics import AnalyticsRepository
+from app.repositories.analytics_counters import AnalyticsCounterRepository
+from app.database.ndjson_segments import NdjsonSegmentWriter
+from app.database.write_buffer import WriteBuffer
+from app.core.config import settings
 from app.services.user import UserService
 from app.services.event import EventService
 from app.services.email import EmailService
+from app.services.email_jobs import EmailJobService
 from app.services.analytics import AnalyticsService
+from app.services.engagement import EngagementAnalyticsService
+from app.services.sendgrid_events import SendGridEventIngestor
+from app.services.export import ExportService
 
-def get_user_repository() -> UserRepository:
-    return UserRepository(get_db_client())
+def init_dependencies(app: FastAPI) -> None:
+    """
+    Builds the repositories and services once for the application lifetime and stores them on `app.state`.
+    Table existence is checked (and tables created) here, at startup, instead of on every request.
+    """
+    db_client = get_db_client()
+    cache = build_cache()
+    user_repo, event_repo, user_event_repo = create_repositories(db_client, cache)
+    email_job_repo = EmailJobRepository(db_client)
+    for repo in (user_repo, event_repo, user_event_repo, email_job_repo, event_repo.search_index):
+        repo.ensure_table()
 
-def get_event_repository() -> EventRepository:
-    return EventRepository(get_db_client())
+    counter_repo = AnalyticsCounterRepository(db_client)
+    counter_repo.ensure_table()
+    buffer, segment_writer = build_analytics_sink(db_client)
+    if settings.ANALYTICS_SINK == "ndjson":
+        # Segment files are not read back: the rollups are fed with this process' records.
+        engagement_service = EngagementAnalyticsService()
+        analytics_service = AnalyticsService(buffer, counter_repo, engagement_service.ingest, segment_writer)
+    else:
+        engagement_service = EngagementAnalyticsService(AnalyticsRepository(db_client))
+        analytics_service = AnalyticsService(buffer, counter_repo)
 
-def get_user_event_repository() -> UserEventRepository:
-    return UserEventRepository(get_db_client())
+    app.state.cache = cache
+    app.state.user_repository = user_repo
+    app.state.event_repository = event_repo
+    app.state.user_event_repository = user_event_repo
+    app.state.user_service = UserService(user_repo, user_event_repo)
+    app.state.event_service = EventService(event_repo, user_event_repo, user_repo)
+    app.state.export_service = ExportService(user_repo, event_repo, user_event_repo)
+    app.state.analytics_service = analytics_service
+    app.state.engagement_service = engagement_service
+    app.state.email_service = EmailService(analytics_service)
+    app.state.sendgrid_event_ingestor = SendGridEventIngestor(
+        analytics_service, settings.SENDGRID_WEBHOOK_BATCH_SIZE, settings.SENDGRID_WEBHOOK_DEDUP_WINDOW,
+        settings.SENDGRID_WEBHOOK_VERIFICATION_KEY, settings.SENDGRID_WEBHOOK_MAX_AGE,
+        settings.SENDGRID_WEBHOOK_MAX_BODY_BYTES
+    )
+    app.state.email_job_service = EmailJobService(email_job_repo, app.state.email_service, app.state.user_service)
 
-def get_user_service(
-    user_repo: UserRepository = Depends(get_user_repository),
-    user_event_repo: UserEventRepository = Depends(get_user_event_repository)
-) -> UserService:
-    return UserService(user_repo, user_event_repo)
+def build_analytics_sink(db_client) -> Tuple[WriteBuffer, Optional[NdjsonSegmentWriter]]:
+    """
+    The buffer analytics records are queued in, writing to the sink selected by ANALYTICS_SINK,
+    and the segment writer behind it (None with the table), to be closed after the buffer.
+    """
+    segment_writer = None
+    if settings.ANALYTICS_SINK == "ndjson":
+        segment_writer = NdjsonSegmentWriter(
+            settings.ANALYTICS_SEGMENT_DIR, "analytics",
+            settings.ANALYTICS_SEGMENT_MAX_BYTES, settings.ANALYTICS_SEGMENT_MAX_AGE
+        )
+        write = segment_writer.write
+    else:
+        analytics_repo = AnalyticsRepository(db_client)
+        analytics_repo.ensure_table()
+        write = analytics_repo.write_records
+    buffer = WriteBuffer(
+        write,
+        max_batch=settings.ANALYTICS_FLUSH_BATCH,
+        max_delay=settings.ANALYTICS_FLUSH_INTERVAL,
+        max_pending=settings.ANALYTICS_MAX_PENDING
+    )
+    return buffer, segment_writer
 
-def get_event_service(
-    event_repo: EventRepository = Depends(get_event_repository),
-    user_event_repo: UserEventRepository = Depends(get_user_event_repository) # Inject user_event_repo
-) -> EventService:
-    return EventService(event_repo, user_event_repo)
+class RequestLoaders:
+    """
+    Per-request DataLoaders: concurrent item lookups within one request are coalesced into BatchGetItem calls.
+    """
+    def __init__(self, user_repo: UserRepository, event_repo: EventRepository):
+        self.users = DataLoader(user_repo.batch_get_by_ids)
+        self.events = DataLoader(event_repo.batch_get_by_ids)
 
-def get_analytics_service() -> AnalyticsService:
-    return AnalyticsService()
+def get_loaders(request: Request) -> RequestLoaders:
+    return RequestLoaders(request.app.state.user_repository, request.app.state.event_repository)
 
-def get_email_service(analytics_service: AnalyticsService = Depends(get_analytics_service)) -> EmailService:
-    return EmailService(analytics_service)
+def get_cache(request: Request) -> CacheBackend:
+    return request.app.state.cache
 
+def get_user_repository(request: Request) -> UserRepository:
+    return request.app.state.user_repository
 
+def get_event_repository(request: Request) -> EventRepository:
+    return request.app.state.event_repository
+
+def get_user_event_repository(request: Request) -> UserEventRepository:
+    return request.app.state.user_event_repository
+
+def get_user_service(request: Request) -> UserService:
+    return request.app.state.user_service
+
+def get_event_service(request: Request) -> EventService:
+    return request.app.state.event_service
+
+def get_export_service(request: Request) -> ExportService:
+    return request.app.state.export_service
+
+def get_analytics_service(request: Request) -> AnalyticsService:
+    return request.app.state.analytics_service
+
+def get_engagement_service(request: Request) -> EngagementAnalyticsService:
+    return request.app.state.engagement_service
+
+def get_email_service(request: Request) -> EmailService:
+    return request.app.state.email_service
+
+def get_email_job_service(request: Request) -> EmailJobService:
+    return request.app.state.email_job_service
+
+def get_sendgrid_event_ingestor(request: Request) -> SendGridEventIngestor:
+    return request.app.state.sendgrid_event_ingestor
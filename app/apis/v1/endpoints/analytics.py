@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from app.services.analytics import AnalyticsService
+from app.services.engagement import DEFAULT_FUNNEL, EngagementAnalyticsService
+from app.apis.dependencies import get_analytics_service, get_engagement_service
+from app.apis.v1.schemas.analytics import EngagementCreate, FunnelResponse, FunnelBreakdownResponse
+
+router = APIRouter()
+
+def _utc(moment: Optional[datetime]) -> Optional[datetime]:
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def _range(start: Optional[datetime], end: Optional[datetime]):
+    """Naive UTC bounds, defaulting to the last 7 days."""
+    start, end = _utc(start), _utc(end)
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=7)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'start' must not be after 'end'.")
+    return start, end
+
+@router.post("/engagement", status_code=status.HTTP_202_ACCEPTED)
+async def track_engagement_endpoint(
+    engagement: EngagementCreate,
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
+):
+    """
+    Records one user engagement activity (queued and written in batches).
+    """
+    await analytics_service.track_user_engagement(**engagement.model_dump())
+    return {"status": "accepted"}
+
+@router.get("/funnel", response_model=FunnelResponse)
+async def engagement_funnel_endpoint(
+    steps: List[str] = Query(list(DEFAULT_FUNNEL), description="Activity types, in funnel order"),
+    start: Optional[datetime] = Query(None, description="UTC; defaults to 7 days before 'end'"),
+    end: Optional[datetime] = Query(None, description="UTC; defaults to now"),
+    event_id: Optional[str] = Query(None),
+    utm_campaign: Optional[str] = Query(None),
+    engagement_service: EngagementAnalyticsService = Depends(get_engagement_service)
+):
+    """
+    Activity counts and step-to-step conversion, at hour granularity, from the in-memory rollups.
+    """
+    start, end = _range(start, end)
+    return engagement_service.get_funnel(start, end, steps, event_id=event_id, utm_campaign=utm_campaign)
+
+@router.get("/funnel/breakdown", response_model=FunnelBreakdownResponse)
+async def engagement_funnel_breakdown_endpoint(
+    by: str = Query("event", pattern="^(event|utm_campaign)$"),
+    steps: List[str] = Query(list(DEFAULT_FUNNEL), description="Activity types, in funnel order"),
+    start: Optional[datetime] = Query(None, description="UTC; defaults to 7 days before 'end'"),
+    end: Optional[datetime] = Query(None, description="UTC; defaults to now"),
+    limit: int = Query(50, ge=1, le=1000),
+    engagement_service: EngagementAnalyticsService = Depends(get_engagement_service)
+):
+    """
+    The funnel of each event or UTM campaign, busiest first.
+    """
+    start, end = _range(start, end)
+    return engagement_service.get_funnel_breakdown(by, start, end, steps, limit=limit)
@@ -1,54 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.services.user import UserService
-from app.services.email import EmailService
-from app.apis.dependencies import get_user_service, get_email_service
-from app.apis.v1.schemas.email import SendEmailRequest, SendEmailResponse
-from app.models.user import User
-import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import Optional
+from app.services.analytics import AnalyticsService
+from app.services.email_jobs import EmailJobService
+from app.services.sendgrid_events import (
+    SIGNATURE_HEADER, TIMESTAMP_HEADER, SendGridEventIngestor, WebhookBodyTooLargeError, WebhookSignatureError
+)
+from app.apis.dependencies import get_analytics_service, get_email_job_service, get_sendgrid_event_ingestor
+from app.apis.v1.schemas.email import SendEmailRequest, EmailJobResponse, EmailDeliverySummaryResponse, WebhookIngestResponse
+from app.models.email_job import EmailJob
+from app.core.exceptions import BadRequestException
+from app.core.json_stream import JSONStreamError
 
 router = APIRouter()
 
-@router.post("/send-emails", response_model=SendEmailResponse, status_code=status.HTTP_200_OK)
+def _job_response(job: EmailJob) -> EmailJobResponse:
+    return EmailJobResponse(
+        job_id=job.id,
+        status=job.status,
+        subject=job.subject,
+        sent_count=job.sentCount,
+        failed_count=job.failedCount,
+        failed_recipients=job.failedRecipients,
+        error=job.error,
+        created_at=job.createdAt,
+        updated_at=job.updatedAt,
+        completed_at=job.completedAt
+    )
+
+@router.post("/send-emails", response_model=EmailJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def send_emails_endpoint(
     request: SendEmailRequest,
-    user_service: UserService = Depends(get_user_service),
-    email_service: EmailService = Depends(get_email_service)
+    email_job_service: EmailJobService = Depends(get_email_job_service)
 ):
-    users_to_email = []
-    if request.recipient_emails:
-        # Placeholder: In a real app, you might fetch user objects if templating requires more than just email
-        # For simplicity, if explicit emails are given, create dummy user objects for bulk sending
-        users_to_email = [
-            User(email=email, firstName=email.split('@')[0], lastName="", id=str(uuid.uuid4()), phoneNumber="")
-            for email in request.recipient_emails
-        ]
-    elif request.filters:
-        paginated_response = await user_service.filter_users(request.filters, page=1, page_size=10000)
-        users_to_email = paginated_response.items
-    else:
+    """
+    Queues the campaign as a background job and returns it right away; poll `GET /jobs/{job_id}` for progress.
+    """
+    if not request.recipient_emails and not request.filters:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Either 'recipient_emails' or 'filters' must be provided."
         )
+    try:
+        job = await email_job_service.submit(request)
+    except BadRequestException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return _job_response(job)
 
-    if not users_to_email:
-        return SendEmailResponse(
-            message="No users found to send emails to based on criteria.",
-            sent_count=0,
-            failed_count=0,
-            failed_recipients=[]
-        )
+@router.get("/jobs/{job_id}", response_model=EmailJobResponse)
+async def get_email_job_endpoint(
+    job_id: str,
+    email_job_service: EmailJobService = Depends(get_email_job_service)
+):
+    job = await email_job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Email job not found")
+    return _job_response(job)
 
-    result = await email_service.send_bulk_emails(
-        users=users_to_email,
-        subject=request.subject,
-        template_name=request.template_name,
-        template_data=request.template_data
-    )
+@router.get("/summary", response_model=EmailDeliverySummaryResponse)
+async def email_delivery_summary_endpoint(
+    campaign_id: Optional[str] = Query(None, description="Email job id"),
+    utm_campaign: Optional[str] = Query(None),
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
+):
+    """
+    Delivery counts, all-time and for the last 24 hours, from pre-aggregated counters.
+    """
+    return await analytics_service.get_email_delivery_summary(campaign_id=campaign_id, utm_campaign=utm_campaign)
 
-    return SendEmailResponse(
-        message="Email sending process initiated.",
-        sent_count=result["sent_count"],
-        failed_count=result["failed_count"],
-        failed_recipients=result["failed_recipients"]
-    )
\ No newline at end of file
+@router.post("/webhooks/sendgrid", response_model=WebhookIngestResponse)
+async def sendgrid_webhook_endpoint(
+    request: Request,
+    ingestor: SendGridEventIngestor = Depends(get_sendgrid_event_ingestor)
+):
+    """
+    SendGrid Event Webhook target. Once its signature is verified, the body is parsed incrementally
+    and the events are queued for analytics, so the request is acknowledged without waiting for
+    any database write.
+    """
+    try:
+        return await ingestor.ingest_signed(
+            request.stream(), request.headers.get(SIGNATURE_HEADER), request.headers.get(TIMESTAMP_HEADER),
+            request.headers.get("content-length")
+        )
+    except WebhookBodyTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except WebhookSignatureError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except JSONStreamError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Malformed event batch: {e}")
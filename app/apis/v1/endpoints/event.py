@@ -1,13 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from app.services.event import EventService
-from app.apis.dependencies import get_event_service
-from app.apis.v1.schemas.event import EventCreate, EventUpdate
+from app.services.export import ExportService, EXPORT_MEDIA_TYPES
+from app.apis.dependencies import get_event_service, get_export_service, get_loaders, RequestLoaders
+from app.apis.v1.schemas.event import (
+    EventCreate, EventUpdate, PaginatedEventsResponse, BulkRegistrationRequest, BulkRegistrationResponse,
+    RegistrationCreate, RegistrationResponse, EventDetailResponse, EventSearchResponse
+)
+from app.apis.v1.schemas.common import BulkCreateResponse
+from app.apis.v1.uploads import ensure_batch_size, import_upload
 from app.models.event import Event
-from app.core.exceptions import NotFoundException, BadRequestException
+from app.models.user import User
+from app.core.exceptions import NotFoundException, BadRequestException, ConflictException
 
 router = APIRouter()
 
+MAX_BATCH_ROWS = 1000
+UPLOAD_CHUNK_ROWS = 1000
+
 @router.post("/", response_model=Event, status_code=status.HTTP_201_CREATED)
 async def create_event_endpoint(
     event_create: EventCreate,
@@ -18,6 +30,100 @@ async def create_event_endpoint(
     except BadRequestException as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail)
 
+@router.post("/batch", response_model=BulkCreateResponse)
+async def bulk_create_events_endpoint(
+    rows: List[Dict[str, Any]] = Body(..., description="Up to 1000 rows in the single-create request format"),
+    event_service: EventService = Depends(get_event_service)
+):
+    ensure_batch_size(rows, MAX_BATCH_ROWS)
+    return await event_service.bulk_create_events(rows)
+
+@router.post("/batch/upload", response_model=BulkCreateResponse)
+async def upload_events_endpoint(
+    request: Request,
+    event_service: EventService = Depends(get_event_service)
+):
+    """
+    Imports an NDJSON body (or CSV with `Content-Type: text/csv`) of any size, streamed in chunks of 1000 rows.
+    """
+    return await import_upload(request, event_service.bulk_create_events, UPLOAD_CHUNK_ROWS)
+
+@router.post("/{event_id}/registrations", response_model=RegistrationResponse, status_code=status.HTTP_201_CREATED)
+async def register_endpoint(
+    event_id: str,
+    registration: RegistrationCreate,
+    event_service: EventService = Depends(get_event_service)
+):
+    try:
+        return await event_service.register(event_id, registration.user_id, registration.waitlist)
+    except (NotFoundException, ConflictException) as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+@router.delete("/{event_id}/registrations/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def unregister_endpoint(
+    event_id: str,
+    user_id: str,
+    event_service: EventService = Depends(get_event_service)
+):
+    if not await event_service.unregister(event_id, user_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Registration not found")
+    return
+
+@router.post("/{event_id}/registrations:batch", response_model=BulkRegistrationResponse)
+async def bulk_register_endpoint(
+    event_id: str,
+    registration: BulkRegistrationRequest,
+    event_service: EventService = Depends(get_event_service)
+):
+    ensure_batch_size(registration.user_ids, MAX_BATCH_ROWS)
+    result = await event_service.bulk_register(event_id, registration.user_ids)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+    return result
+
+@router.get("/search", response_model=EventSearchResponse)
+async def search_events_endpoint(
+    q: str = Query(..., min_length=1, max_length=200, description="Words of the title, venue or description; the last one may be partial"),
+    start_from: Optional[datetime] = Query(None, description="Only events starting at or after this time"),
+    start_to: Optional[datetime] = Query(None, description="Only events starting at or before this time"),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    event_service: EventService = Depends(get_event_service)
+):
+    """
+    Search-as-you-type over events, in start order, served from the event search index.
+    """
+    try:
+        return await event_service.search_events(q, start_from, start_to, page_size, cursor)
+    except BadRequestException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+@router.get("/export")
+async def export_events_endpoint(
+    export_format: str = Query("ndjson", alias="format", regex="^(ndjson|csv)$"),
+    export_service: ExportService = Depends(get_export_service)
+):
+    return StreamingResponse(
+        export_service.export_events(export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="events.{export_format}"'}
+    )
+
+@router.get("/{event_id}/attendees/export")
+async def export_event_attendees_endpoint(
+    event_id: str,
+    export_format: str = Query("ndjson", alias="format", regex="^(ndjson|csv)$"),
+    event_service: EventService = Depends(get_event_service),
+    export_service: ExportService = Depends(get_export_service)
+):
+    if not await event_service.get_event_by_id(event_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+    return StreamingResponse(
+        export_service.export_attendees(event_id, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="event-{event_id}-attendees.{export_format}"'}
+    )
+
 @router.get("/{event_id}", response_model=Event)
 async def get_event_endpoint(
     event_id: str,
@@ -28,6 +134,39 @@ async def get_event_endpoint(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
     return event
 
+@router.get("/{event_id}/detail", response_model=EventDetailResponse)
+async def get_event_detail_endpoint(
+    event_id: str,
+    event_service: EventService = Depends(get_event_service),
+    loaders: RequestLoaders = Depends(get_loaders)
+):
+    detail = await event_service.get_event_detail(event_id, loaders.users)
+    if detail is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+    return detail
+
+@router.get("/{event_id}/hosts", response_model=List[User])
+async def get_event_hosts_endpoint(
+    event_id: str,
+    event_service: EventService = Depends(get_event_service),
+    loaders: RequestLoaders = Depends(get_loaders)
+):
+    hosts = await event_service.get_event_hosts(event_id, loaders.users)
+    if hosts is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+    return hosts
+
+@router.get("/{event_id}/attendees", response_model=List[User])
+async def get_event_attendees_endpoint(
+    event_id: str,
+    event_service: EventService = Depends(get_event_service),
+    loaders: RequestLoaders = Depends(get_loaders)
+):
+    attendees = await event_service.get_event_attendees(event_id, loaders.users)
+    if attendees is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+    return attendees
+
 @router.put("/{event_id}", response_model=Event)
 async def update_event_endpoint(
     event_id: str,
@@ -48,8 +187,10 @@ async def delete_event_endpoint(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found or deletion failed")
     return
 
-@router.get("/", response_model=List[Event])
+@router.get("/", response_model=PaginatedEventsResponse)
 async def list_events_endpoint(
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
     event_service: EventService = Depends(get_event_service)
 ):
-    return await event_service.list_events()
\ No newline at end of file
+    return await event_service.list_events(page_size, cursor)
\ No newline at end of file
@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Depends
+from typing import Any, Dict
+from app.core.cache import CacheBackend
+from app.apis.dependencies import get_cache
+
+router = APIRouter()
+
+@router.get("/cache")
+async def cache_metrics_endpoint(cache: CacheBackend = Depends(get_cache)) -> Dict[str, Any]:
+    return cache.metrics()
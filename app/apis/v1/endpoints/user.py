@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from typing import Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
 from app.services.user import UserService
-from app.apis.dependencies import get_user_service
+from app.services.export import ExportService, EXPORT_MEDIA_TYPES
+from app.apis.dependencies import get_user_service, get_export_service, get_loaders, RequestLoaders
 from app.apis.v1.schemas.user import UserCreate, UserUpdate, UserFilter, PaginatedUsersResponse
+from app.apis.v1.schemas.common import BulkCreateResponse
+from app.apis.v1.uploads import ensure_batch_size, import_upload
 from app.models.user import User
+from app.models.event import Event
 from app.core.exceptions import NotFoundException, BadRequestException
 
 router = APIRouter()
 
+MAX_BATCH_ROWS = 1000
+UPLOAD_CHUNK_ROWS = 1000
+
 @router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
 async def create_user_endpoint(
     user_create: UserCreate,
@@ -18,6 +26,35 @@ async def create_user_endpoint(
     except BadRequestException as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail)
 
+@router.post("/batch", response_model=BulkCreateResponse)
+async def bulk_create_users_endpoint(
+    rows: List[Dict[str, Any]] = Body(..., description="Up to 1000 rows in the single-create request format"),
+    user_service: UserService = Depends(get_user_service)
+):
+    ensure_batch_size(rows, MAX_BATCH_ROWS)
+    return await user_service.bulk_create_users(rows)
+
+@router.post("/batch/upload", response_model=BulkCreateResponse)
+async def upload_users_endpoint(
+    request: Request,
+    user_service: UserService = Depends(get_user_service)
+):
+    """
+    Imports an NDJSON body (or CSV with `Content-Type: text/csv`) of any size, streamed in chunks of 1000 rows.
+    """
+    return await import_upload(request, user_service.bulk_create_users, UPLOAD_CHUNK_ROWS)
+
+@router.get("/export")
+async def export_users_endpoint(
+    export_format: str = Query("ndjson", alias="format", regex="^(ndjson|csv)$"),
+    export_service: ExportService = Depends(get_export_service)
+):
+    return StreamingResponse(
+        export_service.export_users(export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'}
+    )
+
 @router.get("/{user_id}", response_model=User)
 async def get_user_endpoint(
     user_id: str,
@@ -28,6 +65,18 @@ async def get_user_endpoint(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
 
+@router.get("/{user_id}/events", response_model=List[Event])
+async def get_user_events_endpoint(
+    user_id: str,
+    role: Optional[str] = Query(None, regex="^(host|participant|waitlisted)$"),
+    user_service: UserService = Depends(get_user_service),
+    loaders: RequestLoaders = Depends(get_loaders)
+):
+    events = await user_service.get_user_events(user_id, loaders.events, role)
+    if events is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return events
+
 @router.put("/{user_id}", response_model=User)
 async def update_user_endpoint(
     user_id: str,
@@ -63,6 +112,7 @@ async def filter_users_endpoint(
     page_size: int = Query(10, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
     sort_order: str = Query("asc", regex="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
     user_service: UserService = Depends(get_user_service)
 ):
     filters = UserFilter(
@@ -76,4 +126,12 @@ async def filter_users_endpoint(
         min_events_attended=min_events_attended,
         max_events_attended=max_events_attended
     )
-    return await user_service.filter_users(filters, page, page_size, sort_by, sort_order)
\ No newline at end of file
+    # Sorting and page numbers need the whole result set; everything else is served page by page with a cursor.
+    if sort_by or page > 1:
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="'cursor' cannot be combined with 'sort_by' or 'page'."
+            )
+        return await user_service.filter_users(filters, page, page_size, sort_by, sort_order)
+    return await user_service.list_users(filters, page_size, cursor)
\ No newline at end of file
@@ -0,0 +1,32 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+class EngagementCreate(BaseModel):
+    user_id: str
+    activity_type: str # e.g., "event_view", "registration_start", "event_attend"
+    event_id: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+    utm_source: Optional[str] = None
+    utm_medium: Optional[str] = None
+    utm_campaign: Optional[str] = None
+
+class FunnelStep(BaseModel):
+    activity_type: str
+    count: int
+    conversion_from_previous: Optional[float] = None # None for the first step or after a step with no activity
+    conversion_from_first: Optional[float] = None
+
+class FunnelResponse(BaseModel):
+    start: str # first hour included (UTC)
+    end: str # first hour no longer included
+    steps: List[FunnelStep]
+
+class FunnelBreakdownItem(BaseModel):
+    key: str # event id or UTM campaign
+    steps: List[FunnelStep]
+
+class FunnelBreakdownResponse(BaseModel):
+    by: str
+    start: str
+    end: str
+    items: List[FunnelBreakdownItem]
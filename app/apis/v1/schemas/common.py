@@ -0,0 +1,13 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+class BulkItemResult(BaseModel):
+    index: int # position of the row in the request body / upload
+    status: str # "created", "duplicate" (repeated in this batch), "exists", "invalid" or "failed"
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkCreateResponse(BaseModel):
+    created_count: int
+    failed_count: int
+    results: List[BulkItemResult]
@@ -9,8 +9,26 @@ class SendEmailRequest(BaseModel):
     filters: Optional[UserFilter] = None
     recipient_emails: Optional[List[str]] = None
 
-class SendEmailResponse(BaseModel):
-    message: str
+class EmailDeliverySummaryResponse(BaseModel):
+    total_emails_attempted: int
+    total_emails_sent: int
+    total_emails_failed: int
+    last_24_hours: Dict[str, int] # count per status (sent, failed, delivered, ...)
+
+class WebhookIngestResponse(BaseModel):
+    received: int
+    recorded: int
+    duplicates: int # already received (SendGrid delivers events at least once)
+    ignored: int # not an event object
+
+class EmailJobResponse(BaseModel):
+    job_id: str
+    status: str # queued, running, completed or failed
+    subject: str
     sent_count: int
     failed_count: int
-    failed_recipients: List[str]
\ No newline at end of file
+    failed_recipients: List[str] # capped at EMAIL_JOB_MAX_REPORTED_FAILURES
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+    completed_at: Optional[str] = None
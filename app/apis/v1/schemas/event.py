@@ -2,6 +2,7 @@ from typing import Optional, List
 from pydantic import BaseModel, Field
 from datetime import datetime
 from app.models.event import Event
+from app.models.user import User
 
 class EventCreate(BaseModel):
     slug: str
@@ -27,6 +28,37 @@ class EventUpdate(BaseModel):
 
 class PaginatedEventsResponse(BaseModel):
     items: List[Event]
-    total_count: int
-    page: int
-    page_size: int
\ No newline at end of file
+    page_size: int
+    next_cursor: Optional[str] = None
+
+class EventSearchResponse(BaseModel):
+    items: List[Event] # in start order
+    page_size: int
+    next_cursor: Optional[str] = None
+
+class EventDetailResponse(BaseModel):
+    event: Event
+    hosts: List[User] = []
+    attendees: List[User] = []
+    waitlisted: List[User] = []
+
+class RegistrationCreate(BaseModel):
+    user_id: str
+    waitlist: bool = False # join the waitlist instead of failing when the event is full
+
+class RegistrationResponse(BaseModel):
+    userId: str
+    eventId: str
+    role: str # "participant" or "waitlisted"
+    createdAt: Optional[str] = None
+
+class BulkRegistrationRequest(BaseModel):
+    user_ids: List[str] = Field(..., min_length=1)
+
+class BulkRegistrationResponse(BaseModel):
+    registered: List[str] = []
+    already_registered: List[str] = []
+    not_found: List[str] = []
+    rejected_full: List[str] = [] # valid users turned away because the event reached maxCapacity
+    failed: List[str] = [] # writes DynamoDB did not process; safe to retry
+    registered_count: int = 0 # event's registeredCount after this batch
@@ -39,6 +39,7 @@ class UserFilter(BaseModel):
 
 class PaginatedUsersResponse(BaseModel):
     items: List[User]
-    total_count: int
-    page: int
-    page_size: int
\ No newline at end of file
+    total_count: Optional[int] = None # only known for page-number (sorted) listings
+    page: Optional[int] = None
+    page_size: int
+    next_cursor: Optional[str] = None
\ No newline at end of file
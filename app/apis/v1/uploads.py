@@ -0,0 +1,90 @@
+# app/apis/v1/uploads.py
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Set, TypeVar
+from fastapi import Request
+from app.core.exceptions import BadRequestException
+from app.apis.v1.schemas.common import BulkCreateResponse
+
+T = TypeVar("T")
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    remainder = ""
+    async for chunk in request.stream():
+        text = remainder + decoder.decode(chunk)
+        lines = text.split("\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    remainder += decoder.decode(b"", final=True)
+    if remainder:
+        yield remainder.rstrip("\r")
+
+async def iter_upload_rows(request: Request) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parses an NDJSON (default) or CSV (`Content-Type: text/csv`, header row first) request body
+    incrementally, yielding one dict per row without buffering the whole upload.
+    CSV rows must not contain embedded newlines; empty CSV cells become None.
+    Rows that cannot be parsed are yielded as {"__error__": message} so they keep their index.
+    """
+    lines = _iter_lines(request)
+    if request.headers.get("content-type", "").startswith("text/csv"):
+        header = None
+        async for line in lines:
+            if not line.strip():
+                continue
+            values = next(csv.reader([line]))
+            if header is None:
+                header = values
+                continue
+            yield {name: (value if value != "" else None) for name, value in zip(header, values)}
+        return
+
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"__error__": f"Invalid JSON: {e}"}
+            continue
+        yield row if isinstance(row, dict) else {"__error__": "Each NDJSON line must be a JSON object."}
+
+async def chunked(rows: AsyncIterator[T], size: int) -> AsyncIterator[List[T]]:
+    chunk: List[T] = []
+    async for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def ensure_batch_size(rows: List[Any], limit: int) -> None:
+    if not rows:
+        raise BadRequestException(detail="The batch is empty.")
+    if len(rows) > limit:
+        raise BadRequestException(detail=f"At most {limit} rows per batch; use the upload endpoint for larger imports.")
+
+async def import_upload(
+    request: Request,
+    import_chunk: Callable[[List[Dict[str, Any]], int, Set[str]], Awaitable[BulkCreateResponse]],
+    chunk_size: int
+) -> BulkCreateResponse:
+    """
+    Feeds an NDJSON/CSV upload to `import_chunk` `chunk_size` rows at a time and merges the per-row results.
+    """
+    seen_keys: Set[str] = set()
+    merged = BulkCreateResponse(created_count=0, failed_count=0, results=[])
+    start_index = 0
+    async for rows in chunked(iter_upload_rows(request), chunk_size):
+        response = await import_chunk(rows, start_index, seen_keys)
+        merged.created_count += response.created_count
+        merged.failed_count += response.failed_count
+        merged.results.extend(response.results)
+        start_index += len(rows)
+    if start_index == 0:
+        raise BadRequestException(detail="The upload contains no rows.")
+    return merged
@@ -0,0 +1,62 @@
+# app/commands/backfill_event_counts.py
+"""
+Recomputes the denormalized `hostedCount` / `attendedCount` attributes on every user, and
+`registeredCount` on every event, from the UserEvents table. Run it once after deploying the counters, and again whenever
+they are suspected to have drifted:
+
+    python -m app.commands.backfill_event_counts
+"""
+import asyncio
+from typing import Dict, Any
+from app.database.dynamodb_connector import get_db_client
+from app.repositories.user import UserRepository
+from app.repositories.event import EventRepository
+from app.repositories.user_event import UserEventRepository, ROLE_COUNTERS
+from app.repositories.factory import create_repositories
+
+
+async def backfill_event_counts(
+    user_repo: UserRepository,
+    user_event_repo: UserEventRepository,
+    event_repo: EventRepository
+) -> Dict[str, int]:
+    role_counts, event_role_counts = await user_event_repo.aggregate_role_counts()
+
+    summary = {"checked": 0, "updated": 0, "conflicts": 0}
+    for user_data in await user_repo.find_by_attributes({}):
+        summary["checked"] += 1
+        counts = role_counts.get(user_data['id'], {})
+        hosted_count = counts.get('host', 0)
+        attended_count = counts.get('participant', 0)
+        expected: Dict[str, Any] = {counter: user_data.get(counter) for counter in ROLE_COUNTERS.values()}
+        if expected == {'hostedCount': hosted_count, 'attendedCount': attended_count}:
+            continue
+
+        if await user_repo.set_event_counts(user_data['id'], hosted_count, attended_count, expected):
+            summary["updated"] += 1
+        else:
+            # The user registered or was deleted while we were counting; re-run to pick it up.
+            summary["conflicts"] += 1
+
+    async for event_data in event_repo.scan_all(projection=['id', 'registeredCount']):
+        summary["checked"] += 1
+        registered_count = event_role_counts.get(event_data['id'], {}).get('participant', 0)
+        expected = event_data.get('registeredCount')
+        if expected == registered_count:
+            continue
+        if await event_repo.set_registered_count(event_data['id'], registered_count, expected):
+            summary["updated"] += 1
+        else:
+            summary["conflicts"] += 1
+    return summary
+
+
+async def main():
+    db_client = get_db_client()
+    user_repo, event_repo, user_event_repo = create_repositories(db_client)
+    summary = await backfill_event_counts(user_repo, user_event_repo, event_repo)
+    print(f"Event count backfill finished: {summary}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
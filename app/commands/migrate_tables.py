@@ -0,0 +1,212 @@
+# app/commands/migrate_tables.py
+"""
+Brings the DynamoDB tables in line with the schema registry (app/database/tables.py):
+creates missing tables and GSIs, switches billing mode, adjusts provisioned capacity and
+enables declared TTL attributes.
+GSIs whose keys or projection changed can only be rebuilt (deleted, then created and
+backfilled by DynamoDB), which makes them unavailable for a while, so that only happens
+with --recreate-indexes. GSIs that are no longer declared are only deleted with --drop-indexes.
+
+    python -m app.commands.migrate_tables [--dry-run] [--recreate-indexes] [--drop-indexes]
+"""
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+from botocore.exceptions import ClientError
+from app.database.dynamodb_connector import get_db_client
+from app.database.schema import PROVISIONED, IndexSchema, TableSchema
+from app.database.tables import active_tables
+
+
+@dataclass
+class MigrationStep:
+    table_name: str
+    description: str
+    operation: Optional[str] = None # 'create_table' / 'update_table'; None for a change that is only reported
+    params: Optional[Dict[str, Any]] = None
+
+
+def plan_migration(
+    schema: TableSchema,
+    description: Optional[Dict[str, Any]],
+    recreate_indexes: bool = False,
+    drop_indexes: bool = False
+) -> List[MigrationStep]:
+    """
+    Diffs the declared schema against a DescribeTable result (None if the table does not exist)
+    and returns the steps to apply, in order. DynamoDB allows one GSI creation or deletion per
+    UpdateTable call, so each of those is a separate step.
+    """
+    name = schema.table_name
+    if description is None:
+        return [MigrationStep(name, "create table", 'create_table', schema.create_table_params())]
+
+    steps: List[MigrationStep] = []
+    existing = {gsi['IndexName']: gsi for gsi in description.get('GlobalSecondaryIndexes', [])}
+    declared_mode = schema.effective_billing_mode
+    current_mode = description.get('BillingModeSummary', {}).get('BillingMode', PROVISIONED)
+
+    if declared_mode != current_mode:
+        params: Dict[str, Any] = {'TableName': name, 'BillingMode': declared_mode}
+        if declared_mode == PROVISIONED:
+            params['ProvisionedThroughput'] = schema.throughput()
+            if existing:
+                params['GlobalSecondaryIndexUpdates'] = [
+                    {'Update': {'IndexName': index_name, 'ProvisionedThroughput': schema.throughput()}}
+                    for index_name in existing
+                ]
+        steps.append(MigrationStep(name, f"switch billing mode {current_mode} -> {declared_mode}", 'update_table', params))
+    elif declared_mode == PROVISIONED:
+        if not _same_throughput(description.get('ProvisionedThroughput'), schema.throughput()):
+            steps.append(MigrationStep(name, f"set table capacity to {schema.throughput()}", 'update_table',
+                                       {'TableName': name, 'ProvisionedThroughput': schema.throughput()}))
+        updates = [
+            {'Update': {'IndexName': index_name, 'ProvisionedThroughput': schema.throughput()}}
+            for index_name, gsi in existing.items()
+            if not _same_throughput(gsi.get('ProvisionedThroughput'), schema.throughput())
+        ]
+        if updates:
+            steps.append(MigrationStep(name, f"set capacity of {len(updates)} index(es) to {schema.throughput()}",
+                                       'update_table', {'TableName': name, 'GlobalSecondaryIndexUpdates': updates}))
+
+    for index in schema.indexes:
+        current = existing.get(index.name)
+        if current is None:
+            steps.append(_create_index_step(schema, index))
+        elif not _same_index(current, index):
+            if recreate_indexes:
+                steps.append(_delete_index_step(name, index.name, "rebuild"))
+                steps.append(_create_index_step(schema, index))
+            else:
+                steps.append(MigrationStep(name, f"index {index.name} differs from its declaration "
+                                                 f"(re-run with --recreate-indexes to rebuild it)"))
+
+    for index_name in existing:
+        if not any(index.name == index_name for index in schema.indexes):
+            if drop_indexes:
+                steps.append(_delete_index_step(name, index_name, "undeclared"))
+            else:
+                steps.append(MigrationStep(name, f"index {index_name} is not declared "
+                                                 f"(re-run with --drop-indexes to delete it)"))
+    return steps
+
+
+def plan_time_to_live(schema: TableSchema, description: Optional[Dict[str, Any]]) -> List[MigrationStep]:
+    """
+    Diffs the declared TTL attribute against a DescribeTimeToLive result (None if the table
+    does not exist yet).
+    """
+    if not schema.ttl_attribute:
+        return []
+    description = description or {}
+    if description.get('TimeToLiveStatus') in ('ENABLED', 'ENABLING') and description.get('AttributeName') == schema.ttl_attribute:
+        return []
+    return [MigrationStep(schema.table_name, f"enable TTL on {schema.ttl_attribute}", 'update_time_to_live', {
+        'TableName': schema.table_name,
+        'TimeToLiveSpecification': schema.time_to_live_spec()
+    })]
+
+
+def _create_index_step(schema: TableSchema, index: IndexSchema) -> MigrationStep:
+    return MigrationStep(schema.table_name, f"create index {index.name} ({index.projection})", 'update_table', {
+        'TableName': schema.table_name,
+        'AttributeDefinitions': schema.attribute_definitions(),
+        'GlobalSecondaryIndexUpdates': [{'Create': schema.index_definition(index)}]
+    })
+
+
+def _delete_index_step(table_name: str, index_name: str, reason: str) -> MigrationStep:
+    return MigrationStep(table_name, f"delete index {index_name} ({reason})", 'update_table', {
+        'TableName': table_name,
+        'GlobalSecondaryIndexUpdates': [{'Delete': {'IndexName': index_name}}]
+    })
+
+
+def _same_throughput(current: Optional[Dict[str, Any]], declared: Dict[str, int]) -> bool:
+    current = current or {}
+    return all(current.get(unit) == value for unit, value in declared.items())
+
+
+def _same_index(current: Dict[str, Any], index: IndexSchema) -> bool:
+    projection = current.get('Projection', {})
+    return (
+        current.get('KeySchema') == index.key_schema()
+        and projection.get('ProjectionType') == index.projection
+        and sorted(projection.get('NonKeyAttributes', [])) == sorted(index.non_key_attributes)
+    )
+
+
+def describe(client: Any, table_name: str) -> Optional[Dict[str, Any]]:
+    try:
+        return client.describe_table(TableName=table_name)['Table']
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceNotFoundException':
+            return None
+        raise e
+
+
+def describe_time_to_live(client: Any, table_name: str) -> Optional[Dict[str, Any]]:
+    try:
+        return client.describe_time_to_live(TableName=table_name)['TimeToLiveDescription']
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceNotFoundException':
+            return None
+        raise e
+
+
+def wait_until_active(client: Any, table_name: str, poll_interval: float) -> None:
+    # UpdateTable is rejected while the table or one of its indexes is still changing.
+    while True:
+        table = describe(client, table_name)
+        if table and table['TableStatus'] == 'ACTIVE' and all(
+            gsi.get('IndexStatus') == 'ACTIVE' for gsi in table.get('GlobalSecondaryIndexes', [])
+        ):
+            return
+        time.sleep(poll_interval)
+
+
+def migrate(
+    client: Any,
+    schemas: Optional[Sequence[TableSchema]] = None,
+    dry_run: bool = False,
+    recreate_indexes: bool = False,
+    drop_indexes: bool = False,
+    poll_interval: float = 5.0
+) -> List[MigrationStep]:
+    """
+    Plans and (unless `dry_run`) applies the migration of every table of the configured layout
+    (or of `schemas`), one step at a time, waiting for the table to settle between steps.
+    `client` is a low-level DynamoDB client.
+    """
+    all_steps = []
+    for schema in schemas or active_tables():
+        description = describe(client, schema.table_name)
+        steps = plan_migration(schema, description, recreate_indexes, drop_indexes)
+        ttl_description = describe_time_to_live(client, schema.table_name) if description else None
+        steps.extend(plan_time_to_live(schema, ttl_description))
+        for step in steps:
+            applied = step.operation is not None and not dry_run
+            print(f"[{step.table_name}] {'' if applied else '(not applied) '}{step.description}")
+            if applied:
+                getattr(client, step.operation)(**step.params)
+                wait_until_active(client, step.table_name, poll_interval)
+        all_steps.extend(steps)
+    return all_steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the declared DynamoDB schema (app/database/tables.py).")
+    parser.add_argument("--dry-run", action="store_true", help="only print the planned changes")
+    parser.add_argument("--recreate-indexes", action="store_true", help="rebuild GSIs whose keys or projection changed")
+    parser.add_argument("--drop-indexes", action="store_true", help="delete GSIs that are no longer declared")
+    args = parser.parse_args()
+
+    steps = migrate(get_db_client().meta.client, dry_run=args.dry_run,
+                    recreate_indexes=args.recreate_indexes, drop_indexes=args.drop_indexes)
+    if not steps:
+        print("All tables match their declared schema.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# app/commands/migrate_to_single_table.py
+"""
+Copies users, events and registrations from the three-table layout into the single table
+(see app/repositories/single_table.py). The source tables are only read, never modified, and
+re-running the copy is safe (items are overwritten with the same content). Stop writes (or
+re-run the copy) before switching DYNAMODB_LAYOUT to single_table:
+
+    python -m app.commands.migrate_to_single_table
+"""
+import asyncio
+from typing import Dict, List
+from app.database.base_repository import BaseRepository
+from app.database.dynamodb_connector import get_db_client
+from app.repositories.factory import create_repositories
+
+# Items buffered before each batch_put (which itself sends BatchWriteItem requests of 25).
+COPY_CHUNK_ITEMS = 500
+
+
+async def copy_items(source: BaseRepository, target: BaseRepository) -> Dict[str, int]:
+    counts = {"copied": 0, "failed": 0}
+    chunk: List[dict] = []
+
+    async def flush():
+        failed = await target.batch_put([target._to_storage(item) for item in chunk])
+        counts["copied"] += len(chunk) - len(failed)
+        counts["failed"] += len(failed)
+        chunk.clear()
+
+    async for item in source.scan_all():
+        chunk.append(item)
+        if len(chunk) >= COPY_CHUNK_ITEMS:
+            await flush()
+    if chunk:
+        await flush()
+    return counts
+
+
+async def migrate_to_single_table(db_client) -> Dict[str, Dict[str, int]]:
+    sources = create_repositories(db_client, layout="multi_table")
+    targets = create_repositories(db_client, layout="single_table")
+    targets[0].ensure_table()
+
+    summary = {}
+    for name, source, target in zip(("users", "events", "registrations"), sources, targets):
+        summary[name] = await copy_items(source, target)
+    return summary
+
+
+async def main():
+    summary = await migrate_to_single_table(get_db_client())
+    print(f"Single-table migration finished: {summary}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
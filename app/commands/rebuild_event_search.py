@@ -0,0 +1,45 @@
+# app/commands/rebuild_event_search.py
+"""
+Writes the search postings of every event. Run it once after deploying event search (events
+created before it have none), and again if postings were reported as not written:
+
+    python -m app.commands.rebuild_event_search
+
+Postings are idempotent puts, so re-running is safe. Leftover postings of deleted or edited
+events are harmless: searches re-check every candidate against the event.
+"""
+import asyncio
+from typing import Dict
+from app.database.dynamodb_connector import get_db_client
+from app.repositories.event import EventRepository, SEARCH_FIELDS
+from app.repositories.factory import create_repositories
+
+# Events whose postings are written together.
+REBUILD_BATCH_SIZE = 100
+
+
+async def rebuild_event_search(event_repo: EventRepository) -> Dict[str, int]:
+    summary = {"events": 0, "failed_postings": 0}
+    batch = []
+    async for event_data in event_repo.scan_all(projection=['id', *SEARCH_FIELDS]):
+        batch.append(event_data)
+        if len(batch) == REBUILD_BATCH_SIZE:
+            summary["failed_postings"] += await event_repo.search_index.index(batch)
+            summary["events"] += len(batch)
+            batch = []
+    if batch:
+        summary["failed_postings"] += await event_repo.search_index.index(batch)
+        summary["events"] += len(batch)
+    return summary
+
+
+async def main():
+    db_client = get_db_client()
+    _, event_repo, _ = create_repositories(db_client)
+    event_repo.search_index.ensure_table()
+    summary = await rebuild_event_search(event_repo)
+    print(f"Event search rebuild finished: {summary}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
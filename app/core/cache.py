@@ -0,0 +1,121 @@
+# app/core/cache.py
+import pickle
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.core.config import settings
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    negative_hits: int = 0 # hits on a cached "not found"
+    evictions: int = 0 # entries dropped to stay under the size limit
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class CacheBackend(ABC):
+    """
+    Minimal async key/value cache with per-entry TTL.
+    `get` returns None on a miss, so callers must wrap values that can legitimately be None.
+    """
+    def __init__(self):
+        self.stats = CacheStats()
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    def size(self) -> Optional[int]:
+        return None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "size": self.size(), **asdict(self.stats)}
+
+
+class LRUCache(CacheBackend):
+    """
+    In-process LRU cache with TTL. Also the local stand-in for a shared cache in development and tests.
+    """
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self.stats.invalidations += 1
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+    """
+    Shared cache for multi-worker deployments. Requires the optional `redis` package.
+    Values are pickled, so only point it at a Redis instance this application owns.
+    """
+    def __init__(self, url: str):
+        super().__init__()
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis).")
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._client.get(key)
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return pickle.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._client.set(key, pickle.dumps(value), px=max(int(ttl * 1000), 1))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            self.stats.invalidations += await self._client.delete(*keys)
+
+
+def build_cache() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(settings.CACHE_REDIS_URL)
+    return LRUCache(settings.CACHE_MAX_ENTRIES)
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict
 import os
 
 class Settings(BaseSettings):
@@ -9,9 +10,61 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str
     AWS_REGION_NAME: str = "ap-southeast-1"
     DYNAMODB_TABLE_PREFIX: str = "EventCRM"
+    DYNAMODB_MAX_WORKERS: int = 32 # threads (and pooled connections) available for concurrent DynamoDB calls
+    DYNAMODB_SCAN_SEGMENTS: int = 8 # segments used by full-table parallel scans
+    DYNAMODB_LAYOUT: str = "multi_table" # or "single_table": users, events and registrations in one table (app/repositories/single_table.py)
+    DYNAMODB_BILLING_MODE: str = "PROVISIONED" # or "PAY_PER_REQUEST" (on-demand); per-table overrides in app/database/tables.py
+    DYNAMODB_READ_CAPACITY: int = 5 # provisioned RCU/WCU of each table and GSI
+    DYNAMODB_WRITE_CAPACITY: int = 5
+    DYNAMODB_RETRY_MODE: str = "adaptive" # botocore retry mode: "adaptive" also rate-limits the client after throttles
+    DYNAMODB_MAX_ATTEMPTS: int = 8 # total attempts per call, including the first, with jittered exponential backoff
+    DYNAMODB_CONNECT_TIMEOUT: float = 2
+    DYNAMODB_READ_TIMEOUT: float = 5
+    DYNAMODB_READ_RATE_LIMIT: float = 0 # read requests/second per process, 0 = unlimited
+    DYNAMODB_WRITE_RATE_LIMIT: float = 0 # write requests/second per process, 0 = unlimited
+    DYNAMODB_RATE_LIMIT_MAX_WAIT: float = 5 # longest a request queues for a token before failing with 503
+    DYNAMODB_THROTTLE_RETRY_AFTER: int = 1 # Retry-After (seconds) sent when DynamoDB itself throttles
+
+    CACHE_BACKEND: str = "memory" # "memory" (per-process LRU) or "redis" (shared)
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_TTL_SECONDS: float = 60
+    CACHE_NEGATIVE_TTL_SECONDS: float = 10 # how long a 404 is remembered
+
+    ANALYTICS_SINK: str = "dynamodb" # or "ndjson": rolling local segment files instead of the AnalyticsEvents table
+    ANALYTICS_SEGMENT_DIR: str = "analytics"
+    ANALYTICS_SEGMENT_MAX_BYTES: int = 64 * 1024 * 1024
+    ANALYTICS_SEGMENT_MAX_AGE: float = 3600 # seconds before a new segment is started
+    ANALYTICS_FLUSH_BATCH: int = 500 # records per flush; a full batch is written right away
+    ANALYTICS_FLUSH_INTERVAL: float = 2 # seconds a record waits at most before being written
+    ANALYTICS_MAX_PENDING: int = 50000 # queued records before recording waits for a flush
+    ANALYTICS_COUNTER_FLUSH_INTERVAL: float = 5 # seconds between counter writes (how stale summaries may be)
+    ANALYTICS_ROLLUP_WINDOW_HOURS: int = 168 # engagement history kept in the in-memory rollups
+    ANALYTICS_ROLLUP_REFRESH_INTERVAL: float = 30 # seconds between reads of new engagement records
+    ANALYTICS_ROLLUP_LAG: float = 15 # seconds a record must have been stored before it is read into the rollups
+    ANALYTICS_ROLLUP_MAX_KEYS: int = 100000 # events, and UTM campaigns, given their own rollup
+
+    PAGINATION_TOKEN_SECRET: str = "" # HMAC key for pagination cursors; falls back to AWS_SECRET_ACCESS_KEY
 
     SENDGRID_API_KEY: str
+    SENDGRID_WEBHOOK_BATCH_SIZE: int = 500 # webhook events handed to analytics at a time
+    SENDGRID_WEBHOOK_DEDUP_WINDOW: int = 500000 # recent sg_event_ids remembered per process (at least)
+    SENDGRID_WEBHOOK_VERIFICATION_KEY: str = "" # Event Webhook signature verification key (base64, from Mail Settings); every webhook is rejected until it is set
+    SENDGRID_WEBHOOK_MAX_AGE: int = 600 # seconds a signed webhook timestamp stays acceptable (replay window)
+    SENDGRID_WEBHOOK_MAX_BODY_BYTES: int = 16 * 1024 * 1024 # larger webhook bodies are rejected with 413
     SENDGRID_SENDER_EMAIL: str
+    SENDGRID_BATCH_SIZE: int = 1000 # recipients (personalizations) per API request, at most 1000
+    SENDGRID_MAX_CONCURRENT_REQUESTS: int = 4 # API requests in flight per process
+    SENDGRID_MAX_ATTEMPTS: int = 5 # total attempts per request on 429, 5xx and network errors
+    SENDGRID_RETRY_BASE_DELAY: float = 1 # seconds; doubled per attempt, with full jitter
+    SENDGRID_MAX_RETRY_DELAY: float = 60 # longest wait between attempts, including 429 resets
+    SENDGRID_DYNAMIC_TEMPLATES: Dict[str, str] = {} # template_name -> SendGrid dynamic template id (names starting with "d-" are ids already)
+    EMAIL_TEMPLATE_DIR: str = "" # directory of <template_name>.html files, app/templates/email by default
+
+    EMAIL_JOB_LEASE_SECONDS: float = 300 # a job whose worker saved no progress for this long is resumed elsewhere
+    EMAIL_JOB_POLL_INTERVAL: float = 30 # seconds between looks for unfinished jobs without a live worker
+    EMAIL_JOB_MAX_REPORTED_FAILURES: int = 1000 # failed recipients listed on a job (all are counted)
+    EMAIL_JOB_STOP_TIMEOUT: float = 20 # on shutdown, how long running jobs get to finish their current batch
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -9,6 +9,21 @@ class BadRequestException(HTTPException):
     def __init__(self, detail: str = "Bad request"):
         super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
 
+class ConflictException(HTTPException):
+    def __init__(self, detail: str = "Conflict"):
+        super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+class ThrottledException(HTTPException):
+    """
+    DynamoDB (or the client-side rate limiter in front of it) is over capacity even after retries.
+    """
+    def __init__(self, detail: str = "Service temporarily over capacity, please retry.", retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+
 class InternalServerError(HTTPException):
     def __init__(self, detail: str = "Internal server error"):
         super().__init__(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
\ No newline at end of file
@@ -0,0 +1,80 @@
+# app/core/json_stream.py
+"""
+Incremental parsing of a top-level JSON array received in chunks (e.g. a request body stream):
+items are yielded as soon as they are complete, so memory holds one item and one chunk at a
+time instead of the whole document, and the event loop is free between chunks.
+"""
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+# Longest a single array item may be; guards against buffering a malformed body without end.
+DEFAULT_MAX_ITEM_CHARS = 1024 * 1024
+
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = _WHITESPACE + ",]"
+_OPEN, _FIRST_VALUE, _VALUE, _SEPARATOR, _CLOSED = range(5)
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes], max_item_chars: int = DEFAULT_MAX_ITEM_CHARS) -> AsyncIterator[Any]:
+    """
+    Yields the items of the UTF-8 JSON array split across `chunks`. Raises JSONStreamError if
+    the document is not a well-formed array; the items before the error have been yielded.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    chunk_iterator = chunks.__aiter__()
+    buffer, position, state, eof = "", 0, _OPEN, False
+    while True:
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+        if position < len(buffer):
+            char = buffer[position]
+            if state == _OPEN:
+                if char != "[":
+                    raise JSONStreamError("Expected a JSON array.")
+                position, state = position + 1, _FIRST_VALUE
+                continue
+            if state == _CLOSED:
+                raise JSONStreamError("Unexpected data after the JSON array.")
+            if char == "]" and state in (_FIRST_VALUE, _SEPARATOR):
+                position, state = position + 1, _CLOSED
+                continue
+            if state == _SEPARATOR:
+                if char != ",":
+                    raise JSONStreamError(f"Expected ',' or ']' at offset {position}.")
+                position, state = position + 1, _VALUE
+                continue
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                # A number or literal is only known to be whole once a delimiter follows it
+                # ("-1." is the start of "-1.5" in the next chunk, not -1).
+                complete = eof or isinstance(item, (dict, list, str)) or (end < len(buffer) and buffer[end] in _DELIMITERS)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise JSONStreamError(str(e))
+                complete = False
+            if complete:
+                yield item
+                position, state = end, _SEPARATOR
+                continue
+            if len(buffer) - position > max_item_chars:
+                raise JSONStreamError(f"Array item longer than {max_item_chars} characters.")
+        elif eof:
+            if state != _CLOSED:
+                raise JSONStreamError("Unexpected end of the JSON array.")
+            return
+
+        buffer, position = buffer[position:], 0
+        try:
+            chunk = await chunk_iterator.__anext__()
+        except StopAsyncIteration:
+            chunk, eof = b"", True
+        try:
+            buffer += text.decode(chunk, final=eof)
+        except UnicodeDecodeError as e:
+            raise JSONStreamError(str(e))
@@ -0,0 +1,59 @@
+# app/core/pagination.py
+import base64
+import hashlib
+import hmac
+import json
+from decimal import Decimal
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.core.exceptions import BadRequestException
+
+# Continuation tokens wrap a DynamoDB LastEvaluatedKey. They are signed so clients cannot
+# forge start keys, and bound to a `scope` (listing + filters) so a token from one query
+# cannot be replayed against another.
+
+def _secret() -> bytes:
+    return (settings.PAGINATION_TOKEN_SECRET or settings.AWS_SECRET_ACCESS_KEY).encode()
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return {"$n": str(value)}
+    raise TypeError(f"Unsupported key attribute type: {type(value).__name__}")
+
+def _decode_value(value: Dict[str, Any]) -> Any:
+    return Decimal(value["$n"]) if set(value) == {"$n"} else value
+
+def _sign(payload: bytes, scope: str) -> str:
+    digest = hmac.new(_secret(), scope.encode() + b"\x00" + payload, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).decode().rstrip("=")
+
+def make_scope(name: str, params: Dict[str, Any]) -> str:
+    """
+    Builds a cursor scope from a listing name and the parameters that shape its result set.
+    """
+    canonical = json.dumps(params, sort_keys=True, default=str)
+    return f"{name}:{hashlib.sha256(canonical.encode()).hexdigest()[:16]}"
+
+def encode_cursor(last_evaluated_key: Optional[Dict[str, Any]], scope: str) -> Optional[str]:
+    if not last_evaluated_key:
+        return None
+    payload = json.dumps(last_evaluated_key, separators=(",", ":"), sort_keys=True, default=_encode_value).encode()
+    body = base64.urlsafe_b64encode(payload).decode().rstrip("=")
+    return f"{body}.{_sign(payload, scope)}"
+
+def decode_cursor(cursor: Optional[str], scope: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the ExclusiveStartKey wrapped by `cursor`, or raises BadRequestException
+    if the token was tampered with or belongs to a different listing.
+    """
+    if not cursor:
+        return None
+    try:
+        body, signature = cursor.split(".", 1)
+        payload = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+    except (ValueError, TypeError):
+        raise BadRequestException(detail="Malformed pagination cursor.")
+    # Compared as bytes: compare_digest rejects str arguments holding non-ASCII characters.
+    if not hmac.compare_digest(signature.encode(), _sign(payload, scope).encode()):
+        raise BadRequestException(detail="Invalid pagination cursor for this listing.")
+    return json.loads(payload, object_hook=_decode_value)
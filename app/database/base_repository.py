@@ -1,12 +1,219 @@
 # app/database/base_repository.py
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Callable, TypeVar
+import asyncio
+import functools
+import random
 import uuid
+from boto3.dynamodb.conditions import ConditionBase
+from botocore.exceptions import ClientError
+from app.core.config import settings
+from app.core.exceptions import ThrottledException
+from app.database.dynamodb_connector import get_executor, get_rate_limiter
+from app.database.throttling import is_throttling_error, operation_kind
+from app.database.parallel_scan import build_scan_params, parallel_scan
+from app.database.schema import TableSchema
+
+T = TypeVar("T")
+
+# BatchGetItem accepts at most 100 keys per request, BatchWriteItem at most 25 writes.
+MAX_BATCH_GET_KEYS = 100
+MAX_BATCH_WRITE_ITEMS = 25
+MAX_BATCH_ATTEMPTS = 8
+MAX_CONCURRENT_BATCH_WRITES = 8
 
 class BaseRepository(ABC):
+    # Declaration of the table in the schema registry (app/database/tables.py).
+    schema: TableSchema
+    # Partition key attribute of single-key tables, used by batch_get_by_ids.
+    key_attribute = 'id'
+
     def __init__(self, table_name: str, db_client: Any):
+        self.db_client = db_client
         self.table = db_client.Table(table_name)
 
+    def ensure_table(self) -> None:
+        """
+        Checks that the table exists (one DescribeTable call) and creates it when it does not.
+        Called once at application startup, never per request.
+        """
+        try:
+            self.table.load()
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ResourceNotFoundException':
+                self._create_table(self.db_client)
+            else:
+                raise e
+
+    # --- Storage layout hooks, overridden by the single-table repositories ---
+    def _key(self, item_id: str) -> Dict[str, Any]:
+        """Primary key of the item with the given id."""
+        return {self.key_attribute: item_id}
+
+    def _item_id(self, item: Dict[str, Any]) -> str:
+        """Id of a stored item, from its primary key attributes (always projected, even in KEYS_ONLY indexes)."""
+        return item[self.key_attribute]
+
+    def _to_storage(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Item as written to the table."""
+        return item
+
+    def _scan_filter(self, condition: Optional[ConditionBase]) -> Optional[ConditionBase]:
+        """FilterExpression for a scan returning only this repository's items."""
+        return condition
+
+    async def invalidate(self, item_id: str) -> None:
+        """
+        Drops any cached copy of the item after it was changed behind the repository's back
+        (e.g. a counter moved by another repository's transaction). No-op without a cache.
+        """
+        pass
+
+    async def batch_get_by_ids(self, item_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetches many items by id with BatchGetItem (100 keys per request, chunks sent concurrently).
+        Duplicate ids are fetched once; ids that do not exist are simply absent from the result.
+        """
+        unique_ids = list(dict.fromkeys(item_ids))
+        items = await self.batch_get_items([self._key(item_id) for item_id in unique_ids])
+        return {self._item_id(item): item for item in items}
+
+    async def batch_get_items(self, keys: List[Dict[str, Any]], projection: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetches the items stored under the given (possibly composite) primary keys with BatchGetItem.
+        Keys must be unique; missing items are simply absent from the result.
+        """
+        chunks = [keys[i:i + MAX_BATCH_GET_KEYS] for i in range(0, len(keys), MAX_BATCH_GET_KEYS)]
+        results = await asyncio.gather(*(self._batch_get_chunk(chunk, projection) for chunk in chunks))
+        return [item for chunk_items in results for item in chunk_items]
+
+    async def _batch_get_chunk(self, keys: List[Dict[str, Any]], projection: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        request = {'Keys': keys}
+        if projection:
+            request.update(build_scan_params(projection))
+        request_items = {self.table.name: request}
+        items: List[Dict[str, Any]] = []
+        for attempt in range(MAX_BATCH_ATTEMPTS):
+            response = await self._run(self.db_client.batch_get_item, RequestItems=request_items)
+            items.extend(response.get('Responses', {}).get(self.table.name, []))
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                return items
+            # DynamoDB returns UnprocessedKeys when throttled; back off (with jitter) before retrying them.
+            await asyncio.sleep(random.uniform(0, min(0.05 * 2 ** attempt, 2.0)))
+        raise RuntimeError(f"BatchGetItem on {self.table.name} left keys unprocessed after {MAX_BATCH_ATTEMPTS} attempts.")
+
+    async def batch_put(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Writes items with BatchWriteItem, 25 per request and several requests in flight,
+        retrying UnprocessedItems with jittered backoff. Returns the items that could not be written.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCH_WRITES)
+
+        async def write(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self._batch_write_chunk([{'PutRequest': {'Item': item}} for item in chunk])
+
+        chunks = [items[i:i + MAX_BATCH_WRITE_ITEMS] for i in range(0, len(items), MAX_BATCH_WRITE_ITEMS)]
+        failed_requests = await asyncio.gather(*(write(chunk) for chunk in chunks))
+        return [request['PutRequest']['Item'] for requests in failed_requests for request in requests]
+
+    async def _batch_write_chunk(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Sends one BatchWriteItem request and returns the write requests that never went through.
+        """
+        request_items = {self.table.name: requests}
+        for attempt in range(MAX_BATCH_ATTEMPTS):
+            try:
+                response = await self._run(self.db_client.batch_write_item, RequestItems=request_items)
+            except (ClientError, ThrottledException) as e:
+                # Reported back as unprocessed rows rather than failing the whole bulk request.
+                print(f"Error in BatchWriteItem on {self.table.name}: {e}")
+                return request_items[self.table.name]
+            request_items = response.get('UnprocessedItems') or {}
+            if not request_items:
+                return []
+            await asyncio.sleep(random.uniform(0, min(0.05 * 2 ** attempt, 2.0)))
+        return request_items[self.table.name]
+
+    async def scan_all(
+        self,
+        projection: Optional[List[str]] = None,
+        filter_expression: Optional[ConditionBase] = None,
+        total_segments: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streams every item of the table (optionally projected / filtered server-side) using a
+        parallel segmented scan. Meant for exports, backfills and other full-table jobs only.
+        """
+        async def scan(**params):
+            return await self._run(self.table.scan, **params)
+
+        async for item in parallel_scan(
+            scan,
+            total_segments or settings.DYNAMODB_SCAN_SEGMENTS,
+            max_workers=max_workers,
+            scan_params=build_scan_params(projection, self._scan_filter(filter_expression))
+        ):
+            yield item
+
+    def _create_table(self, db_client: Any):
+        db_client.create_table(**self.schema.create_table_params())
+        self.table = db_client.Table(self.table.name)
+        self.table.wait_until_exists()
+        if self.schema.ttl_attribute:
+            db_client.meta.client.update_time_to_live(
+                TableName=self.table.name, TimeToLiveSpecification=self.schema.time_to_live_spec()
+            )
+
+    async def _hydrate(
+        self,
+        index_name: str,
+        items: List[Dict[str, Any]],
+        projection: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Turns items read from a GSI into full items (or into just the `projection` attributes):
+        a no-op when the index projects what is needed, otherwise the items are re-read by key
+        with BatchGetItem (order is kept, vanished items dropped). Projected re-reads bypass
+        any cache, which only ever holds whole items.
+        """
+        index = self.schema.index(index_name)
+        if not items or (projection is None and index.projects_all):
+            return items
+        ids = [self._item_id(item) for item in items]
+        if projection is None:
+            fetched = await self.batch_get_by_ids(ids)
+        elif index.covers(projection, self.schema.key_attributes()):
+            return [{name: item[name] for name in projection if name in item} for item in items]
+        else:
+            attributes = list(dict.fromkeys([*self.schema.key_attributes(), *projection]))
+            partial = await self.batch_get_items([self._key(item_id) for item_id in ids], attributes)
+            fetched = {self._item_id(item): {name: item[name] for name in projection if name in item} for item in partial}
+        return [fetched[item_id] for item_id in ids if item_id in fetched]
+
+    async def _run(self, operation: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Runs a blocking boto3 call on the bounded DynamoDB executor, so the event loop
+        keeps serving other requests while this one waits on the network.
+
+        Reads and writes first take a token from the configured rate limiter. botocore retries
+        throttled calls itself (jittered backoff, adaptive mode); a call still throttled after
+        that raises ThrottledException (503 + Retry-After) instead of a ClientError that
+        callers would mistake for a missing item or a failed condition.
+        """
+        rate_limiter = get_rate_limiter(operation_kind(operation))
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(get_executor(), functools.partial(operation, *args, **kwargs))
+        except ClientError as e:
+            if is_throttling_error(e):
+                raise ThrottledException(retry_after=settings.DYNAMODB_THROTTLE_RETRY_AFTER) from e
+            raise
+
     @abstractmethod
     async def get_by_id(self, item_id: str) -> Optional[Dict[str, Any]]:
         pass
@@ -25,4 +232,4 @@ class BaseRepository(ABC):
 
     @abstractmethod
     async def query(self, **kwargs) -> List[Dict[str, Any]]:
-        pass
\ No newline at end of file
+        pass
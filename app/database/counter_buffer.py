@@ -0,0 +1,70 @@
+# app/database/counter_buffer.py
+import asyncio
+from collections import Counter, defaultdict
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+
+class CounterBuffer:
+    """
+    Aggregates counter increments in memory and applies them every `flush_interval` seconds,
+    one `apply(key, deltas)` call (e.g. a DynamoDB ADD) per key that changed, at most
+    `max_concurrency` at a time. However many increments a key received, it costs one write
+    per flush. Deltas whose write fails are merged back and retried with the next flush;
+    increments not yet flushed when the process dies are lost.
+    """
+    def __init__(
+        self,
+        apply: Callable[[Hashable, Dict[str, int]], Awaitable[None]],
+        flush_interval: float = 5.0,
+        max_concurrency: int = 8
+    ):
+        self._apply = apply
+        self.flush_interval = flush_interval
+        self.max_concurrency = max_concurrency
+        self._deltas: Dict[Hashable, Counter] = defaultdict(Counter)
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._wake = asyncio.Event() # close was called
+
+    def increment(self, key: Hashable, counter: str, amount: int = 1) -> None:
+        self._deltas[key][counter] += amount
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closing = False
+            self._wake.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """
+        Stops the background task (letting a flush in progress finish, so its failed deltas are
+        merged back rather than lost) and applies every increment left. Call it at shutdown.
+        """
+        self._closing = True
+        self._wake.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self) -> None:
+        deltas, self._deltas = self._deltas, defaultdict(Counter)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def apply(key: Hashable, counters: Counter) -> None:
+            async with semaphore:
+                try:
+                    await self._apply(key, dict(counters))
+                except Exception as e:
+                    print(f"Error applying counters for {key}: {e}")
+                    self._deltas[key].update(counters)
+
+        await asyncio.gather(*(apply(key, counters) for key, counters in deltas.items() if counters))
@@ -0,0 +1,61 @@
+# app/database/dataloader.py
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Request-scoped batching loader.
+    Every load() issued during the same event-loop tick is coalesced into a single call to
+    `batch_load` (at most `max_batch_size` keys per call), and each key is fetched at most once
+    per loader. Create one loader per request so results never leak between requests.
+    """
+    def __init__(self, batch_load: Callable[[List[K]], Awaitable[Dict[K, V]]], max_batch_size: int = 100):
+        self._batch_load = batch_load
+        self._max_batch_size = max_batch_size
+        self._futures: Dict[K, asyncio.Future] = {}
+        self._pending: List[K] = []
+        # The loop only keeps weak references to tasks: hold on to the in-flight batches.
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, key: K) -> "asyncio.Future[Optional[V]]":
+        future = self._futures.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[key] = future
+        self._pending.append(key)
+        if len(self._pending) == 1:
+            # Dispatch once the currently runnable coroutines have had a chance to queue their keys too.
+            loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: List[K]) -> List[Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        keys, self._pending = self._pending, []
+        for start in range(0, len(keys), self._max_batch_size):
+            task = asyncio.ensure_future(self._load_batch(keys[start:start + self._max_batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(self, keys: List[K]) -> None:
+        try:
+            results = await self._batch_load(keys)
+        except Exception as e:
+            for key in keys:
+                # Forget failed keys so a later load() retries them.
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(results.get(key))
@@ -1,6 +1,10 @@
 # app/database/dynamodb_connector.py
 import boto3
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 from app.core.config import settings
+from app.database.throttling import TokenBucket
 
 class DynamoDBConnector:
     _instance = None
@@ -12,14 +16,45 @@ class DynamoDBConnector:
                 'dynamodb',
                 aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION_NAME
+                region_name=settings.AWS_REGION_NAME,
+                config=Config(
+                    # One pooled HTTP connection per executor thread, so no call waits on the pool.
+                    max_pool_connections=settings.DYNAMODB_MAX_WORKERS,
+                    retries={'mode': settings.DYNAMODB_RETRY_MODE, 'total_max_attempts': settings.DYNAMODB_MAX_ATTEMPTS},
+                    connect_timeout=settings.DYNAMODB_CONNECT_TIMEOUT,
+                    read_timeout=settings.DYNAMODB_READ_TIMEOUT
+                )
             )
+            # boto3 is blocking; repositories hand their calls to this bounded pool
+            # (see BaseRepository._run) instead of running them on the event loop.
+            cls._instance.executor = ThreadPoolExecutor(
+                max_workers=settings.DYNAMODB_MAX_WORKERS,
+                thread_name_prefix="dynamodb"
+            )
+            # Optional static caps in front of DynamoDB, per operation kind (see BaseRepository._run).
+            cls._instance.rate_limiters = {
+                kind: TokenBucket(rate, max_wait=settings.DYNAMODB_RATE_LIMIT_MAX_WAIT)
+                for kind, rate in (('read', settings.DYNAMODB_READ_RATE_LIMIT), ('write', settings.DYNAMODB_WRITE_RATE_LIMIT))
+                if rate > 0
+            }
         return cls._instance
 
     def get_db(self):
         return self.db
 
+    def get_executor(self) -> ThreadPoolExecutor:
+        return self.executor
+
+    def get_rate_limiter(self, kind: Optional[str]) -> Optional[TokenBucket]:
+        return self.rate_limiters.get(kind)
+
 dynamodb_connector = DynamoDBConnector()
 
 def get_db_client():
-    return dynamodb_connector.get_db()
\ No newline at end of file
+    return dynamodb_connector.get_db()
+
+def get_executor() -> ThreadPoolExecutor:
+    return dynamodb_connector.get_executor()
+
+def get_rate_limiter(kind: Optional[str]) -> Optional[TokenBucket]:
+    return dynamodb_connector.get_rate_limiter(kind)
@@ -0,0 +1,54 @@
+# app/database/ndjson_segments.py
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, TextIO
+
+
+class NdjsonSegmentWriter:
+    """
+    Appends records to rolling local NDJSON segments, `<prefix>-<UTC timestamp>.ndjson` in
+    `directory`. A new segment is started once the current one reaches `max_bytes` or is
+    `max_age` seconds old, so finished segments can be shipped (e.g. to S3) and deleted.
+    """
+    def __init__(self, directory: str, prefix: str = "segment", max_bytes: int = 64 * 1024 * 1024, max_age: float = 3600):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._file: Optional[TextIO] = None
+        self._opened_at = 0.0
+        self._size = 0
+
+    async def write(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Appends the records (file I/O runs off the event loop). Returns the records not written: none.
+        """
+        await asyncio.to_thread(self._write, records)
+        return []
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        if self._file is None or self._size >= self.max_bytes or time.monotonic() - self._opened_at >= self.max_age:
+            self._roll()
+        data = "".join(json.dumps(record, separators=(",", ":"), default=str) + "\n" for record in records)
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+    def _roll(self) -> None:
+        self._close()
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{self.prefix}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}.ndjson"
+        self._file = open(os.path.join(self.directory, name), "a", encoding="utf-8")
+        self._opened_at = time.monotonic()
+        self._size = 0
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
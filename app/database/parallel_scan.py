@@ -0,0 +1,91 @@
+# app/database/parallel_scan.py
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from boto3.dynamodb.conditions import ConditionBase
+
+_DONE = object()
+
+
+def build_scan_params(
+    projection: Optional[List[str]] = None,
+    filter_expression: Optional[ConditionBase] = None,
+    page_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Translates projection / filter pushdown into table.scan() keyword arguments.
+    Attribute names are always aliased, since many (e.g. `role`, `state`) are reserved words.
+    """
+    params: Dict[str, Any] = {}
+    if projection:
+        params['ProjectionExpression'] = ", ".join(f"#p{i}" for i in range(len(projection)))
+        params['ExpressionAttributeNames'] = {f"#p{i}": name for i, name in enumerate(projection)}
+    if filter_expression is not None:
+        params['FilterExpression'] = filter_expression
+    if page_size:
+        params['Limit'] = page_size
+    return params
+
+
+async def parallel_scan(
+    scan: Callable[..., Awaitable[Dict[str, Any]]],
+    total_segments: int,
+    max_workers: Optional[int] = None,
+    scan_params: Optional[Dict[str, Any]] = None,
+    buffer_size: int = 1000
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Scans a table split into `total_segments` DynamoDB segments, with at most `max_workers`
+    segments paginated concurrently, and yields items as they arrive (in no particular order).
+
+    `scan` is an awaitable table.scan (e.g. a repository's `_run` bound to it). Items are handed
+    over through a bounded queue, so a slow consumer pauses the workers instead of buffering the table.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+    segments: asyncio.Queue = asyncio.Queue()
+    for segment in range(total_segments):
+        segments.put_nowait(segment)
+
+    async def worker():
+        while True:
+            try:
+                segment = segments.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            params = dict(scan_params or {}, Segment=segment, TotalSegments=total_segments)
+            while True:
+                response = await scan(**params)
+                for item in response.get('Items', []):
+                    await queue.put(item)
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key:
+                    break
+                params['ExclusiveStartKey'] = last_key
+
+    async def run_workers():
+        workers = [asyncio.create_task(worker()) for _ in range(min(max_workers or total_segments, total_segments))]
+        try:
+            await asyncio.gather(*workers)
+        except asyncio.CancelledError:
+            # The consumer went away; nobody is waiting for the end marker.
+            for task in workers:
+                task.cancel()
+            raise
+        except Exception:
+            for task in workers:
+                task.cancel()
+            await queue.put(_DONE)
+            raise
+        await queue.put(_DONE)
+
+    producer = asyncio.create_task(run_workers())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            yield item
+        # Surface a worker failure to the consumer instead of silently truncating the scan.
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
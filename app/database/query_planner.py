@@ -0,0 +1,77 @@
+# app/database/query_planner.py
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+from boto3.dynamodb.conditions import Attr, ConditionBase, Key
+
+
+@dataclass(frozen=True)
+class IndexDefinition:
+    """
+    Describes a GSI the planner may use.
+    `selectivity` is a static ranking: the higher it is, the fewer items
+    we expect to share a single partition key value on that index.
+    """
+    name: str
+    hash_key: str
+    range_key: Optional[str] = None
+    selectivity: int = 0
+
+    def score(self, criteria: Dict[str, Any]) -> int:
+        # Querying on both keys narrows the partition further than the hash key alone.
+        if self.range_key and self.range_key in criteria:
+            return self.selectivity * 2
+        return self.selectivity
+
+
+@dataclass
+class QueryPlan:
+    index_name: Optional[str] = None
+    key_condition: Optional[ConditionBase] = None
+    filter_expression: Optional[ConditionBase] = None
+
+    @property
+    def is_scan(self) -> bool:
+        return self.index_name is None
+
+    def to_request(self) -> Dict[str, Any]:
+        """
+        Builds the keyword arguments for table.query() / table.scan().
+        """
+        request: Dict[str, Any] = {}
+        if not self.is_scan:
+            request['IndexName'] = self.index_name
+            request['KeyConditionExpression'] = self.key_condition
+        if self.filter_expression is not None:
+            request['FilterExpression'] = self.filter_expression
+        return request
+
+
+def plan_query(
+    indexes: Sequence[IndexDefinition],
+    criteria: Dict[str, Any],
+    extra_filter: Optional[ConditionBase] = None
+) -> QueryPlan:
+    """
+    Picks the most selective index whose hash key is covered by the equality `criteria`
+    and pushes every remaining predicate (plus `extra_filter`) into a FilterExpression.
+    Falls back to a scan (with the full FilterExpression) when no index applies.
+    """
+    usable = [index for index in indexes if index.hash_key in criteria]
+    best = max(usable, key=lambda index: index.score(criteria), default=None)
+
+    plan = QueryPlan()
+    remaining = dict(criteria)
+    if best is not None:
+        plan.index_name = best.name
+        plan.key_condition = Key(best.hash_key).eq(remaining.pop(best.hash_key))
+        if best.range_key and best.range_key in remaining:
+            plan.key_condition = plan.key_condition & Key(best.range_key).eq(remaining.pop(best.range_key))
+
+    for attribute, value in remaining.items():
+        condition = Attr(attribute).eq(value)
+        plan.filter_expression = condition if plan.filter_expression is None else plan.filter_expression & condition
+
+    if extra_filter is not None:
+        plan.filter_expression = extra_filter if plan.filter_expression is None else plan.filter_expression & extra_filter
+
+    return plan
@@ -0,0 +1,129 @@
+# app/database/schema.py
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+
+PAY_PER_REQUEST = 'PAY_PER_REQUEST'
+PROVISIONED = 'PROVISIONED'
+
+
+@dataclass(frozen=True)
+class IndexSchema:
+    """
+    A GSI declaration. `projection` is ALL, KEYS_ONLY or INCLUDE (with `non_key_attributes`);
+    every projected attribute is rewritten in the index whenever it changes on the base item,
+    so project only what queries on the index need to read or filter on.
+    """
+    name: str
+    hash_key: str
+    range_key: Optional[str] = None
+    projection: str = 'ALL'
+    non_key_attributes: Tuple[str, ...] = ()
+
+    @property
+    def projects_all(self) -> bool:
+        return self.projection == 'ALL'
+
+    def key_schema(self) -> List[Dict[str, str]]:
+        return _key_schema(self.hash_key, self.range_key)
+
+    def covers(self, attributes: Sequence[str], table_keys: Sequence[str]) -> bool:
+        """
+        Whether items read from the index carry all `attributes` (table keys are always projected).
+        """
+        if self.projects_all:
+            return True
+        projected = {*table_keys, self.hash_key, self.range_key, *self.non_key_attributes}
+        return all(attribute in projected for attribute in attributes)
+
+    def projection_spec(self) -> Dict[str, Any]:
+        spec: Dict[str, Any] = {'ProjectionType': self.projection}
+        if self.projection == 'INCLUDE':
+            spec['NonKeyAttributes'] = list(self.non_key_attributes)
+        return spec
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    """
+    Declarative definition of a table: keys, GSIs and capacity. Billing mode and capacity
+    default to the DYNAMODB_BILLING_MODE / DYNAMODB_*_CAPACITY settings.
+    """
+    name: str # without DYNAMODB_TABLE_PREFIX
+    hash_key: str
+    range_key: Optional[str] = None
+    indexes: Tuple[IndexSchema, ...] = ()
+    attribute_types: Dict[str, str] = field(default_factory=dict) # key attributes that are not strings ('S')
+    billing_mode: Optional[str] = None
+    read_capacity: Optional[int] = None
+    write_capacity: Optional[int] = None
+    ttl_attribute: Optional[str] = None # epoch-seconds attribute after which DynamoDB deletes the item
+
+    @property
+    def table_name(self) -> str:
+        return f"{settings.DYNAMODB_TABLE_PREFIX}{self.name}"
+
+    @property
+    def effective_billing_mode(self) -> str:
+        return self.billing_mode or settings.DYNAMODB_BILLING_MODE
+
+    def throughput(self) -> Dict[str, int]:
+        return {
+            'ReadCapacityUnits': self.read_capacity or settings.DYNAMODB_READ_CAPACITY,
+            'WriteCapacityUnits': self.write_capacity or settings.DYNAMODB_WRITE_CAPACITY
+        }
+
+    def index(self, name: str) -> IndexSchema:
+        for index in self.indexes:
+            if index.name == name:
+                return index
+        raise KeyError(f"{self.name} has no index named {name}")
+
+    def key_schema(self) -> List[Dict[str, str]]:
+        return _key_schema(self.hash_key, self.range_key)
+
+    def key_attributes(self) -> List[str]:
+        return [name for name in (self.hash_key, self.range_key) if name]
+
+    def attribute_definitions(self) -> List[Dict[str, str]]:
+        # Only key attributes (of the table or of a GSI) may be declared.
+        names = [self.hash_key, self.range_key]
+        for index in self.indexes:
+            names.extend([index.hash_key, index.range_key])
+        return [
+            {'AttributeName': name, 'AttributeType': self.attribute_types.get(name, 'S')}
+            for name in dict.fromkeys(name for name in names if name)
+        ]
+
+    def index_definition(self, index: IndexSchema) -> Dict[str, Any]:
+        definition: Dict[str, Any] = {
+            'IndexName': index.name,
+            'KeySchema': index.key_schema(),
+            'Projection': index.projection_spec()
+        }
+        if self.effective_billing_mode == PROVISIONED:
+            definition['ProvisionedThroughput'] = self.throughput()
+        return definition
+
+    def time_to_live_spec(self) -> Dict[str, Any]:
+        return {'Enabled': True, 'AttributeName': self.ttl_attribute}
+
+    def create_table_params(self) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            'TableName': self.table_name,
+            'KeySchema': self.key_schema(),
+            'AttributeDefinitions': self.attribute_definitions(),
+            'BillingMode': self.effective_billing_mode
+        }
+        if self.effective_billing_mode == PROVISIONED:
+            params['ProvisionedThroughput'] = self.throughput()
+        if self.indexes:
+            params['GlobalSecondaryIndexes'] = [self.index_definition(index) for index in self.indexes]
+        return params
+
+
+def _key_schema(hash_key: str, range_key: Optional[str]) -> List[Dict[str, str]]:
+    key_schema = [{'AttributeName': hash_key, 'KeyType': 'HASH'}]
+    if range_key:
+        key_schema.append({'AttributeName': range_key, 'KeyType': 'RANGE'})
+    return key_schema
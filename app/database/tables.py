@@ -0,0 +1,118 @@
+# app/database/tables.py
+"""
+Schema registry: the single declaration of every DynamoDB table the application uses.
+Repositories create their table from it, and `python -m app.commands.migrate_tables`
+brings existing tables in line with it.
+"""
+from typing import Tuple
+from app.core.config import settings
+from app.database.schema import IndexSchema, TableSchema
+
+# Attributes the user listing filters on (see UserRepository.find_page); the user indexes
+# project only these, and the full items are then fetched by id. Every index the query planner
+# may pick must project all of them, since the other criteria become its FilterExpression.
+USER_FILTER_ATTRIBUTES = ('company', 'jobTitle', 'city', 'state', 'email', 'hostedCount', 'attendedCount')
+
+
+def _include(*keys: str) -> tuple:
+    return tuple(attribute for attribute in USER_FILTER_ATTRIBUTES if attribute not in keys)
+
+
+USERS = TableSchema(
+    name='Users',
+    hash_key='id',
+    indexes=(
+        IndexSchema('CompanyIndex', 'company', projection='INCLUDE', non_key_attributes=_include('company')),
+        IndexSchema('JobTitleIndex', 'jobTitle', projection='INCLUDE', non_key_attributes=_include('jobTitle')),
+        IndexSchema('CityStateIndex', 'city', range_key='state', projection='INCLUDE',
+                    non_key_attributes=_include('city', 'state')),
+        IndexSchema('EmailIndex', 'email', projection='INCLUDE', non_key_attributes=_include('email')),
+    )
+)
+
+EVENTS = TableSchema(
+    name='Events',
+    hash_key='id',
+    indexes=(
+        IndexSchema('SlugIndex', 'slug', projection='KEYS_ONLY'),
+        IndexSchema('OwnerIdIndex', 'ownerId', projection='KEYS_ONLY'),
+    )
+)
+
+USER_EVENTS = TableSchema(
+    name='UserEvents',
+    hash_key='userId',
+    range_key='eventId',
+    indexes=(
+        # Registration rows are small and read whole by attendee listings and exports.
+        IndexSchema('EventIdIndex', 'eventId', range_key='userId', projection='ALL'),
+    )
+)
+
+TABLES = (USERS, EVENTS, USER_EVENTS)
+
+# Background email campaigns (app/services/email_jobs.py), kept in their own table in both layouts.
+EMAIL_JOBS = TableSchema(
+    name='EmailJobs',
+    hash_key='id',
+    indexes=(
+        # Sparse: only queued/running jobs carry `activeStatus`, so workers list unfinished jobs
+        # without reading the whole job history.
+        IndexSchema('ActiveJobsIndex', 'activeStatus', range_key='createdAt', projection='KEYS_ONLY'),
+    )
+)
+
+# Raw analytics records (email statuses, engagement), written in batches by the analytics buffer.
+# bucket = <kind>#<UTC hour>#<shard>: records of one hour are spread over a few partitions, and
+# recordKey = <timestamp>#<id> orders them in time, so a time range is read with a few Queries.
+ANALYTICS_EVENTS = TableSchema(
+    name='AnalyticsEvents',
+    hash_key='bucket',
+    range_key='recordKey'
+)
+
+# Pre-aggregated counters (e.g. emails sent/failed): one item per series and time bucket
+# (`total`, `h#<UTC hour>`, `m#<UTC minute>`), incremented with ADD. Minute and hour buckets
+# expire through TTL.
+ANALYTICS_COUNTERS = TableSchema(
+    name='AnalyticsCounters',
+    hash_key='series',
+    range_key='bucket',
+    ttl_attribute='expiresAt'
+)
+
+# Inverted index for event search (app/repositories/event_search.py): term = w#<word> or
+# p#<prefix>, posting = <startAt>#<eventId>, so a term's events come back in start order.
+EVENT_SEARCH = TableSchema(
+    name='EventSearch',
+    hash_key='term',
+    range_key='posting'
+)
+
+# Tables that are the same in both layouts.
+SHARED_TABLES = (EMAIL_JOBS, ANALYTICS_EVENTS, ANALYTICS_COUNTERS, EVENT_SEARCH)
+
+# Single-table layout (DYNAMODB_LAYOUT=single_table): every entity lives in one table under an
+# overloaded PK/SK, see app/repositories/single_table.py. The attribute GSIs are the same as above;
+# they stay sparse, since only users carry `email`/`company`/... and only events carry `slug`/`ownerId`.
+SINGLE_TABLE = TableSchema(
+    name='Main',
+    hash_key='PK',
+    range_key='SK',
+    indexes=(
+        # PK/SK swapped: a user's registrations (SK = REG#<userId>). Users and events are in it too,
+        # but project no non-key attribute they have, so their updates never rewrite it.
+        IndexSchema('InvertedIndex', 'SK', range_key='PK', projection='INCLUDE',
+                    non_key_attributes=('userId', 'eventId', 'role')),
+        *USERS.indexes,
+        *EVENTS.indexes,
+    )
+)
+
+
+def active_tables() -> Tuple[TableSchema, ...]:
+    """
+    Tables used by the configured DYNAMODB_LAYOUT.
+    """
+    entity_tables = (SINGLE_TABLE,) if settings.DYNAMODB_LAYOUT == "single_table" else TABLES
+    return entity_tables + SHARED_TABLES
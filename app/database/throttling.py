@@ -0,0 +1,71 @@
+# app/database/throttling.py
+import asyncio
+import math
+import time
+from typing import Any, Callable, Optional
+from botocore.exceptions import ClientError
+from app.core.exceptions import ThrottledException
+
+# Error codes DynamoDB returns once a table, index or account is over its capacity.
+THROTTLING_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded'
+}
+
+READ_OPERATIONS = {'get_item', 'query', 'scan', 'batch_get_item', 'transact_get_items'}
+WRITE_OPERATIONS = {'put_item', 'update_item', 'delete_item', 'batch_write_item', 'transact_write_items'}
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter: `rate` requests per second with bursts of up to `capacity`.
+    Callers over the rate are delayed rather than sent, so a burst reaches DynamoDB spread out
+    instead of being throttled there. A caller that would wait longer than `max_wait` seconds
+    is rejected with ThrottledException instead.
+    """
+    def __init__(self, rate: float, capacity: Optional[float] = None, max_wait: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.max_wait = max_wait
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        # Reserving is synchronous (no await between refill and debit), so it is safe on one event loop;
+        # the balance may go negative, which queues later callers behind earlier ones.
+        self._refill()
+        wait = max(0.0, tokens - self._tokens) / self.rate
+        if wait > self.max_wait:
+            raise ThrottledException(retry_after=math.ceil(wait))
+        self._tokens -= tokens
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def operation_kind(operation: Callable[..., Any]) -> Optional[str]:
+    """
+    Classifies a boto3 call as 'read' or 'write' from its name (None for anything else,
+    e.g. repository helpers that issue several calls themselves).
+    """
+    name = getattr(operation, '__name__', '')
+    if name in READ_OPERATIONS:
+        return 'read'
+    if name in WRITE_OPERATIONS:
+        return 'write'
+    return None
+
+
+def is_throttling_error(error: ClientError) -> bool:
+    if error.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES:
+        return True
+    # A transaction cancelled because one of its items was throttled.
+    reasons = error.response.get('CancellationReasons', [])
+    return any(reason.get('Code') == 'ThrottlingError' for reason in reasons)
@@ -0,0 +1,104 @@
+# app/database/write_buffer.py
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class WriteBuffer(Generic[T]):
+    """
+    In-process buffer in front of a batch writer. `put` is a list append; it only waits while
+    `max_pending` records are already queued (backpressure instead of unbounded memory).
+    A background task hands the records to `write` in batches of up to `max_batch`, as soon
+    as that many are queued or at the latest every `max_delay` seconds. `write` returns the
+    records (the same objects) it could not store; they are retried with a later batch, up to `max_attempts`
+    times, then dropped (and counted). `close` flushes everything still queued.
+    """
+    def __init__(
+        self,
+        write: Callable[[List[T]], Awaitable[List[T]]],
+        max_batch: int = 500,
+        max_delay: float = 2.0,
+        max_pending: int = 50000,
+        max_attempts: int = 3
+    ):
+        self._write = write
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._pending: List[Tuple[int, T]] = [] # (attempts so far, record)
+        self._ready = asyncio.Event() # a full batch is queued
+        self._space = asyncio.Event() # the queue dropped below max_pending
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.written = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def put(self, record: T) -> None:
+        while len(self._pending) >= self.max_pending:
+            self._space.clear()
+            await self._space.wait()
+        self._pending.append((0, record))
+        if len(self._pending) >= self.max_batch:
+            self._ready.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """
+        Stops the background task and writes out every queued record. Call it last, at shutdown.
+        """
+        self._closing = True
+        self._ready.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while self._pending:
+            await self._flush()
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._ready.wait(), self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._ready.clear()
+            try:
+                await self._flush()
+            except Exception as e:
+                print(f"Error flushing write buffer: {e}")
+
+    async def _flush(self) -> None:
+        """
+        Writes the records queued so far (not the ones queued meanwhile), one batch at a time.
+        """
+        remaining = len(self._pending)
+        while remaining > 0:
+            batch = self._pending[:min(self.max_batch, remaining)]
+            del self._pending[:len(batch)]
+            remaining -= len(batch)
+            self._space.set()
+
+            records = [record for _, record in batch]
+            try:
+                failed = await self._write(records)
+            except Exception as e:
+                print(f"Error writing {len(records)} buffered records: {e}")
+                failed = records
+            self.written += len(records) - len(failed)
+            if failed:
+                failed_ids = {id(record) for record in failed}
+                for attempts, record in batch:
+                    if id(record) not in failed_ids:
+                        continue
+                    if attempts + 1 < self.max_attempts:
+                        self._pending.append((attempts + 1, record))
+                    else:
+                        self.dropped += 1
@@ -0,0 +1,29 @@
+# app/models/email_job.py
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+import uuid
+from datetime import datetime
+
+# Job lifecycle: queued -> running -> completed / failed. Queued and running jobs are "active"
+# and are picked up (again) by EmailJobService workers until they finish.
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+ACTIVE_JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+class EmailJob(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = JOB_QUEUED
+    subject: str
+    templateName: str
+    templateData: Dict[str, Any] = {}
+    filters: Optional[Dict[str, Any]] = None # UserFilter fields, for filter-based audiences
+    recipientEmails: Optional[List[str]] = None # explicit audience
+    sentCount: int = 0
+    failedCount: int = 0
+    failedRecipients: List[str] = [] # first EMAIL_JOB_MAX_REPORTED_FAILURES only
+    error: Optional[str] = None
+    createdAt: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    updatedAt: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    completedAt: Optional[str] = None
@@ -13,6 +13,7 @@ class Event(BaseModel):
     endAt: datetime
     venue: str
     maxCapacity: int
+    registeredCount: int = 0 # seats taken by participants, maintained atomically by EventRepository
     ownerId: str
     hosts: List[str] = []
     createdAt: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import NamedTuple, Optional
 from pydantic import BaseModel, Field
 import uuid
 from datetime import datetime
@@ -15,5 +15,15 @@ class User(BaseModel):
     company: Optional[str] = None # should be company ID
     city: Optional[str] = None
     state: Optional[str] = None
+    hostedCount: int = 0 # maintained by UserEventRepository, never set directly
+    attendedCount: int = 0
     createdAt: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
-    updatedAt: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
\ No newline at end of file
+    updatedAt: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+
+class Recipient(NamedTuple):
+    """
+    The part of a user an email send needs; cheap enough to stream audiences of any size.
+    """
+    id: str
+    email: str
+    firstName: str
\ No newline at end of file
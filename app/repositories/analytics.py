@@ -0,0 +1,95 @@
+# app/repositories/analytics.py
+import boto3
+import json
+from decimal import Decimal
+from typing import Dict, Any, Optional, List
+from app.database.base_repository import BaseRepository
+from app.database.tables import ANALYTICS_EVENTS
+
+# Partitions each hour of records is spread over (see ANALYTICS_EVENTS).
+WRITE_SHARDS = 8
+
+
+class AnalyticsRepository(BaseRepository):
+    """
+    Append-only store of raw analytics records. Records are plain dicts with at least `id`
+    (a uuid4 string), `kind` and `timestamp` (UTC ISO 8601); they are never updated.
+    """
+    schema = ANALYTICS_EVENTS
+
+    def __init__(self, db_client: Any):
+        super().__init__(self.schema.table_name, db_client)
+
+    @staticmethod
+    def bucket(kind: str, hour: str, shard: int) -> str:
+        return f"{kind}#{hour}#{shard}"
+
+    def _to_item(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        # Nested values may hold floats, which DynamoDB only accepts as Decimal.
+        item = json.loads(json.dumps({k: v for k, v in record.items() if v is not None}, default=str), parse_float=Decimal)
+        item['bucket'] = self.bucket(record['kind'], record['timestamp'][:13], int(record['id'][:8], 16) % WRITE_SHARDS)
+        item['recordKey'] = f"{record['timestamp']}#{record['id']}"
+        return item
+
+    async def write_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Stores records with BatchWriteItem. Returns the records (the same objects) that were not written.
+        """
+        by_id = {record['id']: record for record in records}
+        failed = await self.batch_put([self._to_item(record) for record in records])
+        return [by_id[item['id']] for item in failed]
+
+    async def records_for_hour(self, kind: str, hour: str) -> List[Dict[str, Any]]:
+        """
+        Every record of `kind` from one UTC hour (`YYYY-MM-DDTHH`), across all shards, in time order per shard.
+        """
+        items = []
+        for shard in range(WRITE_SHARDS):
+            items.extend(await self.records_in_shard(kind, hour, shard))
+        return items
+
+    async def records_in_shard(
+        self,
+        kind: str,
+        hour: str,
+        shard: int,
+        after: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        The records of one hour and shard in time order, optionally only those after the
+        recordKey `after` and with a timestamp up to `until` (ISO 8601), for incremental readers.
+        """
+        key_condition = boto3.dynamodb.conditions.Key('bucket').eq(self.bucket(kind, hour, shard))
+        if after or until:
+            # '~' sorts after every character of an id, so `until#~` covers all records stamped `until`.
+            key_condition &= boto3.dynamodb.conditions.Key('recordKey').between(after or '0', f"{until}#~" if until else '~')
+        query_params = {'KeyConditionExpression': key_condition}
+        items = []
+        while True:
+            response = await self._run(self.table.query, **query_params)
+            items.extend(item for item in response.get('Items', []) if item['recordKey'] != after)
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return items
+            query_params['ExclusiveStartKey'] = last_key
+
+    async def create(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        await self._run(self.table.put_item, Item=self._to_item(record))
+        return record
+
+    async def get_by_id(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Implements the abstract 'get_by_id' method.
+        NOTE: records are keyed by (bucket, recordKey); read them by time with records_for_hour.
+        """
+        raise ValueError("AnalyticsRepository records cannot be read by id; use records_for_hour.")
+
+    async def update(self, item_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        raise ValueError("Analytics records are append-only.")
+
+    async def delete(self, item_id: str) -> bool:
+        raise ValueError("Analytics records are append-only.")
+
+    async def query(self, **kwargs) -> List[Dict[str, Any]]:
+        return [item async for item in self.scan_all()]
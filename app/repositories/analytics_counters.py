@@ -0,0 +1,74 @@
+# app/repositories/analytics_counters.py
+import boto3
+from typing import Dict, Any, Optional, List
+from app.database.base_repository import BaseRepository
+from app.database.tables import ANALYTICS_COUNTERS
+
+
+class AnalyticsCounterRepository(BaseRepository):
+    """
+    Counter items keyed by (series, bucket); every attribute other than the keys and
+    `expiresAt` is a counter.
+    """
+    schema = ANALYTICS_COUNTERS
+
+    def __init__(self, db_client: Any):
+        super().__init__(self.schema.table_name, db_client)
+
+    async def add(self, series: str, bucket: str, deltas: Dict[str, int], expires_at: Optional[int] = None) -> None:
+        """
+        Atomically adds `deltas` to the bucket's counters, creating the item (and counters) as needed.
+        """
+        names = {f"#c{i}": counter for i, counter in enumerate(deltas)}
+        values = {f":c{i}": delta for i, delta in enumerate(deltas.values())}
+        update_expression = "ADD " + ", ".join(f"#c{i} :c{i}" for i in range(len(deltas)))
+        if expires_at is not None:
+            update_expression += " SET expiresAt = :expires_at"
+            values[':expires_at'] = expires_at
+        await self._run(self.table.update_item,
+            Key={'series': series, 'bucket': bucket},
+            UpdateExpression=update_expression,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+
+    async def get_bucket(self, series: str, bucket: str) -> Optional[Dict[str, Any]]:
+        response = await self._run(self.table.get_item, Key={'series': series, 'bucket': bucket})
+        return response.get('Item')
+
+    async def get_range(self, series: str, first_bucket: str, last_bucket: str) -> List[Dict[str, Any]]:
+        """
+        The buckets of `series` between `first_bucket` and `last_bucket` (inclusive, string order).
+        """
+        query_params = {
+            'KeyConditionExpression': boto3.dynamodb.conditions.Key('series').eq(series)
+                                      & boto3.dynamodb.conditions.Key('bucket').between(first_bucket, last_bucket)
+        }
+        items = []
+        while True:
+            response = await self._run(self.table.query, **query_params)
+            items.extend(response.get('Items', []))
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return items
+            query_params['ExclusiveStartKey'] = last_key
+
+    async def get_by_id(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Implements the abstract 'get_by_id' method.
+        NOTE: counters have a composite key (series, bucket); use get_bucket instead.
+        """
+        raise ValueError("AnalyticsCounterRepository requires a composite key (series, bucket); use get_bucket.")
+
+    async def create(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        await self._run(self.table.put_item, Item=item)
+        return item
+
+    async def update(self, item_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        raise ValueError("Counters are only changed through add.")
+
+    async def delete(self, item_id: str) -> bool:
+        raise ValueError("Counters expire through TTL.")
+
+    async def query(self, **kwargs) -> List[Dict[str, Any]]:
+        return [item async for item in self.scan_all()]
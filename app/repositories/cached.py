@@ -0,0 +1,187 @@
+# app/repositories/cached.py
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.core.cache import CacheBackend
+from app.core.config import settings
+from app.repositories.user import UserRepository
+from app.repositories.event import EventRepository
+from app.repositories.single_table import SingleTableUserRepository, SingleTableEventRepository
+
+class ReadThroughCacheMixin:
+    """
+    Read-through caching for repository lookups.
+    Items are cached under their id; secondary lookups (slug, email) only cache the id they
+    resolved to and re-validate it against the item on read, so an update that changes the
+    slug/email never serves a stale match. "Not found" results are cached for a shorter TTL.
+    """
+    cache: CacheBackend
+    cache_namespace: str
+
+    def _cache_key(self, attribute: str, value: str) -> str:
+        return f"{self.cache_namespace}:{attribute}:{value}"
+
+    async def _remember(self, item_id: str, item: Optional[Dict[str, Any]]) -> None:
+        ttl = settings.CACHE_TTL_SECONDS if item is not None else settings.CACHE_NEGATIVE_TTL_SECONDS
+        await self.cache.set(self._cache_key('id', item_id), {'item': item}, ttl)
+
+    async def _cached_by_id(self, item_id: str, loader: Callable[[str], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        entry = await self.cache.get(self._cache_key('id', item_id))
+        if entry is not None:
+            if entry['item'] is None:
+                self.cache.stats.negative_hits += 1
+            return entry['item']
+        item = await loader(item_id)
+        await self._remember(item_id, item)
+        return item
+
+    async def batch_get_by_ids(self, item_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        items: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for item_id in dict.fromkeys(item_ids):
+            entry = await self.cache.get(self._cache_key('id', item_id))
+            if entry is None:
+                missing.append(item_id)
+            elif entry['item'] is not None:
+                items[item_id] = entry['item']
+            else:
+                self.cache.stats.negative_hits += 1
+
+        if missing:
+            fetched = await super().batch_get_by_ids(missing)
+            for item_id in missing:
+                await self._remember(item_id, fetched.get(item_id))
+            items.update(fetched)
+        return items
+
+    async def _cached_by_attribute(
+        self,
+        attribute: str,
+        value: str,
+        loader: Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        key = self._cache_key(attribute, value)
+        entry = await self.cache.get(key)
+        if entry is not None:
+            if entry['id'] is None:
+                self.cache.stats.negative_hits += 1
+                return None
+            item = await self.get_by_id(entry['id'])
+            if item is not None and item.get(attribute) == value:
+                return item
+
+        item = await loader(value)
+        if item is None:
+            await self.cache.set(key, {'id': None}, settings.CACHE_NEGATIVE_TTL_SECONDS)
+        else:
+            await self.cache.set(key, {'id': item['id']}, settings.CACHE_TTL_SECONDS)
+            await self._remember(item['id'], item)
+        return item
+
+    async def invalidate(self, item_id: str) -> None:
+        await self.cache.delete(self._cache_key('id', item_id))
+
+    async def _after_write(self, item_id: str, item: Optional[Dict[str, Any]], attribute: str) -> None:
+        # Drop any cached "not found" for the (possibly new) secondary key, then write the item through.
+        if item is None:
+            await self.cache.delete(self._cache_key('id', item_id))
+            return
+        if item.get(attribute) is not None:
+            await self.cache.delete(self._cache_key(attribute, item[attribute]))
+        await self._remember(item_id, item)
+
+
+class CachedUserRepository(ReadThroughCacheMixin, UserRepository):
+    """
+    UserRepository with cached get_by_id / get_by_email.
+    Event counters changed by UserEventRepository are refreshed when the entry expires (CACHE_TTL_SECONDS),
+    unless the caller invalidates the user explicitly.
+    """
+    def __init__(self, db_client: Any, cache: CacheBackend):
+        super().__init__(db_client)
+        self.cache = cache
+        self.cache_namespace = self.table.name
+
+    async def get_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self._cached_by_id(user_id, super().get_by_id)
+
+    async def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        return await self._cached_by_attribute('email', email, super().get_by_email)
+
+    async def create(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        item = await super().create(user_data)
+        await self._after_write(item['id'], item, 'email')
+        return item
+
+    async def bulk_create(self, users_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        items, failed_ids = await super().bulk_create(users_data)
+        for item in items:
+            await self._after_write(item['id'], item, 'email')
+        return items, failed_ids
+
+    async def update(self, user_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        item = await super().update(user_id, updates)
+        await self._after_write(user_id, item, 'email')
+        return item
+
+    async def delete(self, user_id: str) -> bool:
+        deleted = await super().delete(user_id)
+        await self.cache.delete(self._cache_key('id', user_id))
+        return deleted
+
+
+class CachedEventRepository(ReadThroughCacheMixin, EventRepository):
+    """
+    EventRepository with cached get_by_id / get_by_slug.
+    """
+    def __init__(self, db_client: Any, cache: CacheBackend):
+        super().__init__(db_client)
+        self.cache = cache
+        self.cache_namespace = self.table.name
+
+    async def get_by_id(self, event_id: str) -> Optional[Dict[str, Any]]:
+        return await self._cached_by_id(event_id, super().get_by_id)
+
+    async def get_by_slug(self, slug: str) -> Optional[Dict[str, Any]]:
+        return await self._cached_by_attribute('slug', slug, super().get_by_slug)
+
+    async def create(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        item = await super().create(event_data)
+        await self._after_write(item['id'], item, 'slug')
+        return item
+
+    async def bulk_create(self, events_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        items, failed_ids = await super().bulk_create(events_data)
+        for item in items:
+            await self._after_write(item['id'], item, 'slug')
+        return items, failed_ids
+
+    async def update(self, event_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        item = await super().update(event_id, updates)
+        await self._after_write(event_id, item, 'slug')
+        return item
+
+    async def delete(self, event_id: str) -> bool:
+        deleted = await super().delete(event_id)
+        await self.cache.delete(self._cache_key('id', event_id))
+        return deleted
+
+    async def reserve_seats(self, event_id: str, requested: int) -> int:
+        seats = await super().reserve_seats(event_id, requested)
+        await self.invalidate(event_id)
+        return seats
+
+    async def release_seats(self, event_id: str, seats: int) -> None:
+        await super().release_seats(event_id, seats)
+        await self.invalidate(event_id)
+
+    async def set_registered_count(self, event_id: str, registered_count: int, expected: Optional[int]) -> bool:
+        updated = await super().set_registered_count(event_id, registered_count, expected)
+        await self.invalidate(event_id)
+        return updated
+
+
+class CachedSingleTableUserRepository(CachedUserRepository, SingleTableUserRepository):
+    pass
+
+
+class CachedSingleTableEventRepository(CachedEventRepository, SingleTableEventRepository):
+    pass
@@ -0,0 +1,204 @@
+# app/repositories/email_job.py
+import boto3
+import json
+import time
+from typing import Dict, Any, Optional, List
+from app.database.base_repository import BaseRepository
+from app.database.tables import EMAIL_JOBS
+from app.models.email_job import ACTIVE_JOB_STATUSES, JOB_RUNNING, EmailJob
+from botocore.exceptions import ClientError
+from datetime import datetime
+
+# Free-form request payloads are stored as JSON strings: DynamoDB rejects floats and empty sets.
+JSON_ATTRIBUTES = ('templateData', 'filters')
+
+
+class EmailJobRepository(BaseRepository):
+    """
+    Email campaign jobs. A worker owns a job through a lease (`leaseOwner` / `leaseExpiresAt`,
+    epoch seconds) taken with `claim` and renewed by every `save_progress`; progress writes are
+    conditional on still holding the lease, so a job whose worker died is resumed by exactly one
+    other worker once the lease has expired.
+    """
+    schema = EMAIL_JOBS
+
+    def __init__(self, db_client: Any):
+        super().__init__(self.schema.table_name, db_client)
+
+    async def get_by_id(self, job_id: str) -> Optional[Dict[str, Any]]:
+        response = await self._run(self.table.get_item, Key=self._key(job_id))
+        item = response.get('Item')
+        return self._from_item(item) if item else None
+
+    async def create(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
+        job = EmailJob(**job_data).model_dump()
+        item = {k: v for k, v in job.items() if v is not None}
+        for attribute in JSON_ATTRIBUTES:
+            if attribute in item:
+                item[attribute] = json.dumps(item[attribute])
+        item['activeStatus'] = job['status']
+        await self._run(self.table.put_item, Item=self._to_storage(item))
+        return job
+
+    @staticmethod
+    def _from_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        item = dict(item)
+        for attribute in JSON_ATTRIBUTES:
+            if isinstance(item.get(attribute), str):
+                item[attribute] = json.loads(item[attribute])
+        return item
+
+    async def update(self, job_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        updates['updatedAt'] = datetime.utcnow().isoformat()
+        for attribute in JSON_ATTRIBUTES:
+            if attribute in updates:
+                updates[attribute] = json.dumps(updates[attribute])
+
+        update_expression = "SET " + ", ".join([f"#{k} = :{k}" for k in updates.keys()])
+        expression_attribute_names = {f"#{k}": k for k in updates.keys()}
+        expression_attribute_values = {f":{k}": v for k, v in updates.items()}
+
+        try:
+            response = await self._run(self.table.update_item,
+                Key=self._key(job_id),
+                UpdateExpression=update_expression,
+                ExpressionAttributeNames=expression_attribute_names,
+                ExpressionAttributeValues=expression_attribute_values,
+                ConditionExpression='attribute_exists(id)',
+                ReturnValues="ALL_NEW"
+            )
+            return self._from_item(response['Attributes'])
+        except ClientError as e:
+            return None
+
+    async def delete(self, job_id: str) -> bool:
+        try:
+            await self._run(self.table.delete_item, Key=self._key(job_id))
+            return True
+        except ClientError as e:
+            return False
+
+    async def query(self, **kwargs) -> List[Dict[str, Any]]:
+        return [self._from_item(item) async for item in self.scan_all()]
+
+    async def list_active_ids(self) -> List[str]:
+        """
+        Ids of the queued and running jobs, oldest first per status (sparse ActiveJobsIndex).
+        """
+        job_ids = []
+        for status in ACTIVE_JOB_STATUSES:
+            query_params = {
+                'IndexName': 'ActiveJobsIndex',
+                'KeyConditionExpression': boto3.dynamodb.conditions.Key('activeStatus').eq(status)
+            }
+            while True:
+                response = await self._run(self.table.query, **query_params)
+                job_ids.extend(self._item_id(item) for item in response.get('Items', []))
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key:
+                    break
+                query_params['ExclusiveStartKey'] = last_key
+        return job_ids
+
+    async def claim(self, job_id: str, owner: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Takes the lease of an unfinished job whose lease is free, expired or already ours, and
+        marks it running. Returns the job, or None if it finished or another worker holds it.
+        """
+        now = time.time()
+        try:
+            response = await self._run(self.table.update_item,
+                Key=self._key(job_id),
+                UpdateExpression='SET #status = :running, activeStatus = :running, leaseOwner = :owner, '
+                                 'leaseExpiresAt = :expires, updatedAt = :updated_at',
+                ConditionExpression='attribute_exists(activeStatus) AND (attribute_not_exists(leaseExpiresAt) '
+                                    'OR leaseExpiresAt < :now OR leaseOwner = :owner)',
+                ExpressionAttributeNames={'#status': 'status'},
+                ExpressionAttributeValues={
+                    ':running': JOB_RUNNING,
+                    ':owner': owner,
+                    ':expires': int(now + lease_seconds),
+                    ':now': int(now),
+                    ':updated_at': datetime.utcnow().isoformat()
+                },
+                ReturnValues='ALL_NEW'
+            )
+            return self._from_item(response['Attributes'])
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return None
+            raise e
+
+    async def save_progress(
+        self,
+        job_id: str,
+        owner: str,
+        sent: int,
+        failed: int,
+        failed_recipients: List[str],
+        checkpoint: Dict[str, Any],
+        lease_seconds: float
+    ) -> bool:
+        """
+        Records one processed batch and the position to resume from, and renews the lease,
+        in a single conditional write. Returns False if the lease was lost to another worker.
+        """
+        update_expression = ('ADD sentCount :sent, failedCount :failed '
+                             'SET #checkpoint = :checkpoint, leaseExpiresAt = :expires, updatedAt = :updated_at')
+        values = {
+            ':sent': sent,
+            ':failed': failed,
+            ':checkpoint': checkpoint,
+            ':expires': int(time.time() + lease_seconds),
+            ':updated_at': datetime.utcnow().isoformat(),
+            ':owner': owner
+        }
+        if failed_recipients:
+            update_expression += ', failedRecipients = list_append(if_not_exists(failedRecipients, :empty), :failed_recipients)'
+            values[':empty'] = []
+            values[':failed_recipients'] = failed_recipients
+        return await self._conditional_update(job_id, update_expression, values, {'#checkpoint': 'checkpoint'})
+
+    async def finish(self, job_id: str, owner: str, status: str, error: Optional[str] = None) -> bool:
+        """
+        Moves a job to its final status and takes it out of ActiveJobsIndex.
+        """
+        now = datetime.utcnow().isoformat()
+        values = {':status': status, ':completed_at': now, ':updated_at': now, ':owner': owner}
+        names = {'#status': 'status'}
+        update_expression = 'SET #status = :status, completedAt = :completed_at, updatedAt = :updated_at'
+        if error is not None:
+            update_expression += ', #error = :error'
+            values[':error'] = error
+            names['#error'] = 'error'
+        update_expression += ' REMOVE activeStatus, leaseOwner, leaseExpiresAt'
+        return await self._conditional_update(job_id, update_expression, values, names)
+
+    async def release(self, job_id: str, owner: str) -> bool:
+        """
+        Gives the lease up (on shutdown) so the job is resumed right away instead of after expiry.
+        """
+        return await self._conditional_update(job_id, 'SET leaseExpiresAt = :zero', {':zero': 0, ':owner': owner})
+
+    async def _conditional_update(
+        self,
+        job_id: str,
+        update_expression: str,
+        values: Dict[str, Any],
+        names: Optional[Dict[str, str]] = None
+    ) -> bool:
+        params = {
+            'Key': self._key(job_id),
+            'UpdateExpression': update_expression,
+            'ConditionExpression': 'leaseOwner = :owner',
+            'ExpressionAttributeValues': values
+        }
+        if names:
+            params['ExpressionAttributeNames'] = names
+        try:
+            await self._run(self.table.update_item, **params)
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise e
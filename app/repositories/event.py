@@ -1,83 +1,66 @@
 # app/repositories/event_repository.py
 import boto3
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from app.database.base_repository import BaseRepository
+from app.database.tables import EVENTS
+from app.repositories.event_search import INDEXED_FIELDS, EventSearchRepository
 from app.core.config import settings
 from app.models.event import Event
 from botocore.exceptions import ClientError
 from datetime import datetime
 import uuid
 
+# Optimistic attempts made by reserve_seats before giving up under heavy contention.
+MAX_RESERVE_ATTEMPTS = 5
+# Attributes the search postings derive from; other updates leave them alone.
+SEARCH_FIELDS = INDEXED_FIELDS + ('startAt',)
+
 
 class EventRepository(BaseRepository):
-    def __init__(self, db_client: Any):
-        super().__init__(f"{settings.DYNAMODB_TABLE_PREFIX}Events", db_client)
-        try:
-            self.table.load()
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'ResourceNotFoundException':
-                self._create_table(db_client)
-            else:
-                raise e
-
-    def _create_table(self, db_client: Any):
-        table_name = self.table.name
-
-        db_client.create_table(
-            TableName=table_name,
-            KeySchema=[
-                {'AttributeName': 'id', 'KeyType': 'HASH'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'id', 'AttributeType': 'S'},
-                {'AttributeName': 'slug', 'AttributeType': 'S'},
-                {'AttributeName': 'ownerId', 'AttributeType': 'S'}
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            },
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'SlugIndex',
-                    'KeySchema': [{'AttributeName': 'slug', 'KeyType': 'HASH'}],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                },
-                {
-                    'IndexName': 'OwnerIdIndex',
-                    'KeySchema': [{'AttributeName': 'ownerId', 'KeyType': 'HASH'}],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                }
-            ]
-        )
+    schema = EVENTS
 
-        self.table = db_client.Table(table_name)
-        self.table.wait_until_exists()
+    def __init__(self, db_client: Any):
+        super().__init__(self.schema.table_name, db_client)
+        # Search postings, kept in step by create / bulk_create / update / delete.
+        self.search_index = EventSearchRepository(db_client)
 
     async def get_by_id(self, event_id: str) -> Optional[Dict[str, Any]]:
-        response = self.table.get_item(Key={'id': event_id})
+        response = await self._run(self.table.get_item, Key=self._key(event_id))
         return response.get('Item')
 
     async def get_by_slug(self, slug: str) -> Optional[Dict[str, Any]]:
-        response = self.table.query(
+        response = await self._run(self.table.query,
             IndexName='SlugIndex',
             KeyConditionExpression=boto3.dynamodb.conditions.Key('slug').eq(slug)
         )
-        items = response.get('Items', [])
+        items = await self._hydrate('SlugIndex', response.get('Items', [])[:1])
         return items[0] if items else None
 
     async def create(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
-        event = Event(**event_data)
-
-        item_to_put = event.model_dump()
-        item_to_put['startAt'] = item_to_put['startAt'].isoformat()
-        item_to_put['endAt'] = item_to_put['endAt'].isoformat()
-
-        self.table.put_item(Item=item_to_put)
+        item_to_put = self._to_item(event_data)
+        await self._run(self.table.put_item, Item=self._to_storage(item_to_put))
+        await self.search_index.index([item_to_put])
         return item_to_put  # Return the standardized dict
 
+    async def bulk_create(self, events_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Creates many events with BatchWriteItem. Returns the created items and the ids that failed.
+        Does not check for existing slugs; callers are expected to dedupe first.
+        """
+        items = [self._to_item(event_data) for event_data in events_data]
+        failed = await self.batch_put([self._to_storage(item) for item in items])
+        failed_ids = {item['id'] for item in failed}
+        created = [item for item in items if item['id'] not in failed_ids]
+        await self.search_index.index(created)
+        return created, list(failed_ids)
+
+    @staticmethod
+    def _to_item(event_data: Dict[str, Any]) -> Dict[str, Any]:
+        item = Event(**event_data).model_dump()
+        item['startAt'] = item['startAt'].isoformat()
+        item['endAt'] = item['endAt'].isoformat()
+        return item
+
     async def update(self, event_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         updates['updatedAt'] = datetime.utcnow().isoformat()
 
@@ -91,24 +74,138 @@ class EventRepository(BaseRepository):
         expression_attribute_values = {f":{k}": v for k, v in updates.items()}
 
         try:
-            response = self.table.update_item(
-                Key={'id': event_id},
+            # The previous values tell which search postings to replace; SET-only, so the new
+            # item is the old one with the updates applied.
+            response = await self._run(self.table.update_item,
+                Key=self._key(event_id),
                 UpdateExpression=update_expression,
                 ExpressionAttributeNames=expression_attribute_names,
                 ExpressionAttributeValues=expression_attribute_values,
-                ReturnValues="ALL_NEW"
+                ReturnValues="ALL_OLD"
             )
-            return response.get('Attributes')
         except ClientError as e:
             return None
+        old_item = response.get('Attributes')
+        new_item = {**(old_item or {}), **self._key(event_id), **updates}
+        if old_item is None or any(field in updates for field in SEARCH_FIELDS):
+            await self.search_index.reindex(old_item, new_item)
+        return new_item
 
     async def delete(self, event_id: str) -> bool:
         try:
-            self.table.delete_item(Key={'id': event_id})
-            return True
+            response = await self._run(self.table.delete_item, Key=self._key(event_id), ReturnValues="ALL_OLD")
         except ClientError as e:
             return False
+        if response.get('Attributes'):
+            await self.search_index.reindex(response['Attributes'], None)
+        return True
 
     async def query(self, **kwargs) -> List[Dict[str, Any]]:
-        response = self.table.scan()
-        return response.get('Items', [])
\ No newline at end of file
+        return [item async for item in self.scan_all()]
+
+    async def list_page(
+        self,
+        limit: int = 20,
+        exclusive_start_key: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Returns one page of events and the LastEvaluatedKey to resume from (None on the last page).
+        """
+        scan_params = {}
+        scan_filter = self._scan_filter(None)
+        if scan_filter is not None:
+            scan_params['FilterExpression'] = scan_filter
+        items = []
+        last_key = exclusive_start_key
+        while len(items) < limit:
+            if last_key:
+                scan_params['ExclusiveStartKey'] = last_key
+            scan_params['Limit'] = limit - len(items)
+            response = await self._run(self.table.scan, **scan_params)
+            items.extend(response.get('Items', []))
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                break
+        return items, last_key
+
+    async def reserve_seats(self, event_id: str, requested: int) -> int:
+        """
+        Reserves up to `requested` seats with a single conditional ADD on `registeredCount`,
+        never letting it exceed `maxCapacity`. Returns how many seats were reserved
+        (0 if the event is full or does not exist).
+        """
+        for _ in range(MAX_RESERVE_ATTEMPTS):
+            response = await self._run(
+                self.table.get_item,
+                Key=self._key(event_id),
+                ConsistentRead=True,
+                ProjectionExpression='maxCapacity, registeredCount'
+            )
+            item = response.get('Item')
+            if not item:
+                return 0
+            capacity = int(item['maxCapacity'])
+            current = int(item.get('registeredCount', 0))
+            seats = min(requested, capacity - current)
+            if seats <= 0:
+                return 0
+
+            values = {':seats': seats, ':capacity': capacity}
+            if 'registeredCount' in item:
+                condition = 'registeredCount = :current AND maxCapacity = :capacity'
+                values[':current'] = current
+            else:
+                condition = 'attribute_not_exists(registeredCount) AND maxCapacity = :capacity'
+            try:
+                await self._run(
+                    self.table.update_item,
+                    Key=self._key(event_id),
+                    UpdateExpression='ADD registeredCount :seats',
+                    ConditionExpression=condition,
+                    ExpressionAttributeValues=values
+                )
+                return seats
+            except ClientError as e:
+                # Another registration moved the counter (or the capacity changed) since we read it; re-read and retry.
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise e
+        return 0
+
+    async def release_seats(self, event_id: str, seats: int) -> None:
+        """
+        Gives back seats reserved by reserve_seats that ended up unused.
+        """
+        if seats <= 0:
+            return
+        await self._run(
+            self.table.update_item,
+            Key=self._key(event_id),
+            UpdateExpression='ADD registeredCount :seats',
+            ConditionExpression='attribute_exists(id)',
+            ExpressionAttributeValues={':seats': -seats}
+        )
+
+    async def set_registered_count(self, event_id: str, registered_count: int, expected: Optional[int]) -> bool:
+        """
+        Overwrites `registeredCount`, provided it still holds `expected` (None meaning unset).
+        Returns False if it changed concurrently. Used by the counter backfill job.
+        """
+        values = {':count': registered_count}
+        if expected is None:
+            condition = 'attribute_exists(id) AND attribute_not_exists(registeredCount)'
+        else:
+            condition = 'attribute_exists(id) AND registeredCount = :expected'
+            values[':expected'] = expected
+        try:
+            await self._run(
+                self.table.update_item,
+                Key=self._key(event_id),
+                UpdateExpression='SET registeredCount = :count',
+                ConditionExpression=condition,
+                ExpressionAttributeValues=values
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise e
@@ -0,0 +1,220 @@
+# app/repositories/event_search.py
+"""
+Inverted index of events for search: one posting item per (term, event) in the EventSearch table,
+
+    term       w#<word>          every word of the title, venue and description
+               p#<prefix>        every prefix (MIN_PREFIX_LENGTH..MAX_PREFIX_LENGTH characters)
+                                 of the title and venue words, for search-as-you-type
+    posting    <startAt UTC>#<eventId>
+
+so the events matching a term come back from one Query, in start order, with a date range as a
+key condition. Postings are written by EventRepository.create/update/delete. A posting may be
+briefly stale (e.g. concurrent updates of one event), so searches check candidates against the
+event itself (see EventService.search_events).
+"""
+import asyncio
+import re
+import unicodedata
+import boto3
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from app.database.base_repository import BaseRepository, MAX_BATCH_WRITE_ITEMS, MAX_CONCURRENT_BATCH_WRITES
+from app.database.tables import EVENT_SEARCH
+
+WORD_PREFIX = 'w#'
+PREFIX_PREFIX = 'p#'
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_LENGTH = 10
+MAX_WORD_LENGTH = 64
+# Fields whose words are indexed, and those also indexed by prefix.
+INDEXED_FIELDS = ('title', 'venue', 'description')
+PREFIX_FIELDS = ('title', 'venue')
+# Too common to narrow a search down; neither indexed nor required to match.
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it', 'of',
+    'on', 'or', 'that', 'the', 'this', 'to', 'with',
+))
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cased words of `text`, accents removed."""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return [word[:MAX_WORD_LENGTH] for word in _WORD.findall(stripped)]
+
+
+def indexed_words(event: Dict[str, Any], fields: Iterable[str] = INDEXED_FIELDS) -> Set[str]:
+    return {word for field in fields for word in tokenize(event.get(field)) if word not in STOPWORDS}
+
+
+def event_terms(event: Dict[str, Any]) -> Set[str]:
+    terms = {f"{WORD_PREFIX}{word}" for word in indexed_words(event)}
+    for word in indexed_words(event, PREFIX_FIELDS):
+        terms.update(f"{PREFIX_PREFIX}{word[:length]}" for length in range(MIN_PREFIX_LENGTH, min(len(word), MAX_PREFIX_LENGTH) + 1))
+    return terms
+
+
+def parse_query(text: str) -> Tuple[List[str], Optional[str]]:
+    """
+    Splits a search box input into the whole words to match and, unless it ends with a space or
+    punctuation, the word still being typed (matched as a prefix; ignored below MIN_PREFIX_LENGTH).
+    """
+    words = tokenize(text)
+    prefix = words.pop() if words and text[-1:].isalnum() else None
+    if prefix is not None and len(prefix) < MIN_PREFIX_LENGTH:
+        prefix = None
+    return [word for word in dict.fromkeys(words) if word not in STOPWORDS], prefix
+
+
+def driving_terms(words: List[str], prefix: Optional[str]) -> List[str]:
+    """
+    The terms whose postings (merged) hold every match of a parsed query: the longest whole word,
+    the most selective, or else the word being typed, as a title/venue prefix or a whole word.
+    The rest of the query is checked against the candidates (see matches).
+    """
+    if words:
+        return [f"{WORD_PREFIX}{max(words, key=len)}"]
+    if prefix:
+        return [f"{PREFIX_PREFIX}{prefix[:MAX_PREFIX_LENGTH]}", f"{WORD_PREFIX}{prefix}"]
+    return []
+
+
+def matches(event: Dict[str, Any], words: List[str], prefix: Optional[str]) -> bool:
+    """Whether the event itself (not its possibly stale postings) matches a parsed query."""
+    event_words = indexed_words(event)
+    if not set(words) <= event_words:
+        return False
+    return (prefix is None or prefix in event_words
+            or any(word.startswith(prefix) for word in indexed_words(event, PREFIX_FIELDS)))
+
+
+def start_key(start_at: Any) -> str:
+    """`startAt` as naive UTC ISO 8601, so postings sort in time whatever offset it was given with."""
+    moment = start_at if isinstance(start_at, datetime) else datetime.fromisoformat(str(start_at))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.isoformat()
+
+
+class EventSearchRepository(BaseRepository):
+    schema = EVENT_SEARCH
+
+    def __init__(self, db_client: Any):
+        super().__init__(self.schema.table_name, db_client)
+
+    @staticmethod
+    def _postings(event: Dict[str, Any]) -> Tuple[Optional[str], Set[str]]:
+        if not event.get('id') or not event.get('startAt'):
+            return None, set()
+        return f"{start_key(event['startAt'])}#{event['id']}", event_terms(event)
+
+    async def index(self, events: List[Dict[str, Any]]) -> int:
+        """
+        Writes the postings of newly created events. Returns how many could not be written.
+        """
+        puts = []
+        for event in events:
+            posting, terms = self._postings(event)
+            puts.extend({'term': term, 'posting': posting, 'eventId': event['id']} for term in terms)
+        return await self._write(puts, [])
+
+    async def reindex(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> int:
+        """
+        Replaces the postings of `old` (the event before a change, None if it did not exist) with
+        those of `new` (None once deleted), writing only the difference. Returns how many writes failed.
+        """
+        old_posting, old_terms = self._postings(old or {})
+        new_posting, new_terms = self._postings(new or {})
+        if old_posting == new_posting:
+            old_terms, new_terms = old_terms - new_terms, new_terms - old_terms
+        deletes = [{'term': term, 'posting': old_posting} for term in old_terms]
+        puts = [{'term': term, 'posting': new_posting, 'eventId': new['id']} for term in new_terms]
+        return await self._write(puts, deletes)
+
+    async def _write(self, puts: List[Dict[str, Any]], deletes: List[Dict[str, Any]]) -> int:
+        requests = [{'PutRequest': {'Item': item}} for item in puts] + [{'DeleteRequest': {'Key': key}} for key in deletes]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCH_WRITES)
+
+        async def write(chunk: List[Dict[str, Any]]) -> int:
+            async with semaphore:
+                return len(await self._batch_write_chunk(chunk))
+
+        chunks = [requests[i:i + MAX_BATCH_WRITE_ITEMS] for i in range(0, len(requests), MAX_BATCH_WRITE_ITEMS)]
+        failed = sum(await asyncio.gather(*(write(chunk) for chunk in chunks)))
+        if failed:
+            print(f"Warning: {failed} event search postings were not written; run app.commands.rebuild_event_search.")
+        return failed
+
+    async def find_any(
+        self,
+        terms: List[str],
+        start_from: Optional[datetime] = None,
+        start_to: Optional[datetime] = None,
+        limit: int = 100,
+        after: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        The next postings after the posting key `after` of any of `terms`, merged in start order
+        (one per event), and the posting key to continue after (None once all are read). Reads one
+        page per term and returns the postings up to where the shortest page ends.
+        """
+        pages = await asyncio.gather(*(
+            self.find(term, start_from, start_to, limit, {'term': term, 'posting': after} if after else None)
+            for term in terms
+        ))
+        ends = [items[-1]['posting'] for items, last_key in pages if last_key and items]
+        bound = min(ends) if ends else None
+        merged = {posting['posting']: posting for items, _ in pages for posting in items
+                  if bound is None or posting['posting'] <= bound}
+        return [merged[key] for key in sorted(merged)], bound
+
+    async def find(
+        self,
+        term: str,
+        start_from: Optional[datetime] = None,
+        start_to: Optional[datetime] = None,
+        limit: int = 100,
+        exclusive_start_key: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        One page of the postings of `term` whose event starts between `start_from` and `start_to`
+        (inclusive, either may be open), in start order, and the LastEvaluatedKey to resume from.
+        """
+        Key = boto3.dynamodb.conditions.Key
+        key_condition = Key('term').eq(term)
+        # '~' sorts after every character of an event id, so `<to>#~` covers the events starting at `to`.
+        if start_from and start_to:
+            key_condition &= Key('posting').between(start_key(start_from), f"{start_key(start_to)}#~")
+        elif start_from:
+            key_condition &= Key('posting').gte(start_key(start_from))
+        elif start_to:
+            key_condition &= Key('posting').lte(f"{start_key(start_to)}#~")
+        query_params = {'KeyConditionExpression': key_condition, 'Limit': limit}
+        if exclusive_start_key:
+            query_params['ExclusiveStartKey'] = exclusive_start_key
+        response = await self._run(self.table.query, **query_params)
+        return response.get('Items', []), response.get('LastEvaluatedKey')
+
+    async def get_by_id(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Implements the abstract 'get_by_id' method.
+        NOTE: postings have a composite key (term, posting); use find instead.
+        """
+        raise ValueError("EventSearchRepository requires a composite key (term, posting); use find.")
+
+    async def create(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        await self._run(self.table.put_item, Item=item)
+        return item
+
+    async def update(self, item_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        raise ValueError("Postings are only changed through index / reindex.")
+
+    async def delete(self, item_id: str) -> bool:
+        raise ValueError("Postings are only changed through index / reindex.")
+
+    async def query(self, **kwargs) -> List[Dict[str, Any]]:
+        return [item async for item in self.scan_all()]
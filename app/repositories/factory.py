@@ -0,0 +1,36 @@
+# app/repositories/factory.py
+from typing import Any, Optional, Tuple
+from app.core.cache import CacheBackend
+from app.core.config import settings
+from app.repositories.user import UserRepository
+from app.repositories.event import EventRepository
+from app.repositories.user_event import UserEventRepository
+from app.repositories.single_table import (
+    SingleTableUserRepository, SingleTableEventRepository, SingleTableUserEventRepository
+)
+from app.repositories.cached import (
+    CachedUserRepository, CachedEventRepository, CachedSingleTableUserRepository, CachedSingleTableEventRepository
+)
+
+
+def create_repositories(
+    db_client: Any,
+    cache: Optional[CacheBackend] = None,
+    layout: Optional[str] = None
+) -> Tuple[UserRepository, EventRepository, UserEventRepository]:
+    """
+    Builds the user, event and registration repositories for the storage `layout`
+    (DYNAMODB_LAYOUT by default), with read-through caching when a `cache` is given.
+    """
+    single_table = (layout or settings.DYNAMODB_LAYOUT) == "single_table"
+    if single_table:
+        user_event_repo = SingleTableUserEventRepository(db_client)
+        if cache is None:
+            return SingleTableUserRepository(db_client), SingleTableEventRepository(db_client), user_event_repo
+        return (CachedSingleTableUserRepository(db_client, cache),
+                CachedSingleTableEventRepository(db_client, cache), user_event_repo)
+
+    user_event_repo = UserEventRepository(db_client)
+    if cache is None:
+        return UserRepository(db_client), EventRepository(db_client), user_event_repo
+    return CachedUserRepository(db_client, cache), CachedEventRepository(db_client, cache), user_event_repo
@@ -0,0 +1,127 @@
+# app/repositories/single_table.py
+"""
+Single-table storage layout (DYNAMODB_LAYOUT=single_table), an adjacency list in one table:
+
+    entity        PK                  SK                  entityType
+    user          USER#<userId>       USER#<userId>       USER
+    event         EVENT#<eventId>     EVENT#<eventId>     EVENT
+    registration  EVENT#<eventId>     REG#<userId>        REG
+
+An event and its registrations share a partition, so one Query on PK = EVENT#<id> returns the
+event followed by everyone registered to it. A user's registrations are read through
+InvertedIndex (SK = REG#<userId>). Items keep their regular attributes (id, userId, role, ...),
+so the repositories below only swap keys and key conditions; everything else is inherited.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import boto3.dynamodb.conditions as KeyC
+from boto3.dynamodb.conditions import Attr, ConditionBase
+from app.database.tables import SINGLE_TABLE
+from app.repositories.user import UserRepository
+from app.repositories.event import EventRepository
+from app.repositories.user_event import UserEventRepository
+
+USER_PREFIX = 'USER#'
+EVENT_PREFIX = 'EVENT#'
+REGISTRATION_PREFIX = 'REG#'
+
+
+def user_key(user_id: str) -> Dict[str, str]:
+    return {'PK': f"{USER_PREFIX}{user_id}", 'SK': f"{USER_PREFIX}{user_id}"}
+
+
+def event_key(event_id: str) -> Dict[str, str]:
+    return {'PK': f"{EVENT_PREFIX}{event_id}", 'SK': f"{EVENT_PREFIX}{event_id}"}
+
+
+def registration_key(user_id: str, event_id: str) -> Dict[str, str]:
+    return {'PK': f"{EVENT_PREFIX}{event_id}", 'SK': f"{REGISTRATION_PREFIX}{user_id}"}
+
+
+class SingleTableEntityMixin:
+    """
+    Key hooks for an entity stored under PK = SK = <prefix><id>.
+    """
+    entity_type: str
+    key_builder: Callable[[str], Dict[str, str]]
+
+    def _key(self, item_id: str) -> Dict[str, Any]:
+        return self.key_builder(item_id)
+
+    def _item_id(self, item: Dict[str, Any]) -> str:
+        return item['PK'].split('#', 1)[1]
+
+    def _to_storage(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return {**item, **self._key(item['id']), 'entityType': self.entity_type}
+
+    def _scan_filter(self, condition: Optional[ConditionBase]) -> Optional[ConditionBase]:
+        entity = Attr('entityType').eq(self.entity_type)
+        return entity if condition is None else condition & entity
+
+
+class SingleTableUserRepository(SingleTableEntityMixin, UserRepository):
+    schema = SINGLE_TABLE
+    entity_type = 'USER'
+    key_builder = staticmethod(user_key)
+
+
+class SingleTableEventRepository(SingleTableEntityMixin, EventRepository):
+    schema = SINGLE_TABLE
+    entity_type = 'EVENT'
+    key_builder = staticmethod(event_key)
+
+
+class SingleTableUserEventRepository(UserEventRepository):
+    schema = SINGLE_TABLE
+    entity_type = 'REG'
+
+    def __init__(self, db_client: Any):
+        super().__init__(db_client)
+        self.users_table_name = self.table.name
+        self.events_table_name = self.table.name
+
+    def _registration_key(self, user_id: str, event_id: str) -> Dict[str, Any]:
+        return registration_key(user_id, event_id)
+
+    def _user_key(self, user_id: str) -> Dict[str, Any]:
+        return user_key(user_id)
+
+    def _event_key(self, event_id: str) -> Dict[str, Any]:
+        return event_key(event_id)
+
+    def _to_storage(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return {**item, **registration_key(item['userId'], item['eventId']), 'entityType': self.entity_type}
+
+    def _scan_filter(self, condition: Optional[ConditionBase]) -> Optional[ConditionBase]:
+        entity = Attr('entityType').eq(self.entity_type)
+        return entity if condition is None else condition & entity
+
+    def _user_registrations_query(self, user_id: str) -> Dict[str, Any]:
+        return {
+            'IndexName': 'InvertedIndex',
+            'KeyConditionExpression': KeyC.Key('SK').eq(f"{REGISTRATION_PREFIX}{user_id}")
+        }
+
+    def _event_registrations_query(self, event_id: str) -> Dict[str, Any]:
+        return {
+            'KeyConditionExpression': KeyC.Key('PK').eq(f"{EVENT_PREFIX}{event_id}")
+                                      & KeyC.Key('SK').begins_with(REGISTRATION_PREFIX)
+        }
+
+    async def get_event_with_registrations(self, event_id: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        One (paginated) Query on the event's partition: the event item sorts first (EVENT# < REG#),
+        followed by its registrations.
+        """
+        query_params = {'KeyConditionExpression': KeyC.Key('PK').eq(f"{EVENT_PREFIX}{event_id}")}
+        event, registrations = None, []
+        while True:
+            response = await self._run(self.table.query, **query_params)
+            for item in response.get('Items', []):
+                if item.get('entityType') == 'EVENT':
+                    event = item
+                elif item.get('entityType') == self.entity_type:
+                    registrations.append(item)
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return event, (registrations if event else [])
+            query_params['ExclusiveStartKey'] = last_key
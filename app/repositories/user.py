@@ -1,96 +1,66 @@
 # app/repositories/user_repository.py
 
 import boto3
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List, Tuple
+from boto3.dynamodb.conditions import Attr, ConditionBase
 from app.database.base_repository import BaseRepository
+from app.database.parallel_scan import build_scan_params
+from app.database.tables import USERS
+from app.database.query_planner import IndexDefinition, plan_query
 from app.core.config import settings
 from app.models.user import User
 from botocore.exceptions import ClientError
 from datetime import datetime
+import asyncio
 import uuid
 
+# GSIs created in _create_table, ranked by how few users share a key value.
+USER_INDEXES = (
+    IndexDefinition('EmailIndex', 'email', selectivity=100),
+    IndexDefinition('CityStateIndex', 'city', range_key='state', selectivity=15),
+    IndexDefinition('CompanyIndex', 'company', selectivity=20),
+    IndexDefinition('JobTitleIndex', 'jobTitle', selectivity=10),
+)
+
 class UserRepository(BaseRepository):
+    schema = USERS
+
     def __init__(self, db_client: Any):
-        super().__init__(f"{settings.DYNAMODB_TABLE_PREFIX}Users", db_client)
-        try:
-            self.table.load()
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'ResourceNotFoundException':
-                self._create_table(db_client)
-            else:
-                raise e
-
-    def _create_table(self, db_client: Any):
-        table_name = self.table.name
-
-        db_client.create_table(
-            TableName=table_name,
-            KeySchema=[
-                {'AttributeName': 'id', 'KeyType': 'HASH'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'id', 'AttributeType': 'S'},
-                {'AttributeName': 'company', 'AttributeType': 'S'},
-                {'AttributeName': 'jobTitle', 'AttributeType': 'S'},
-                {'AttributeName': 'city', 'AttributeType': 'S'},
-                {'AttributeName': 'state', 'AttributeType': 'S'},
-                {'AttributeName': 'email', 'AttributeType': 'S'}
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            },
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'CompanyIndex',
-                    'KeySchema': [{'AttributeName': 'company', 'KeyType': 'HASH'}],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                },
-                {
-                    'IndexName': 'JobTitleIndex',
-                    'KeySchema': [{'AttributeName': 'jobTitle', 'KeyType': 'HASH'}],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                },
-                {
-                    'IndexName': 'CityStateIndex',
-                    'KeySchema': [
-                        {'AttributeName': 'city', 'KeyType': 'HASH'},
-                        {'AttributeName': 'state', 'KeyType': 'RANGE'}
-                    ],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                },
-                 {
-                    'IndexName': 'EmailIndex',
-                    'KeySchema': [{'AttributeName': 'email', 'KeyType': 'HASH'}],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                }
-            ]
-        )
-        self.table = db_client.Table(table_name)
-        self.table.wait_until_exists()
+        super().__init__(self.schema.table_name, db_client)
 
     async def get_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
-        response = self.table.get_item(Key={'id': user_id})
+        response = await self._run(self.table.get_item, Key=self._key(user_id))
         return response.get('Item')
 
     async def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
-        response = self.table.query(
+        response = await self._run(self.table.query,
             IndexName='EmailIndex',
             KeyConditionExpression=boto3.dynamodb.conditions.Key('email').eq(email)
         )
-        items = response.get('Items', [])
+        items = await self._hydrate('EmailIndex', response.get('Items', [])[:1])
         return items[0] if items else None
 
     async def create(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
-        user = User(**user_data)
-        item_to_put = user.model_dump()
-        self.table.put_item(Item=item_to_put)
+        item_to_put = self._to_item(user_data)
+        await self._run(self.table.put_item, Item=self._to_storage(item_to_put))
         return item_to_put
 
+    async def bulk_create(self, users_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Creates many users with BatchWriteItem. Returns the created items and the ids that failed.
+        Does not check for existing emails; callers are expected to dedupe first.
+        """
+        items = [self._to_item(user_data) for user_data in users_data]
+        failed = await self.batch_put([self._to_storage(item) for item in items])
+        failed_ids = {item['id'] for item in failed}
+        return [item for item in items if item['id'] not in failed_ids], list(failed_ids)
+
+    @staticmethod
+    def _to_item(user_data: Dict[str, Any]) -> Dict[str, Any]:
+        # Unset optional attributes are omitted rather than stored as NULL: several of them
+        # are GSI keys, and DynamoDB rejects NULL index keys (missing ones just stay out of the index).
+        return {k: v for k, v in User(**user_data).model_dump().items() if v is not None}
+
     async def update(self, user_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         updates['updatedAt'] = datetime.utcnow().isoformat()
         update_expression = "SET " + ", ".join([f"#{k} = :{k}" for k in updates.keys()])
@@ -98,8 +68,8 @@ class UserRepository(BaseRepository):
         expression_attribute_values = {f":{k}": v for k, v in updates.items()}
 
         try:
-            response = self.table.update_item(
-                Key={'id': user_id},
+            response = await self._run(self.table.update_item,
+                Key=self._key(user_id),
                 UpdateExpression=update_expression,
                 ExpressionAttributeNames=expression_attribute_names,
                 ExpressionAttributeValues=expression_attribute_values,
@@ -111,11 +81,138 @@ class UserRepository(BaseRepository):
 
     async def delete(self, user_id: str) -> bool:
         try:
-            self.table.delete_item(Key={'id': user_id})
+            await self._run(self.table.delete_item, Key=self._key(user_id))
             return True
         except ClientError as e:
             return False
 
     async def query(self, **kwargs) -> List[Dict[str, Any]]:
-        response = self.table.scan()
-        return response.get('Items', [])
\ No newline at end of file
+        return [item async for item in self.scan_all()]
+
+    async def find_by_attributes(
+        self,
+        criteria: Dict[str, Any],
+        count_ranges: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns every user whose attributes equal the given `criteria` and whose event counters
+        fall inside `count_ranges`, e.g. {'hostedCount': (1, None)} (bounds are inclusive).
+        Queries the most selective GSI covering the criteria and only falls back
+        to a parallel scan when none of them applies.
+        """
+        plan = plan_query(USER_INDEXES, criteria, self._count_filter(count_ranges or {}))
+        if plan.is_scan:
+            return [item async for item in self.scan_all(filter_expression=plan.filter_expression)]
+
+        request = plan.to_request()
+        items = []
+        while True:
+            response = await self._run(self.table.query, **request)
+            items.extend(response.get('Items', []))
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return await self._hydrate(plan.index_name, items)
+            request['ExclusiveStartKey'] = last_key
+
+    async def find_page(
+        self,
+        criteria: Dict[str, Any],
+        count_ranges: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None,
+        limit: int = 10,
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        projection: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Same matching rules as find_by_attributes, but returns at most `limit` users plus the
+        LastEvaluatedKey to resume from (None once the result set is exhausted).
+        With a `projection`, only those attributes are read and returned.
+        """
+        plan = plan_query(USER_INDEXES, criteria, self._count_filter(count_ranges or {}))
+        if plan.is_scan:
+            plan.filter_expression = self._scan_filter(plan.filter_expression)
+        request = plan.to_request()
+        if plan.is_scan and projection:
+            request.update(build_scan_params(projection))
+        operation = self.table.scan if plan.is_scan else self.table.query
+        items = []
+        last_key = exclusive_start_key
+        while len(items) < limit:
+            if last_key:
+                request['ExclusiveStartKey'] = last_key
+            # DynamoDB applies Limit before the FilterExpression, so a page never overshoots.
+            request['Limit'] = limit - len(items)
+            response = await self._run(operation, **request)
+            items.extend(response.get('Items', []))
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                break
+        if not plan.is_scan:
+            items = await self._hydrate(plan.index_name, items, projection)
+        return items, last_key
+
+    async def iter_pages(
+        self,
+        criteria: Dict[str, Any],
+        count_ranges: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None,
+        page_size: int = 100,
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        projection: Optional[List[str]] = None
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """
+        Streams every match of find_page, one page at a time with the LastEvaluatedKey to resume
+        after it. The next page is read while the caller works on the current one, so at most
+        two pages are held in memory.
+        """
+        def fetch(start_key: Optional[Dict[str, Any]]) -> asyncio.Future:
+            return asyncio.ensure_future(self.find_page(criteria, count_ranges, page_size, start_key, projection))
+
+        pending: Optional[asyncio.Future] = fetch(exclusive_start_key)
+        try:
+            while pending is not None:
+                items, last_key = await pending
+                pending = fetch(last_key) if last_key else None
+                yield items, last_key
+        finally:
+            if pending is not None:
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+
+    @staticmethod
+    def _count_filter(count_ranges: Dict[str, Tuple[Optional[int], Optional[int]]]) -> Optional[ConditionBase]:
+        # Users created before the counters existed have no counter attribute yet; treat that as 0.
+        condition = None
+        for counter, (minimum, maximum) in count_ranges.items():
+            if minimum:
+                bound = Attr(counter).gte(minimum)
+                condition = bound if condition is None else condition & bound
+            if maximum is not None:
+                bound = Attr(counter).not_exists() | Attr(counter).lte(maximum)
+                condition = bound if condition is None else condition & bound
+        return condition
+
+    async def set_event_counts(self, user_id: str, hosted_count: int, attended_count: int, expected: Dict[str, Any]) -> bool:
+        """
+        Overwrites the denormalized event counters of a user, provided they still hold the
+        `expected` values (so a concurrent registration is never lost). Returns False otherwise.
+        """
+        conditions = []
+        values = {':hosted': hosted_count, ':attended': attended_count}
+        for counter in ('hostedCount', 'attendedCount'):
+            if expected.get(counter) is None:
+                conditions.append(f"attribute_not_exists({counter})")
+            else:
+                conditions.append(f"{counter} = :old{counter}")
+                values[f":old{counter}"] = expected[counter]
+
+        try:
+            await self._run(self.table.update_item,
+                Key=self._key(user_id),
+                UpdateExpression="SET hostedCount = :hosted, attendedCount = :attended",
+                ConditionExpression="attribute_exists(id) AND " + " AND ".join(conditions),
+                ExpressionAttributeValues=values
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise e
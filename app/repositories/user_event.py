@@ -1,61 +1,38 @@
+import asyncio
 import boto3
 import boto3.dynamodb.conditions as KeyC
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, AsyncIterator, Optional, List, Set, Tuple
 from app.database.base_repository import BaseRepository
+from app.database.tables import USER_EVENTS, USERS, EVENTS
 from app.core.config import settings
 from botocore.exceptions import ClientError
 from datetime import datetime
 import uuid
 
+# Users per bulk_create_user_events transaction: a put and a counter update each, within the
+# 100-action TransactWriteItems limit.
+REGISTRATIONS_PER_TRANSACTION = 50
+# Upper bound on registration transactions kept in flight by bulk_create_user_events.
+MAX_CONCURRENT_REGISTRATION_WRITES = 16
+
+# Denormalized counter attribute kept on the user item for each counted role.
+ROLE_COUNTERS = {
+    'host': 'hostedCount',
+    'participant': 'attendedCount'
+}
+
+# Roles that occupy a seat, i.e. count towards the event's registeredCount / maxCapacity.
+SEATED_ROLES = {'participant'}
+WAITLIST_ROLE = 'waitlisted'
+
 class UserEventRepository(BaseRepository):
-    def __init__(self, db_client: Any):
-        super().__init__(f"{settings.DYNAMODB_TABLE_PREFIX}UserEvents", db_client)
-        try:
-            self.table.load()
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'ResourceNotFoundException':
-                self._create_table(db_client)
-            else:
-                raise e
+    schema = USER_EVENTS
 
-    def _create_table(self, db_client: Any):
-        """
-        Creates the UserEvents DynamoDB table with userId as HASH and eventId as RANGE key.
-        Also creates a GSI on EventIdIndex for reverse lookups.
-        """
-        table_name = self.table.name
-
-        db_client.create_table(
-            TableName=table_name,
-            KeySchema=[
-                {'AttributeName': 'userId', 'KeyType': 'HASH'},
-                {'AttributeName': 'eventId', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                # Only define attributes used in KeySchema (main table or GSI)
-                {'AttributeName': 'userId', 'AttributeType': 'S'},
-                {'AttributeName': 'eventId', 'AttributeType': 'S'}
-                # REMOVED: {'AttributeName': 'role', 'AttributeType': 'S'}
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            },
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'EventIdIndex',
-                    'KeySchema': [
-                        {'AttributeName': 'eventId', 'KeyType': 'HASH'},
-                        {'AttributeName': 'userId', 'KeyType': 'RANGE'}
-                    ],
-                    'Projection': {'ProjectionType': 'ALL'},
-                    'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                }
-            ]
-        )
+    def __init__(self, db_client: Any):
+        super().__init__(self.schema.table_name, db_client)
+        self.users_table_name = USERS.table_name
+        self.events_table_name = EVENTS.table_name
 
-        self.table = db_client.Table(table_name)
-        self.table.wait_until_exists()
     # --- Implementations for Abstract Methods from BaseRepository ---
     async def create(self, item_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -112,7 +89,10 @@ class UserEventRepository(BaseRepository):
     # --- Existing Specific Methods for UserEvent ---
     async def create_user_event(self, user_id: str, event_id: str, role: str) -> Dict[str, Any]:
         """
-        Creates a new UserEvent entry with the composite key.
+        Creates a new UserEvent entry with the composite key and, in the same transaction,
+        increments the matching event counter on the user item (skipped when there is no user
+        item, e.g. an event owned by an unknown user, rather than failing the link).
+        Fails with a ClientError if the user is already linked to the event.
         """
         item = {
             'userId': user_id,
@@ -121,14 +101,174 @@ class UserEventRepository(BaseRepository):
             'createdAt': datetime.utcnow().isoformat(),
             'updatedAt': datetime.utcnow().isoformat()
         }
-        self.table.put_item(Item=item)
+        actions = [{
+            'Put': {
+                'TableName': self.table.name,
+                'Item': self._to_storage(item),
+                'ConditionExpression': 'attribute_not_exists(userId)'
+            }
+        }]
+        counter_update = self._counter_update(user_id, {role: 1})
+        if counter_update:
+            actions.append(counter_update)
+
+        try:
+            await self._run(self.table.meta.client.transact_write_items, TransactItems=actions)
+        except ClientError as e:
+            codes = self._cancellation_codes(e)
+            if not (counter_update and codes and codes[0] == 'None' and codes[1] == 'ConditionalCheckFailed'):
+                raise e
+            # Only the user item is missing, so there is no counter to maintain on it.
+            await self._run(self.table.put_item, Item=self._to_storage(item), ConditionExpression='attribute_not_exists(userId)')
         return item
 
+    async def register_participant(self, user_id: str, event_id: str, waitlist: bool = False) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Registers the user as a participant in one transaction: the UserEvents put, an
+        `ADD registeredCount :1` on the event conditioned on `registeredCount < maxCapacity`,
+        and the user's attendedCount. When the event is full and `waitlist` is set, the user is
+        added with the 'waitlisted' role instead (no seat, no counters).
+
+        Returns (status, item) where status is one of 'registered', 'waitlisted',
+        'already_registered', 'full' or 'not_found' (user or event missing).
+        """
+        item = {
+            'userId': user_id,
+            'eventId': event_id,
+            'role': 'participant',
+            'createdAt': datetime.utcnow().isoformat(),
+            'updatedAt': datetime.utcnow().isoformat()
+        }
+        put = {
+            'Put': {
+                'TableName': self.table.name,
+                'Item': self._to_storage(item),
+                'ConditionExpression': 'attribute_not_exists(userId)'
+            }
+        }
+        actions = [put, self._seat_update(event_id, 1), self._counter_update(user_id, {'participant': 1})]
+        try:
+            await self._run(self.table.meta.client.transact_write_items, TransactItems=actions)
+            return 'registered', item
+        except ClientError as e:
+            codes = self._cancellation_codes(e)
+            if not codes:
+                raise e
+        if codes[0] == 'ConditionalCheckFailed':
+            return 'already_registered', await self.get_user_event(user_id, event_id)
+        if codes[2] == 'ConditionalCheckFailed':
+            return 'not_found', None
+        # The seat condition failed: either the event is full or it does not exist.
+        event = await self._run(
+            self.table.meta.client.get_item,
+            TableName=self.events_table_name,
+            Key=self._event_key(event_id),
+            ProjectionExpression='id'
+        )
+        if 'Item' not in event:
+            return 'not_found', None
+        if not waitlist:
+            return 'full', None
+
+        item['role'] = WAITLIST_ROLE
+        try:
+            await self._run(self.table.put_item, Item=self._to_storage(item), ConditionExpression='attribute_not_exists(userId)')
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise e
+            return 'already_registered', await self.get_user_event(user_id, event_id)
+        return 'waitlisted', item
+
+    async def get_waitlist(self, event_id: str) -> List[Dict[str, Any]]:
+        """
+        Returns the waitlisted registrations of an event, oldest first.
+        """
+        waitlist = [item async for item in self.iter_users_for_event(event_id, role=WAITLIST_ROLE)]
+        return sorted(waitlist, key=lambda item: item.get('createdAt', ''))
+
+    async def bulk_create_user_events(self, event_id: str, user_ids: List[str], role: str) -> Tuple[List[Dict[str, Any]], List[str], List[str]]:
+        """
+        Links every user in `user_ids` to the event and returns (written items, user ids already
+        linked to the event, user ids whose write failed), each in the order of `user_ids`.
+
+        Users are written REGISTRATIONS_PER_TRANSACTION per TransactWriteItems call, several in
+        flight: for each, the put conditioned on `attribute_not_exists(userId)` and the user's
+        counter, so a registration written concurrently (an overlapping batch,
+        register_participant) is reported as already linked instead of being overwritten and
+        counted twice. A cancelled transaction is retried without the users found already
+        linked, and without the counter of users that have no user item (as in create_user_event).
+        """
+        now = datetime.utcnow().isoformat()
+        items = {
+            user_id: {'userId': user_id, 'eventId': event_id, 'role': role, 'createdAt': now, 'updatedAt': now}
+            for user_id in dict.fromkeys(user_ids)
+        }
+        outcomes: Dict[str, str] = {}
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REGISTRATION_WRITES)
+
+        async def link(pending: List[str]) -> None:
+            uncounted: Set[str] = set()
+            async with semaphore:
+                while pending:
+                    actions, owners = [], []
+                    for user_id in pending:
+                        actions.append({
+                            'Put': {
+                                'TableName': self.table.name,
+                                'Item': self._to_storage(items[user_id]),
+                                'ConditionExpression': 'attribute_not_exists(userId)'
+                            }
+                        })
+                        owners.append((user_id, 'put'))
+                        counter_update = None if user_id in uncounted else self._counter_update(user_id, {role: 1})
+                        if counter_update:
+                            actions.append(counter_update)
+                            owners.append((user_id, 'counter'))
+                    try:
+                        await self._run(self.table.meta.client.transact_write_items, TransactItems=actions)
+                    except ClientError as e:
+                        codes = self._cancellation_codes(e)
+                        if 'ConditionalCheckFailed' not in codes:
+                            print(f"Warning: Could not link {len(pending)} users to event {event_id}: {e}")
+                            outcomes.update((user_id, 'failed') for user_id in pending)
+                            return
+                        for (user_id, action), code in zip(owners, codes):
+                            if code != 'ConditionalCheckFailed':
+                                continue
+                            if action == 'put':
+                                outcomes[user_id] = 'exists'
+                            else:
+                                # Only the user item is missing, so there is no counter to maintain on it.
+                                uncounted.add(user_id)
+                        pending = [user_id for user_id in pending if user_id not in outcomes]
+                        continue
+                    outcomes.update((user_id, 'written') for user_id in pending)
+                    return
+
+        ordered = list(items)
+        await asyncio.gather(*(
+            link(ordered[start:start + REGISTRATIONS_PER_TRANSACTION])
+            for start in range(0, len(ordered), REGISTRATIONS_PER_TRANSACTION)
+        ))
+        return (
+            [items[user_id] for user_id in ordered if outcomes.get(user_id) == 'written'],
+            [user_id for user_id in ordered if outcomes.get(user_id) == 'exists'],
+            [user_id for user_id in ordered if outcomes.get(user_id) == 'failed']
+        )
+
+    async def get_registered_user_ids(self, event_id: str, user_ids: List[str]) -> Set[str]:
+        """
+        Returns which of `user_ids` are already linked to the event (in any role), with BatchGetItem.
+        """
+        keys = [self._registration_key(user_id, event_id) for user_id in dict.fromkeys(user_ids)]
+        items = await self.batch_get_items(keys, projection=['userId'])
+        return {item['userId'] for item in items}
+
     async def get_user_event(self, user_id: str, event_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieves a specific UserEvent entry by its composite primary key.
         """
-        response = self.table.get_item(Key={'userId': user_id, 'eventId': event_id})
+        response = await self._run(self.table.get_item, Key=self._registration_key(user_id, event_id))
         return response.get('Item')
 
     async def get_events_for_user(self, user_id: str, role: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -136,42 +276,77 @@ class UserEventRepository(BaseRepository):
         Retrieves all events a user is involved in, optionally filtered by role.
         Uses the main table's primary key (userId).
         """
-        query_params = {
-            'KeyConditionExpression': KeyC.Key('userId').eq(user_id)
-        }
+        query_params = self._user_registrations_query(user_id)
         if role:
             query_params['FilterExpression'] = KeyC.Key('role').eq(role)
 
-        response = self.table.query(**query_params)
-        return response.get('Items', [])
+        items = []
+        while True:
+            response = await self._run(self.table.query, **query_params)
+            items.extend(response.get('Items', []))
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return items
+            query_params['ExclusiveStartKey'] = last_key
 
     async def get_users_for_event(self, event_id: str, role: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Retrieves all users involved in a specific event, optionally filtered by role.
         Uses the 'EventIdIndex' GSI.
         """
-        query_params = {
-            'IndexName': 'EventIdIndex',
-            'KeyConditionExpression': KeyC.Key('eventId').eq(event_id)
-        }
+        return [item async for item in self.iter_users_for_event(event_id, role)]
+
+    async def iter_users_for_event(self, event_id: str, role: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streams the UserEvents entries of an event page by page via the 'EventIdIndex' GSI,
+        without materializing the whole attendee list.
+        """
+        query_params = self._event_registrations_query(event_id)
         if role:
             query_params['FilterExpression'] = KeyC.Key('role').eq(role)
 
-        response = self.table.query(**query_params)
-        return response.get('Items', [])
+        while True:
+            response = await self._run(self.table.query, **query_params)
+            for item in response.get('Items', []):
+                yield item
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return
+            query_params['ExclusiveStartKey'] = last_key
+
+    async def get_event_with_registrations(self, event_id: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Returns the event item (None if it does not exist) together with all of its UserEvents entries.
+        """
+        response = await self._run(
+            self.table.meta.client.get_item,
+            TableName=self.events_table_name,
+            Key=self._event_key(event_id)
+        )
+        event = response.get('Item')
+        if event is None:
+            return None, []
+        return event, [item async for item in self.iter_users_for_event(event_id)]
 
     async def update_user_event(self, user_id: str, event_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Updates an existing UserEvent entry using its composite primary key.
+        A role change also moves the user's event counters within the same transaction.
         """
+        new_role = updates.get('role')
+        if new_role is not None:
+            current = await self.get_user_event(user_id, event_id)
+            if current and current.get('role') != new_role:
+                return await self._change_role(user_id, event_id, current['role'], updates)
+
         updates['updatedAt'] = datetime.utcnow().isoformat()
         update_expression = "SET " + ", ".join([f"#{k} = :{k}" for k in updates.keys()])
         expression_attribute_names = {f"#{k}": k for k in updates.keys()}
         expression_attribute_values = {f":{k}": v for k, v in updates.items()}
 
         try:
-            response = self.table.update_item(
-                Key={'userId': user_id, 'eventId': event_id},
+            response = await self._run(self.table.update_item,
+                Key=self._registration_key(user_id, event_id),
                 UpdateExpression=update_expression,
                 ExpressionAttributeNames=expression_attribute_names,
                 ExpressionAttributeValues=expression_attribute_values,
@@ -182,20 +357,170 @@ class UserEventRepository(BaseRepository):
             print(f"Error updating UserEvent: {e}")
             return None
 
+    async def _change_role(self, user_id: str, event_id: str, old_role: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        updates['updatedAt'] = datetime.utcnow().isoformat()
+        update_expression = "SET " + ", ".join([f"#{k} = :{k}" for k in updates.keys()])
+        expression_attribute_names = {f"#{k}": k for k in updates.keys()}
+        expression_attribute_values = {f":{k}": v for k, v in updates.items()}
+        expression_attribute_values[':expectedRole'] = old_role
+
+        actions = [{
+            'Update': {
+                'TableName': self.table.name,
+                'Key': self._registration_key(user_id, event_id),
+                'UpdateExpression': update_expression,
+                # Guards against a concurrent role change moving the counters twice.
+                'ConditionExpression': '#role = :expectedRole',
+                'ExpressionAttributeNames': {**expression_attribute_names, '#role': 'role'},
+                'ExpressionAttributeValues': expression_attribute_values
+            }
+        }]
+        seat_delta = (updates['role'] in SEATED_ROLES) - (old_role in SEATED_ROLES)
+        if seat_delta:
+            # Moving into a seated role (e.g. promoting a waitlisted user) is subject to maxCapacity.
+            actions.append(self._seat_update(event_id, seat_delta))
+        counter_update = self._counter_update(user_id, {old_role: -1, updates['role']: 1})
+        if counter_update:
+            actions.append(counter_update)
+
+        try:
+            await self._run(self.table.meta.client.transact_write_items, TransactItems=actions)
+        except ClientError as e:
+            print(f"Error updating UserEvent: {e}")
+            return None
+        return await self.get_user_event(user_id, event_id)
+
     async def delete_user_event(self, user_id: str, event_id: str) -> bool:
         """
-        Deletes a UserEvent entry using its composite primary key.
+        Deletes a UserEvent entry using its composite primary key and, in the same transaction,
+        decrements the matching event counter on the user item and frees the seat it held.
         """
+        current = await self.get_user_event(user_id, event_id)
+        if not current:
+            return True
+
+        actions = [{
+            'Delete': {
+                'TableName': self.table.name,
+                'Key': self._registration_key(user_id, event_id),
+                'ConditionExpression': '#role = :expectedRole',
+                'ExpressionAttributeNames': {'#role': 'role'},
+                'ExpressionAttributeValues': {':expectedRole': current.get('role')}
+            }
+        }]
+        if current.get('role') in SEATED_ROLES:
+            actions.append(self._seat_update(event_id, -1))
+        counter_update = self._counter_update(user_id, {current.get('role'): -1})
+        if counter_update:
+            actions.append(counter_update)
+
+        try:
+            await self._run(self.table.meta.client.transact_write_items, TransactItems=actions)
+            return True
+        except ClientError as e:
+            codes = self._cancellation_codes(e)
+            if codes and codes[0] == 'None' and 'ConditionalCheckFailed' in codes[1:]:
+                # The user or event item no longer exists, so there is no counter left to maintain on it.
+                remaining = [action for action, code in zip(actions, codes) if code != 'ConditionalCheckFailed']
+                return await self._delete_with(remaining)
+            print(f"Error deleting UserEvent: {e}")
+            return False
+
+    async def _delete_with(self, actions: List[Dict[str, Any]]) -> bool:
         try:
-            self.table.delete_item(Key={'userId': user_id, 'eventId': event_id})
+            await self._run(self.table.meta.client.transact_write_items, TransactItems=actions)
             return True
         except ClientError as e:
             print(f"Error deleting UserEvent: {e}")
             return False
 
+    async def aggregate_role_counts(self) -> Tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]]]:
+        """
+        Scans the whole UserEvents table once and returns ({userId: {role: count}}, {eventId: {role: count}}).
+        Used by the counter backfill job; never call this on the request path.
+        """
+        user_counts: Dict[str, Dict[str, int]] = {}
+        event_counts: Dict[str, Dict[str, int]] = {}
+        async for item in self.scan_all(projection=['userId', 'eventId', 'role']):
+            role = item.get('role')
+            for counts, key in ((user_counts, item['userId']), (event_counts, item['eventId'])):
+                entry = counts.setdefault(key, {})
+                entry[role] = entry.get(role, 0) + 1
+        return user_counts, event_counts
+
+    def _counter_update(self, user_id: str, role_deltas: Dict[str, int]) -> Optional[Dict[str, Any]]:
+        """
+        Builds the TransactWriteItems action applying `role_deltas` to the user's counters,
+        or None when none of the roles is counted.
+        """
+        counter_deltas: Dict[str, int] = {}
+        for role, delta in role_deltas.items():
+            counter = ROLE_COUNTERS.get(role)
+            if counter:
+                counter_deltas[counter] = counter_deltas.get(counter, 0) + delta
+        counter_deltas = {counter: delta for counter, delta in counter_deltas.items() if delta}
+        if not counter_deltas:
+            return None
+
+        return {
+            'Update': {
+                'TableName': self.users_table_name,
+                'Key': self._user_key(user_id),
+                'UpdateExpression': "ADD " + ", ".join([f"#{c} :{c}" for c in counter_deltas]),
+                # Never let the ADD create a stub item for a user that does not exist.
+                'ConditionExpression': 'attribute_exists(id)',
+                'ExpressionAttributeNames': {f"#{c}": c for c in counter_deltas},
+                'ExpressionAttributeValues': {f":{c}": d for c, d in counter_deltas.items()}
+            }
+        }
+
+    # --- Storage layout hooks, overridden by SingleTableUserEventRepository ---
+    def _registration_key(self, user_id: str, event_id: str) -> Dict[str, Any]:
+        return {'userId': user_id, 'eventId': event_id}
+
+    def _user_key(self, user_id: str) -> Dict[str, Any]:
+        return {'id': user_id}
+
+    def _event_key(self, event_id: str) -> Dict[str, Any]:
+        return {'id': event_id}
+
+    def _user_registrations_query(self, user_id: str) -> Dict[str, Any]:
+        return {'KeyConditionExpression': KeyC.Key('userId').eq(user_id)}
+
+    def _event_registrations_query(self, event_id: str) -> Dict[str, Any]:
+        return {
+            'IndexName': 'EventIdIndex',
+            'KeyConditionExpression': KeyC.Key('eventId').eq(event_id)
+        }
+
+    def _seat_update(self, event_id: str, delta: int) -> Dict[str, Any]:
+        """
+        Builds the TransactWriteItems action giving back (-1) or taking (+1) a seat on the event.
+        Taking a seat is conditioned on the event existing and not being full.
+        """
+        values = {':delta': delta}
+        if delta > 0:
+            # Condition expressions cannot do arithmetic, hence one seat per transaction.
+            condition = '(attribute_not_exists(registeredCount) AND maxCapacity > :zero) OR registeredCount < maxCapacity'
+            values[':zero'] = 0
+        else:
+            condition = 'attribute_exists(id)'
+        return {
+            'Update': {
+                'TableName': self.events_table_name,
+                'Key': self._event_key(event_id),
+                'UpdateExpression': 'ADD registeredCount :delta',
+                'ConditionExpression': condition,
+                'ExpressionAttributeValues': values
+            }
+        }
+
+    @staticmethod
+    def _cancellation_codes(error: ClientError) -> List[str]:
+        return [reason.get('Code') for reason in error.response.get('CancellationReasons', [])]
+
     async def query(self, **kwargs) -> List[Dict[str, Any]]:
         """
-        Performs a generic SCAN operation on the UserEvents table.
+        Performs a generic (parallel) SCAN operation on the UserEvents table.
         """
-        response = self.table.scan()
-        return response.get('Items', [])
\ No newline at end of file
+        return [item async for item in self.scan_all()]
\ No newline at end of file
@@ -1,14 +1,103 @@
 # app/services/analytics_service.py
-from typing import Dict, Any, List
-from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
+from app.database.counter_buffer import CounterBuffer
+from app.database.ndjson_segments import NdjsonSegmentWriter
+from app.database.write_buffer import WriteBuffer
+from app.repositories.analytics_counters import AnalyticsCounterRepository
+import asyncio
+import uuid
+
+# Record kinds, the `kind` attribute of stored analytics records.
+EMAIL_STATUS = "email_status"
+ENGAGEMENT = "engagement"
+
+# Delivery counter series: all emails, per campaign (email job id) and per UTM campaign.
+EMAIL_SERIES = "email"
+# Counter buckets: all-time, per UTC hour and per UTC minute (the latter two expire through TTL).
+TOTAL_BUCKET = "total"
+HOUR_BUCKET_RETENTION = timedelta(days=90)
+MINUTE_BUCKET_RETENTION = timedelta(days=2)
+
+def _hour_bucket(timestamp: str) -> str:
+    return f"h#{timestamp[:13]}" # YYYY-MM-DDTHH
+
+def _minute_bucket(timestamp: str) -> str:
+    return f"m#{timestamp[:16]}" # YYYY-MM-DDTHH:MM
+
+def _expires_at(timestamp: str, retention: timedelta) -> int:
+    # Timestamps are naive UTC; without the tzinfo .timestamp() would read them as local time.
+    return int((datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc) + retention).timestamp())
+
+def _bucket_expires_at(bucket: str) -> Optional[int]:
+    """Expiry of a counter bucket: its start plus its retention (None for the all-time bucket)."""
+    if bucket.startswith("h#"):
+        return _expires_at(f"{bucket[2:]}:00", HOUR_BUCKET_RETENTION)
+    if bucket.startswith("m#"):
+        return _expires_at(bucket[2:], MINUTE_BUCKET_RETENTION)
+    return None
 
 class AnalyticsService:
-    def __init__(self):
-        # In a real application, this service might interact with
-        # a database to store analytics data (e.g., DynamoDB, or a separate analytics store)
-        # For this basic implementation, we'll just track in memory or print.
-        # For persistent storage, you'd inject a repository here.
-        pass
+    def __init__(
+        self,
+        buffer: Optional[WriteBuffer] = None,
+        counter_repo: Optional[AnalyticsCounterRepository] = None,
+        engagement_listener: Optional[Callable[[Dict[str, Any]], None]] = None,
+        segment_writer: Optional[NdjsonSegmentWriter] = None
+    ):
+        # Records are queued in `buffer` and written in batches by its background task
+        # (to the AnalyticsEvents table or NDJSON segments, see init_dependencies).
+        # Delivery counters are aggregated in memory and added to `counter_repo` every
+        # ANALYTICS_COUNTER_FLUSH_INTERVAL. Without them nothing is stored.
+        # `engagement_listener` also receives every engagement record, when the engagement
+        # rollups cannot read them back from the table. `segment_writer`, the NDJSON sink behind
+        # `buffer` if any, has its open segment closed once the buffer is flushed.
+        self.buffer = buffer
+        self.segment_writer = segment_writer
+        self.engagement_listener = engagement_listener
+        self.counter_repo = counter_repo
+        self.counters = CounterBuffer(self._apply_counters, settings.ANALYTICS_COUNTER_FLUSH_INTERVAL) if counter_repo else None
+
+    def start(self) -> None:
+        if self.buffer is not None:
+            self.buffer.start()
+        if self.counters is not None:
+            self.counters.start()
+
+    async def close(self) -> None:
+        """
+        Writes out every queued record and counter; called at shutdown.
+        """
+        if self.buffer is not None:
+            await self.buffer.close()
+        if self.segment_writer is not None:
+            await self.segment_writer.close()
+        if self.counters is not None:
+            await self.counters.close()
+
+    async def _apply_counters(self, key: Tuple[str, str], deltas: Dict[str, int]) -> None:
+        series, bucket = key
+        await self.counter_repo.add(series, bucket, deltas, _bucket_expires_at(bucket))
+
+    def _count_email_status(self, entry: Dict[str, Any]) -> None:
+        if self.counters is None:
+            return
+        series = [EMAIL_SERIES]
+        if entry.get("campaignId"):
+            series.append(f"{EMAIL_SERIES}#campaign#{entry['campaignId']}")
+        if entry.get("utmCampaign"):
+            series.append(f"{EMAIL_SERIES}#utm#{entry['utmCampaign']}")
+        timestamp = entry["timestamp"]
+        buckets = (TOTAL_BUCKET, _hour_bucket(timestamp), _minute_bucket(timestamp))
+        for name in series:
+            for bucket in buckets:
+                self.counters.increment((name, bucket), entry["status"])
+
+    async def _record(self, entry: Dict[str, Any]) -> None:
+        if self.buffer is not None:
+            await self.buffer.put(entry)
 
     async def record_email_send_status(
         self,
@@ -23,6 +112,7 @@ class AnalyticsService:
         utm_campaign: str = None,
         utm_term: str = None,
         utm_content: str = None,
+        campaign_id: str = None, # email job id
     ) -> bool:
         """
         Records the status of an email sent to a user.
@@ -30,6 +120,8 @@ class AnalyticsService:
         """
         timestamp = datetime.utcnow().isoformat()
         log_entry = {
+            "id": str(uuid.uuid4()),
+            "kind": EMAIL_STATUS,
             "timestamp": timestamp,
             "userId": user_id,
             "email": email,
@@ -41,28 +133,65 @@ class AnalyticsService:
             "utmCampaign": utm_campaign,
             "utmTerm": utm_term,
             "utmContent": utm_content,
+            "campaignId": campaign_id,
         }
-        # print(f"Analytics: Email Status Recorded: {log_entry}")
-        # In a real app:
-        # await self.analytics_repository.create(log_entry)
+        # Only queued / counted in memory here; both are written in batches.
+        self._count_email_status(log_entry)
+        await self._record(log_entry)
         return True
 
-    async def get_email_delivery_summary(self) -> Dict[str, Any]:
+    async def record_email_events(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Records a batch of email statuses reported back by the email provider (delivered, opened,
+        clicked, ...), each already carrying its own `id` and `timestamp`. Counted and stored
+        like the statuses of record_email_send_status.
+        """
+        for event in events:
+            entry = {"kind": EMAIL_STATUS, **event}
+            self._count_email_status(entry)
+            await self._record(entry)
+
+    async def get_email_delivery_summary(self, campaign_id: Optional[str] = None, utm_campaign: Optional[str] = None) -> Dict[str, Any]:
         """
-        Provides a summary of email delivery (e.g., total sent, failed counts).
-        This would query your analytics storage.
+        Summary of email delivery, overall or for one campaign (email job id) or UTM campaign.
+        Read from the pre-aggregated counters: the all-time bucket plus at most ~85 hour and
+        minute buckets for the rolling last 24 hours, whatever the volume sent.
         """
-        # Placeholder: In a real app, query database for aggregated stats
+        series = EMAIL_SERIES
+        if campaign_id:
+            series = f"{EMAIL_SERIES}#campaign#{campaign_id}"
+        elif utm_campaign:
+            series = f"{EMAIL_SERIES}#utm#{utm_campaign}"
+
+        total, last_24_hours = Counter(), Counter()
+        if self.counter_repo is not None:
+            now = datetime.utcnow()
+            start = (now - timedelta(hours=24)).isoformat()
+            first_full_hour = (datetime.fromisoformat(start[:13]) + timedelta(hours=1)).isoformat()
+            # The partial first hour is read minute by minute, the rest hour by hour.
+            total_item, minute_items, hour_items = await asyncio.gather(
+                self.counter_repo.get_bucket(series, TOTAL_BUCKET),
+                self.counter_repo.get_range(series, _minute_bucket(start), f"m#{start[:13]}:59"),
+                self.counter_repo.get_range(series, _hour_bucket(first_full_hour), _hour_bucket(now.isoformat()))
+            )
+            total = self._counts(total_item)
+            for item in minute_items + hour_items:
+                last_24_hours.update(self._counts(item))
+
         return {
-            "total_emails_attempted": 0,
-            "total_emails_sent": 0,
-            "total_emails_failed": 0,
-            "last_24_hours": {
-                "sent": 0,
-                "failed": 0
-            }
+            "total_emails_attempted": total["sent"] + total["failed"],
+            "total_emails_sent": total["sent"],
+            "total_emails_failed": total["failed"],
+            "last_24_hours": {"sent": 0, "failed": 0, **last_24_hours}
         }
 
+    @staticmethod
+    def _counts(item: Optional[Dict[str, Any]]) -> Counter:
+        return Counter({
+            name: int(value) for name, value in (item or {}).items()
+            if name not in ("series", "bucket", "expiresAt")
+        })
+
     async def track_user_engagement(
         self,
         user_id: str,
@@ -78,6 +207,8 @@ class AnalyticsService:
         """
         timestamp = datetime.utcnow().isoformat()
         engagement_event = {
+            "id": str(uuid.uuid4()),
+            "kind": ENGAGEMENT,
             "timestamp": timestamp,
             "userId": user_id,
             "activityType": activity_type,
@@ -87,7 +218,7 @@ class AnalyticsService:
             "utmMedium": utm_medium,
             "utmCampaign": utm_campaign,
         }
-        # print(f"Analytics: User Engagement Recorded: {engagement_event}")
-        # In a real app:
-        # await self.analytics_repository.create_engagement_event(engagement_event)
+        if self.engagement_listener is not None:
+            self.engagement_listener(engagement_event)
+        await self._record(engagement_event)
         return True
\ No newline at end of file
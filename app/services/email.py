@@ -1,16 +1,35 @@
 from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+from sendgrid.helpers.mail import CustomArg, Mail, Personalization, Substitution, To
 from app.core.config import settings
-from typing import List, Dict, Any
-from app.models.user import User
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from app.core.exceptions import BadRequestException
+from app.models.user import Recipient
+from app.services.sendgrid_sender import MAX_PERSONALIZATIONS_PER_REQUEST, SendGridSender
+from app.services.templates import TemplateNotFoundError, TemplateRegistry
 import asyncio
+import html
+import json
 from app.services.analytics import AnalyticsService # Import
 
+# Recipient attributes a template may reference; everything else comes from the campaign.
+RECIPIENT_FIELDS = Recipient._fields
+# Campaign bodies kept rendered (all but the recipient fields); a campaign is sent as many batches.
+CAMPAIGN_CACHE_SIZE = 64
+
+def substitution_tag(field: str) -> str:
+    """Placeholder SendGrid replaces with the recipient's value (see _build_batch_message)."""
+    return f"-{field}-"
+
 class EmailService:
     def __init__(self, analytics_service: AnalyticsService): # Add analytics_service as dependency
         self.sg = SendGridAPIClient(settings.SENDGRID_API_KEY)
+        self.sender = SendGridSender(self.sg)
         self.sender_email = settings.SENDGRID_SENDER_EMAIL
         self.analytics_service = analytics_service # Store it
+        self.batch_size = min(settings.SENDGRID_BATCH_SIZE, MAX_PERSONALIZATIONS_PER_REQUEST)
+        self.templates = TemplateRegistry(settings.EMAIL_TEMPLATE_DIR)
+        self._campaign_bodies: "OrderedDict[tuple, Tuple[str, Tuple[str, ...]]]" = OrderedDict()
 
     async def send_single_email(self, recipient_email: str, subject: str, html_content: str) -> bool:
         message = Mail(
@@ -19,51 +38,132 @@ class EmailService:
             subject=subject,
             html_content=html_content
         )
+        result = await self.sender.send(message)
+        await self.analytics_service.record_email_send_status( # Record status
+            user_id="unknown_if_not_fetched", # You'd pass actual user_id here
+            email=recipient_email,
+            subject=subject,
+            status="sent" if result.success else "failed",
+            error_message=result.error
+        )
+        return result.success
+
+    def check_template(self, template_name: str) -> None:
+        """
+        Raises BadRequestException unless `template_name` is a local template or a SendGrid dynamic template.
+        """
+        if self._dynamic_template_id(template_name):
+            return
         try:
-            response = await asyncio.to_thread(self.sg.send, message)
-            success = 200 <= response.status_code < 300
-            await self.analytics_service.record_email_send_status( # Record status
-                user_id="unknown_if_not_fetched", # You'd pass actual user_id here
-                email=recipient_email,
-                subject=subject,
-                status="sent" if success else "failed",
-                error_message=str(response.body) if not success else None
-            )
-            return success
-        except Exception as e:
-            await self.analytics_service.record_email_send_status( # Record status on exception
-                user_id="unknown_if_not_fetched", # You'd pass actual user_id here
-                email=recipient_email,
-                subject=subject,
-                status="failed",
-                error_message=str(e)
-            )
-            return False
+            self.templates.get(template_name)
+        except TemplateNotFoundError:
+            raise BadRequestException(detail=f"Unknown email template '{template_name}'.")
+
+    async def send_bulk_emails(
+        self,
+        users: List[Recipient],
+        subject: str,
+        template_name: str,
+        template_data: Dict[str, Any],
+        campaign_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Sends one API request per `batch_size` recipients. With a local template the campaign's body
+        is rendered once and SendGrid fills in each recipient's fields from their personalization;
+        with a dynamic template SendGrid renders everything. Requests run concurrently, bounded
+        and retried by SendGridSender; a failed request fails all of its recipients.
+        Statuses are recorded under `campaign_id` (the email job id) when given.
+        """
+        dynamic_template_id = self._dynamic_template_id(template_name)
+        if dynamic_template_id:
+            build = lambda batch: self._build_dynamic_message(batch, subject, dynamic_template_id, template_data)
+        else:
+            html_content, fields = self._campaign_body(template_name, subject, template_data)
+            build = lambda batch: self._build_batch_message(batch, subject, html_content, fields)
+
+        batches = [users[i:i + self.batch_size] for i in range(0, len(users), self.batch_size)]
+        results = await asyncio.gather(*(self._send_batch(batch, subject, build(batch), campaign_id) for batch in batches))
 
-    async def send_bulk_emails(self, users: List[User], subject: str, template_name: str, template_data: Dict[str, Any]) -> Dict[str, Any]:
         sent_count = 0
-        failed_count = 0
         failed_recipients = []
+        for batch, success in zip(batches, results):
+            if success:
+                sent_count += len(batch)
+            else:
+                failed_recipients.extend(user.email for user in batch)
 
-        html_content = f"<html><body><h1>{subject}</h1><p>Dear user,</p><p>This is a test email.</p><p>{template_data.get('message', '')}</p></body></html>"
+        return {
+            "sent_count": sent_count,
+            "failed_count": len(failed_recipients),
+            "failed_recipients": failed_recipients
+        }
+
+    def _dynamic_template_id(self, template_name: str) -> Optional[str]:
+        if template_name in settings.SENDGRID_DYNAMIC_TEMPLATES:
+            return settings.SENDGRID_DYNAMIC_TEMPLATES[template_name]
+        return template_name if template_name.startswith("d-") else None
+
+    def _campaign_body(self, template_name: str, subject: str, template_data: Dict[str, Any]) -> Tuple[str, Tuple[str, ...]]:
+        """
+        The template rendered with the campaign values, the recipient fields left as substitution
+        tags, plus the recipient fields it uses. Cached per template version and campaign values.
+        """
+        template = self.templates.get(template_name)
+        cache_key = (template.name, template.version, subject, json.dumps(template_data, sort_keys=True, default=str))
+        cached = self._campaign_bodies.get(cache_key)
+        if cached is not None:
+            self._campaign_bodies.move_to_end(cache_key)
+            return cached
+
+        campaign_values = {k: v for k, v in template_data.items() if k not in RECIPIENT_FIELDS}
+        campaign_values.setdefault("subject", subject)
+        remaining = template.bind(campaign_values)
+        fields = tuple(field for field in remaining.fields if field in RECIPIENT_FIELDS)
+        # Tags go in raw; the recipient values SendGrid substitutes are escaped in _build_batch_message.
+        rendered = (remaining.render({field: substitution_tag(field) for field in fields}), fields)
 
-        tasks = []
+        self._campaign_bodies[cache_key] = rendered
+        if len(self._campaign_bodies) > CAMPAIGN_CACHE_SIZE:
+            self._campaign_bodies.popitem(last=False)
+        return rendered
+
+    def _build_batch_message(self, users: List[Recipient], subject: str, html_content: str, fields: Tuple[str, ...]) -> Mail:
+        message = Mail(from_email=self.sender_email, subject=subject, html_content=html_content)
         for user in users:
-            user_specific_html = html_content.replace("Dear user", f"Dear {user.firstName}")
-            # Pass user ID to send_single_email if available for analytics
-            tasks.append(self.send_single_email(user.email, subject, user_specific_html)) # Simplified for this example, user_id not passed
+            personalization = self._personalization(user)
+            for field in fields:
+                personalization.add_substitution(Substitution(substitution_tag(field), html.escape(getattr(user, field) or "")))
+            message.add_personalization(personalization)
+        return message
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    def _build_dynamic_message(self, users: List[Recipient], subject: str, template_id: str, template_data: Dict[str, Any]) -> Mail:
+        message = Mail(from_email=self.sender_email, subject=subject)
+        message.template_id = template_id
+        for user in users:
+            personalization = self._personalization(user)
+            personalization.dynamic_template_data = {"subject": subject, **template_data, **user._asdict()}
+            message.add_personalization(personalization)
+        return message
 
-        for i, result in enumerate(results):
-            if result is True:
-                sent_count += 1
-            else:
-                failed_count += 1
-                failed_recipients.append(users[i].email)
+    @staticmethod
+    def _personalization(user: Recipient) -> Personalization:
+        personalization = Personalization()
+        personalization.add_to(To(user.email))
+        if user.id:
+            personalization.add_custom_arg(CustomArg("user_id", user.id)) # echoed back in event webhooks
+        return personalization
 
-        return {
-            "sent_count": sent_count,
-            "failed_count": failed_count,
-            "failed_recipients": failed_recipients
-        }
\ No newline at end of file
+    async def _send_batch(self, users: List[Recipient], subject: str, message: Mail, campaign_id: Optional[str] = None) -> bool:
+        if campaign_id:
+            message.add_custom_arg(CustomArg("campaign_id", campaign_id)) # echoed back in event webhooks
+        result = await self.sender.send(message)
+        for user in users:
+            await self.analytics_service.record_email_send_status(
+                user_id=user.id,
+                email=user.email,
+                subject=subject,
+                status="sent" if result.success else "failed",
+                error_message=result.error,
+                campaign_id=campaign_id
+            )
+        return result.success
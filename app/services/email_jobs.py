@@ -0,0 +1,163 @@
+# app/services/email_jobs.py
+"""
+Email campaigns run as background jobs: `submit` stores the job and returns at once, and a worker
+task sends it one SendGrid batch at a time. After every batch the worker saves the sent/failed
+counts and the position to resume from (the checkpoint) in the job record, so a job interrupted
+by a restart or crash continues after its last saved batch instead of starting over. At worst
+the batch in flight when the process died is sent again.
+
+Each process resumes unfinished jobs at startup and then polls for jobs whose worker has gone
+away (lease expired, see EmailJobRepository).
+"""
+import asyncio
+import os
+import socket
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.apis.v1.schemas.email import SendEmailRequest
+from app.apis.v1.schemas.user import UserFilter
+from app.core.config import settings
+from app.core.exceptions import ThrottledException
+from app.models.email_job import JOB_COMPLETED, JOB_FAILED, EmailJob
+from app.models.user import Recipient
+from app.repositories.email_job import EmailJobRepository
+from app.services.email import EmailService
+from app.services.user import UserService
+
+
+class EmailJobService:
+    def __init__(self, job_repo: EmailJobRepository, email_service: EmailService, user_service: UserService):
+        self.job_repo = job_repo
+        self.email_service = email_service
+        self.user_service = user_service
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def submit(self, request: SendEmailRequest) -> EmailJob:
+        """
+        Stores the campaign and starts sending it in the background. Raises BadRequestException
+        for an unknown template.
+        """
+        self.email_service.check_template(request.template_name)
+        job = await self.job_repo.create({
+            "subject": request.subject,
+            "templateName": request.template_name,
+            "templateData": request.template_data,
+            "filters": request.filters.model_dump(exclude_none=True) if request.filters else None,
+            "recipientEmails": request.recipient_emails
+        })
+        self._spawn(job["id"])
+        return EmailJob(**job)
+
+    async def get_job(self, job_id: str) -> Optional[EmailJob]:
+        job = await self.job_repo.get_by_id(job_id)
+        return EmailJob(**job) if job else None
+
+    async def start(self) -> None:
+        """
+        Starts the poller, which resumes unfinished jobs right away and then every EMAIL_JOB_POLL_INTERVAL.
+        """
+        self._stopping = False
+        self._poller = asyncio.create_task(self._poll())
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Lets every running job finish the batch in flight, save its checkpoint and give its lease up,
+        so the next start resumes it without re-sending. Jobs still busy after `timeout`
+        (EMAIL_JOB_STOP_TIMEOUT) are cancelled.
+        """
+        self._stopping = True
+        if self._poller:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=settings.EMAIL_JOB_STOP_TIMEOUT if timeout is None else timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                for job_id in await self.job_repo.list_active_ids():
+                    self._spawn(job_id)
+            except Exception as e:
+                print(f"Error listing active email jobs: {e}")
+            await asyncio.sleep(settings.EMAIL_JOB_POLL_INTERVAL)
+
+    def _spawn(self, job_id: str) -> None:
+        if job_id not in self._tasks and not self._stopping:
+            self._tasks[job_id] = asyncio.create_task(self._run_job(job_id))
+
+    async def _run_job(self, job_id: str) -> None:
+        try:
+            job = await self.job_repo.claim(job_id, self.worker_id, settings.EMAIL_JOB_LEASE_SECONDS)
+            if job is None:
+                return # finished, or another worker holds it
+            try:
+                if await self._process(job):
+                    await self.job_repo.finish(job_id, self.worker_id, JOB_COMPLETED)
+                elif self._stopping:
+                    await self.job_repo.release(job_id, self.worker_id)
+            except asyncio.CancelledError:
+                await self.job_repo.release(job_id, self.worker_id)
+                raise
+            except ThrottledException:
+                # DynamoDB is over capacity: let the lease go, the poller picks the job up again.
+                await self.job_repo.release(job_id, self.worker_id)
+            except Exception as e:
+                print(f"Email job {job_id} failed: {e}")
+                await self.job_repo.finish(job_id, self.worker_id, JOB_FAILED, error=str(e))
+        finally:
+            self._tasks.pop(job_id, None)
+
+    async def _process(self, job: Dict[str, Any]) -> bool:
+        """
+        Sends the remaining batches of a claimed job. Returns False if it stopped early: the lease
+        was lost, or the service is stopping.
+        """
+        reported_failures = len(job.get("failedRecipients", []))
+        async for users, checkpoint in self._remaining_batches(job):
+            result = await self.email_service.send_bulk_emails(
+                users, job["subject"], job["templateName"], job.get("templateData", {}), campaign_id=job["id"]
+            )
+            failed_recipients = result["failed_recipients"][:max(0, settings.EMAIL_JOB_MAX_REPORTED_FAILURES - reported_failures)]
+            reported_failures += len(failed_recipients)
+            saved = await self.job_repo.save_progress(
+                job["id"], self.worker_id, result["sent_count"], result["failed_count"], failed_recipients,
+                checkpoint, settings.EMAIL_JOB_LEASE_SECONDS
+            )
+            if not saved or self._stopping:
+                return False
+        return True
+
+    async def _remaining_batches(self, job: Dict[str, Any]) -> AsyncIterator[Tuple[List[Recipient], Dict[str, Any]]]:
+        """
+        Yields the recipients of each batch still to send, with the checkpoint to save once it is sent:
+        an offset into an explicit recipient list, or the LastEvaluatedKey of a filtered user listing.
+        """
+        checkpoint = job.get("checkpoint") or {}
+        batch_size = self.email_service.batch_size
+
+        if job.get("recipientEmails") is not None:
+            emails = job["recipientEmails"]
+            offset = int(checkpoint.get("offset", 0))
+            while offset < len(emails):
+                chunk = emails[offset:offset + batch_size]
+                offset += len(chunk)
+                # No user record is looked up for explicit recipients; greet them by the local part.
+                yield [Recipient("", email, email.split("@")[0]) for email in chunk], {"offset": offset}
+            return
+
+        if checkpoint.get("done"):
+            return
+        filters = UserFilter(**(job.get("filters") or {}))
+        # Pages are resolved as the send progresses (the next one while the current batch is sent).
+        async for recipients, last_key in self.user_service.iter_recipients(filters, batch_size, checkpoint.get("lastKey")):
+            if recipients:
+                yield recipients, ({"lastKey": last_key} if last_key else {"done": True})
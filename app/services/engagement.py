@@ -0,0 +1,146 @@
+# app/services/engagement.py
+"""
+Engagement dashboards (funnels such as event_view -> registration_start -> event_attend) answered
+from columnar in-memory rollups instead of the raw AnalyticsEvents records.
+
+Every process keeps its own rollups of the last ANALYTICS_ROLLUP_WINDOW_HOURS: loaded from the
+table at startup, then followed every ANALYTICS_ROLLUP_REFRESH_INTERVAL by reading, per hour and
+shard, only the records after the last one ingested. Records younger than ANALYTICS_ROLLUP_LAG
+are left for the next round, so ones still waiting in another process' write buffer are not
+skipped. Without the table (ANALYTICS_SINK=ndjson) the rollups are fed by this process'
+AnalyticsService instead. In both cases hours past the window are trimmed every refresh interval.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+from app.repositories.analytics import WRITE_SHARDS, AnalyticsRepository
+from app.services.analytics import ENGAGEMENT
+from app.services.engagement_rollups import HOUR_SECONDS, EngagementRollups, hour_index
+
+DEFAULT_FUNNEL = ("event_view", "registration_start", "event_attend")
+# Hour/shard queries in flight while loading or following the table.
+MAX_CONCURRENT_READS = 16
+
+def _utc_isoformat(moment: datetime) -> str:
+    """Naive UTC ISO 8601, the format of record timestamps; naive datetimes are taken as UTC."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.isoformat()
+
+
+class EngagementAnalyticsService:
+    def __init__(self, analytics_repo: Optional[AnalyticsRepository] = None):
+        self.analytics_repo = analytics_repo
+        self.rollups = EngagementRollups(settings.ANALYTICS_ROLLUP_MAX_KEYS)
+        self._cursors: Dict[Tuple[str, int], str] = {} # (hour, shard) -> recordKey of the last record ingested
+        self._follower: Optional[asyncio.Task] = None
+
+    def ingest(self, record: Dict[str, Any]) -> None:
+        """Adds one engagement record to the rollups (the live feed used without the table)."""
+        self.rollups.ingest(record)
+
+    def start(self) -> None:
+        self._follower = asyncio.create_task(self._follow())
+
+    async def stop(self) -> None:
+        if self._follower:
+            self._follower.cancel()
+            await asyncio.gather(self._follower, return_exceptions=True)
+            self._follower = None
+
+    async def _follow(self) -> None:
+        hours_back = settings.ANALYTICS_ROLLUP_WINDOW_HOURS
+        while True:
+            try:
+                if self.analytics_repo is not None:
+                    await self._catch_up(hours_back)
+                    # After the initial load only the previous and the current hour receive records.
+                    hours_back = 1
+                self.rollups.trim(hour_index(datetime.utcnow().isoformat()) - settings.ANALYTICS_ROLLUP_WINDOW_HOURS)
+            except Exception as e:
+                print(f"Error following engagement records: {e}")
+            await asyncio.sleep(settings.ANALYTICS_ROLLUP_REFRESH_INTERVAL)
+
+    async def _catch_up(self, hours_back: int) -> None:
+        now = datetime.utcnow()
+        until = (now - timedelta(seconds=settings.ANALYTICS_ROLLUP_LAG)).isoformat()
+        hours = [(now - timedelta(hours=offset)).isoformat()[:13] for offset in range(hours_back, -1, -1)]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_READS)
+
+        async def read(hour: str, shard: int):
+            async with semaphore:
+                after = self._cursors.get((hour, shard))
+                return hour, shard, await self.analytics_repo.records_in_shard(ENGAGEMENT, hour, shard, after, until)
+
+        for hour, shard, records in await asyncio.gather(*(read(hour, shard) for hour in hours for shard in range(WRITE_SHARDS))):
+            for record in records:
+                self.rollups.ingest(record)
+            if records:
+                self._cursors[(hour, shard)] = records[-1]['recordKey']
+        # Only the cursors of the hours followed from now on are kept.
+        followed = set(hours[-2:])
+        self._cursors = {key: value for key, value in self._cursors.items() if key[0] in followed}
+
+    def get_funnel(
+        self,
+        start: datetime,
+        end: datetime,
+        steps: Sequence[str] = DEFAULT_FUNNEL,
+        event_id: Optional[str] = None,
+        utm_campaign: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Number of each step's activities between `start` and `end` (UTC, whole hours: the hour of
+        `end` is included), overall or for one event or UTM campaign, with the conversion of each
+        step from the previous and from the first one.
+        """
+        start_hour, end_hour = self._hours(start, end)
+        counts = self.rollups.funnel(steps, start_hour, end_hour, event_id, utm_campaign)
+        return {
+            "start": self._hour_start(start_hour),
+            "end": self._hour_start(end_hour),
+            "steps": self._steps(steps, counts)
+        }
+
+    def get_funnel_breakdown(
+        self,
+        by: str,
+        start: datetime,
+        end: datetime,
+        steps: Sequence[str] = DEFAULT_FUNNEL,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        The funnel of every event (`by="event"`) or UTM campaign (`by="utm_campaign"`) active in the
+        range, the `limit` with the most first-step activities first.
+        """
+        start_hour, end_hour = self._hours(start, end)
+        counts = self.rollups.breakdown(by, steps, start_hour, end_hour)
+        ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return {
+            "by": by,
+            "start": self._hour_start(start_hour),
+            "end": self._hour_start(end_hour),
+            "items": [{"key": key, "steps": self._steps(steps, values)} for key, values in ranked]
+        }
+
+    @staticmethod
+    def _hours(start: datetime, end: datetime) -> Tuple[int, int]:
+        return hour_index(_utc_isoformat(start)), hour_index(_utc_isoformat(end)) + 1
+
+    @staticmethod
+    def _hour_start(hour: int) -> str:
+        return datetime.utcfromtimestamp(hour * HOUR_SECONDS).isoformat()
+
+    @staticmethod
+    def _steps(steps: Sequence[str], counts: List[int]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "activity_type": step,
+                "count": count,
+                "conversion_from_previous": count / counts[index - 1] if index and counts[index - 1] else None,
+                "conversion_from_first": count / counts[0] if index and counts[0] else None,
+            }
+            for index, (step, count) in enumerate(zip(steps, counts))
+        ]
@@ -0,0 +1,128 @@
+# app/services/engagement_rollups.py
+"""
+Columnar in-memory rollups of engagement records: for the whole site, each event and each UTM
+campaign, one compact `array` column of per-hour counts per activity type, all columns of a
+rollup aligned on the same hour range. A dashboard query sums a slice of a few columns instead
+of reading raw records.
+"""
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+HOUR_SECONDS = 3600
+# Unsigned 32-bit counts: 4 bytes per activity type and hour.
+COUNT_TYPECODE = 'I'
+
+def hour_index(timestamp: str) -> int:
+    """Hours since the Unix epoch of a naive UTC ISO 8601 timestamp."""
+    return int(datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp()) // HOUR_SECONDS
+
+
+class ColumnarRollup:
+    __slots__ = ("base", "length", "columns")
+
+    def __init__(self):
+        self.base = 0 # hour index of position 0 of every column
+        self.length = 0
+        self.columns: Dict[str, array] = {}
+
+    def add(self, hour: int, activity: str, count: int = 1) -> None:
+        if self.length == 0:
+            self.base = hour
+        if hour < self.base:
+            self._grow_front(self.base - hour)
+        elif hour >= self.base + self.length:
+            self._grow_back(hour - self.base - self.length + 1)
+        column = self.columns.get(activity)
+        if column is None:
+            column = self.columns[activity] = array(COUNT_TYPECODE, [0]) * self.length
+        column[hour - self.base] += count
+
+    def total(self, activity: str, start_hour: int, end_hour: int) -> int:
+        """Count of `activity` over the hours [start_hour, end_hour)."""
+        column = self.columns.get(activity)
+        low, high = max(start_hour - self.base, 0), min(end_hour - self.base, self.length)
+        return sum(column[low:high]) if column is not None and low < high else 0
+
+    def trim(self, min_hour: int) -> None:
+        """Drops the hours before `min_hour`."""
+        drop = min(max(min_hour - self.base, 0), self.length)
+        if drop:
+            for column in self.columns.values():
+                del column[:drop]
+            self.base += drop
+            self.length -= drop
+
+    def _grow_back(self, hours: int) -> None:
+        zeros = array(COUNT_TYPECODE, [0]) * hours
+        for column in self.columns.values():
+            column.extend(zeros)
+        self.length += hours
+
+    def _grow_front(self, hours: int) -> None:
+        zeros = array(COUNT_TYPECODE, [0]) * hours
+        for activity, column in self.columns.items():
+            self.columns[activity] = zeros + column
+        self.base -= hours
+        self.length += hours
+
+
+class EngagementRollups:
+    def __init__(self, max_keys: int):
+        # Event ids and UTM campaigns come from clients: once `max_keys` of either have a rollup,
+        # records of a new one only count towards the overall rollup until trim() frees keys.
+        self.max_keys = max_keys
+        self.overall = ColumnarRollup()
+        self.by_event: Dict[str, ColumnarRollup] = {}
+        self.by_campaign: Dict[str, ColumnarRollup] = {}
+        self.untracked = 0 # records left out of a per-event / per-campaign rollup by max_keys
+
+    def ingest(self, record: Dict[str, Any]) -> None:
+        activity, timestamp = record.get("activityType"), record.get("timestamp")
+        if not activity or not timestamp:
+            return
+        hour = hour_index(timestamp)
+        self.overall.add(hour, activity)
+        for rollups, key in ((self.by_event, record.get("eventId")), (self.by_campaign, record.get("utmCampaign"))):
+            if not key:
+                continue
+            rollup = rollups.get(key)
+            if rollup is None:
+                if len(rollups) >= self.max_keys:
+                    self.untracked += 1
+                    continue
+                rollup = rollups[key] = ColumnarRollup()
+            rollup.add(hour, activity)
+
+    def rollup(self, event_id: Optional[str] = None, utm_campaign: Optional[str] = None) -> Optional[ColumnarRollup]:
+        if event_id:
+            return self.by_event.get(event_id)
+        if utm_campaign:
+            return self.by_campaign.get(utm_campaign)
+        return self.overall
+
+    def funnel(
+        self,
+        steps: Sequence[str],
+        start_hour: int,
+        end_hour: int,
+        event_id: Optional[str] = None,
+        utm_campaign: Optional[str] = None
+    ) -> List[int]:
+        """Count of each step over [start_hour, end_hour), overall or for one event / UTM campaign."""
+        rollup = self.rollup(event_id, utm_campaign)
+        return [rollup.total(step, start_hour, end_hour) if rollup else 0 for step in steps]
+
+    def breakdown(self, by: str, steps: Sequence[str], start_hour: int, end_hour: int) -> Dict[str, List[int]]:
+        """Step counts per event (`by="event"`) or per UTM campaign, for keys with any activity in the range."""
+        rollups = self.by_event if by == "event" else self.by_campaign
+        counts = {key: [rollup.total(step, start_hour, end_hour) for step in steps] for key, rollup in rollups.items()}
+        return {key: values for key, values in counts.items() if any(values)}
+
+    def trim(self, min_hour: int) -> None:
+        self.overall.trim(min_hour)
+        for rollups in (self.by_event, self.by_campaign):
+            for key in list(rollups):
+                rollups[key].trim(min_hour)
+                if rollups[key].length == 0:
+                    del rollups[key]
@@ -1,15 +1,32 @@
 # app/services/event_service.py
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 from app.repositories.event import EventRepository
-from app.repositories.user_event import UserEventRepository # Import UserEventRepository
-from app.apis.v1.schemas.event import EventCreate, EventUpdate
+from app.repositories.user_event import UserEventRepository, SEATED_ROLES
+from app.repositories.user import UserRepository
+from app.apis.v1.schemas.event import EventCreate, EventUpdate, PaginatedEventsResponse, BulkRegistrationResponse, RegistrationResponse, EventDetailResponse, EventSearchResponse
+from app.repositories.event_search import driving_terms, matches, parse_query, start_key
+from app.apis.v1.schemas.common import BulkItemResult, BulkCreateResponse
 from app.models.event import Event
-from app.core.exceptions import NotFoundException, BadRequestException
+from app.models.user import User
+from app.database.dataloader import DataLoader
+from app.core.exceptions import NotFoundException, BadRequestException, ConflictException
+from app.core.pagination import decode_cursor, encode_cursor, make_scope
+from pydantic import ValidationError
+from datetime import datetime
+import asyncio
+
+# Concurrent lookups / host registrations issued by a bulk import.
+MAX_CONCURRENT_BULK_CALLS = 16
+# Postings read per round of a search, and rounds per request before handing back a cursor
+# (a long run of non-matching candidates then costs a few round trips, not a scan).
+SEARCH_POSTINGS_PER_ROUND = 100
+MAX_SEARCH_ROUNDS = 5
 
 class EventService:
-    def __init__(self, event_repo: EventRepository, user_event_repo: UserEventRepository): # Inject UserEventRepository
+    def __init__(self, event_repo: EventRepository, user_event_repo: UserEventRepository, user_repo: UserRepository):
         self.event_repo = event_repo
-        self.user_event_repo = user_event_repo # Store it
+        self.user_event_repo = user_event_repo
+        self.user_repo = user_repo
 
     async def create_event(self, event_data: EventCreate) -> Event:
         event_dict = event_data.model_dump()
@@ -42,10 +59,201 @@ class EventService:
 
         return created_event
 
+    async def bulk_create_events(
+        self,
+        rows: List[Dict[str, Any]],
+        start_index: int = 0,
+        seen_keys: Optional[Set[str]] = None
+    ) -> BulkCreateResponse:
+        """
+        Validates each row against EventCreate, drops slugs repeated within the batch (or in
+        `seen_keys`, carried across the chunks of one upload) or already taken, writes the rest
+        with BatchWriteItem and registers each owner as a host. Reports a result per row.
+        """
+        seen_keys = set() if seen_keys is None else seen_keys
+        results: Dict[int, BulkItemResult] = {}
+        candidates: Dict[str, tuple] = {} # slug -> (index, EventCreate)
+        for offset, row in enumerate(rows):
+            index = start_index + offset
+            try:
+                if "__error__" in row:
+                    raise ValueError(row["__error__"])
+                event_create = EventCreate(**row)
+            except (ValidationError, ValueError, TypeError) as e:
+                results[index] = BulkItemResult(index=index, status="invalid", error=str(e))
+                continue
+            if event_create.slug in seen_keys:
+                results[index] = BulkItemResult(index=index, status="duplicate", error=f"Slug '{event_create.slug}' is repeated in this batch.")
+                continue
+            seen_keys.add(event_create.slug)
+            candidates[event_create.slug] = (index, event_create)
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BULK_CALLS)
+
+        async def bounded(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        existing = await asyncio.gather(*(bounded(self.event_repo.get_by_slug(slug)) for slug in candidates))
+        to_create = []
+        for (index, event_create), existing_event in zip(candidates.values(), existing):
+            if existing_event:
+                results[index] = BulkItemResult(index=index, status="exists", id=existing_event['id'],
+                                                error=f"Event with slug '{event_create.slug}' already exists.")
+                continue
+            if event_create.ownerId not in event_create.hosts:
+                event_create.hosts.append(event_create.ownerId)
+            to_create.append((index, Event(**event_create.model_dump())))
+
+        created, failed_ids = await self.event_repo.bulk_create([event.model_dump() for _, event in to_create])
+        failed_ids = set(failed_ids)
+        for index, event in to_create:
+            if event.id in failed_ids:
+                results[index] = BulkItemResult(index=index, status="failed", id=event.id, error="Write was not processed.")
+            else:
+                results[index] = BulkItemResult(index=index, status="created", id=event.id)
+
+        # Same owner-as-host registration as create_event, issued concurrently.
+        host_results = await asyncio.gather(
+            *(bounded(self.user_event_repo.create_user_event(user_id=item['ownerId'], event_id=item['id'], role="host"))
+              for item in created),
+            return_exceptions=True
+        )
+        for item, outcome in zip(created, host_results):
+            if isinstance(outcome, Exception):
+                print(f"Warning: Could not create UserEvent for owner {item['ownerId']} for event {item['id']}: {outcome}")
+
+        return BulkCreateResponse(
+            created_count=len(created),
+            failed_count=len(results) - len(created),
+            results=[results[index] for index in sorted(results)]
+        )
+
+    async def register(self, event_id: str, user_id: str, waitlist: bool = False) -> RegistrationResponse:
+        """
+        Registers a single participant. The capacity check is the conditional seat counter
+        update inside the registration transaction, so it holds under concurrent sign-ups.
+        """
+        outcome, item = await self.user_event_repo.register_participant(user_id, event_id, waitlist)
+        if outcome == 'not_found':
+            raise NotFoundException(detail="Event or user not found")
+        if outcome == 'full':
+            raise ConflictException(detail="Event is full.")
+        if outcome == 'already_registered':
+            raise ConflictException(detail=f"User is already registered to this event as '{item['role'] if item else 'unknown'}'.")
+        await self.event_repo.invalidate(event_id)
+        await self.user_repo.invalidate(user_id)
+        return RegistrationResponse(**item)
+
+    async def unregister(self, event_id: str, user_id: str) -> bool:
+        """
+        Removes a registration and, if it freed a seat, promotes the oldest waitlisted user.
+        Returns False if the user was not registered.
+        """
+        current = await self.user_event_repo.get_user_event(user_id, event_id)
+        if not current or not await self.user_event_repo.delete_user_event(user_id, event_id):
+            return False
+        await self.event_repo.invalidate(event_id)
+        await self.user_repo.invalidate(user_id)
+        if current.get('role') in SEATED_ROLES:
+            await self._promote_from_waitlist(event_id)
+        return True
+
+    async def _promote_from_waitlist(self, event_id: str) -> None:
+        # Only the head of the waitlist is tried: if it fails, the seat was taken concurrently.
+        waitlist = await self.user_event_repo.get_waitlist(event_id)
+        if not waitlist:
+            return
+        user_id = waitlist[0]['userId']
+        if await self.user_event_repo.update_user_event(user_id, event_id, {'role': 'participant'}):
+            await self.event_repo.invalidate(event_id)
+            await self.user_repo.invalidate(user_id)
+
+    async def bulk_register(self, event_id: str, user_ids: List[str]) -> Optional[BulkRegistrationResponse]:
+        """
+        Registers `user_ids` as participants of the event (None if the event does not exist).
+        Existence and prior registrations are checked with BatchGetItem, seats for the whole batch
+        are claimed with one conditional update of `registeredCount`, and each registration is
+        then written conditionally. Users that do not fit under maxCapacity are rejected in request
+        order; the seats of users registered concurrently in the meantime are given back.
+        """
+        if not await self.event_repo.get_by_id(event_id):
+            return None
+        user_ids = list(dict.fromkeys(user_ids))
+
+        existing_users = await self.user_repo.batch_get_by_ids(user_ids)
+        not_found = [user_id for user_id in user_ids if user_id not in existing_users]
+        candidates = [user_id for user_id in user_ids if user_id in existing_users]
+
+        registered_ids = await self.user_event_repo.get_registered_user_ids(event_id, candidates)
+        candidates = [user_id for user_id in candidates if user_id not in registered_ids]
+
+        seats = await self.event_repo.reserve_seats(event_id, len(candidates)) if candidates else 0
+        accepted, rejected_full = candidates[:seats], candidates[seats:]
+
+        written, existing_ids, failed_ids = await self.user_event_repo.bulk_create_user_events(event_id, accepted, "participant")
+        if existing_ids or failed_ids:
+            # Hand back the seats of registrations that already existed or could not be written,
+            # so a retry (or another sign-up) can claim them again.
+            await self.event_repo.release_seats(event_id, len(existing_ids) + len(failed_ids))
+        registered_ids.update(existing_ids)
+        failed_ids = set(failed_ids)
+
+        event = await self.event_repo.get_by_id(event_id)
+        return BulkRegistrationResponse(
+            registered=[item['userId'] for item in written],
+            already_registered=[user_id for user_id in user_ids if user_id in registered_ids],
+            not_found=not_found,
+            rejected_full=rejected_full,
+            failed=[user_id for user_id in accepted if user_id in failed_ids],
+            registered_count=event.get('registeredCount', 0) if event else 0
+        )
+
     async def get_event_by_id(self, event_id: str) -> Optional[Event]:
         event_data = await self.event_repo.get_by_id(event_id)
         return Event(**event_data) if event_data else None
 
+    async def get_event_hosts(self, event_id: str, users: DataLoader) -> Optional[List[User]]:
+        """
+        Returns the host profiles of an event (None if the event does not exist).
+        """
+        event = await self.get_event_by_id(event_id)
+        if not event:
+            return None
+        profiles = await users.load_many(event.hosts)
+        return [User(**profile) for profile in profiles if profile]
+
+    async def get_event_attendees(self, event_id: str, users: DataLoader) -> Optional[List[User]]:
+        """
+        Returns the profiles of an event's participants (None if the event does not exist).
+        """
+        if not await self.get_event_by_id(event_id):
+            return None
+        registrations = await self.user_event_repo.get_users_for_event(event_id, role="participant")
+        profiles = await users.load_many([registration['userId'] for registration in registrations])
+        return [User(**profile) for profile in profiles if profile]
+
+    async def get_event_detail(self, event_id: str, users: DataLoader) -> Optional[EventDetailResponse]:
+        """
+        The event with the profiles of its hosts, attendees and waitlist (None if the event does not exist).
+        The event and its registrations come from one repository call (a single Query in the
+        single-table layout); the profiles are then batched through the users loader.
+        """
+        event, registrations = await self.user_event_repo.get_event_with_registrations(event_id)
+        if event is None:
+            return None
+        profiles = await users.load_many([registration['userId'] for registration in registrations])
+        by_role: Dict[str, List[User]] = {}
+        for registration, profile in zip(registrations, profiles):
+            if profile:
+                by_role.setdefault(registration.get('role'), []).append(User(**profile))
+        return EventDetailResponse(
+            event=Event(**event),
+            hosts=by_role.get('host', []),
+            attendees=by_role.get('participant', []),
+            waitlisted=by_role.get('waitlisted', [])
+        )
+
     async def get_event_by_slug(self, slug: str) -> Optional[Event]:
         event_data = await self.event_repo.get_by_slug(slug)
         return Event(**event_data) if event_data else None
@@ -68,6 +276,63 @@ class EventService:
         # Consider deleting associated UserEvents here as well for cleanup
         return await self.event_repo.delete(event_id)
 
-    async def list_events(self) -> List[Event]:
-        events_data = await self.event_repo.query()
-        return [Event(**data) for data in events_data]
\ No newline at end of file
+    async def list_events(self, page_size: int = 20, cursor: Optional[str] = None) -> PaginatedEventsResponse:
+        events_data, last_key = await self.event_repo.list_page(
+            limit=page_size, exclusive_start_key=decode_cursor(cursor, "events")
+        )
+        return PaginatedEventsResponse(
+            items=[Event(**data) for data in events_data],
+            page_size=page_size,
+            next_cursor=encode_cursor(last_key, "events")
+        )
+
+    async def search_events(
+        self,
+        text: str,
+        start_from: Optional[datetime] = None,
+        start_to: Optional[datetime] = None,
+        page_size: int = 20,
+        cursor: Optional[str] = None
+    ) -> EventSearchResponse:
+        """
+        Events whose title, venue or description contain every word of `text` (the last one, while
+        it is being typed, also as a prefix of a title or venue word), optionally starting between
+        `start_from` and `start_to`, in start order. Reads the postings of the most selective
+        term(s) and checks each candidate against the event itself, so it never scans the events table.
+        """
+        if start_from and start_to and start_key(start_from) > start_key(start_to):
+            raise BadRequestException(detail="'start_from' must not be after 'start_to'.")
+        words, prefix = parse_query(text)
+        terms = driving_terms(words, prefix)
+        if not terms:
+            return EventSearchResponse(items=[], page_size=page_size)
+        scope = make_scope("event_search", {"words": words, "prefix": prefix, "start_from": start_from, "start_to": start_to})
+        after = (decode_cursor(cursor, scope) or {}).get('posting')
+
+        found: List[Dict[str, Any]] = []
+        for _ in range(MAX_SEARCH_ROUNDS):
+            postings, next_after = await self.event_repo.search_index.find_any(
+                terms, start_from, start_to, SEARCH_POSTINGS_PER_ROUND, after
+            )
+            events = await self.event_repo.batch_get_by_ids([posting['eventId'] for posting in postings])
+            for posting in postings:
+                event = events.get(posting['eventId'])
+                after = posting['posting']
+                # Postings can lag behind the event (deleted, retitled, rescheduled): only the one
+                # at the event's current start counts, and only if the event still matches.
+                if event and posting['posting'] == f"{start_key(event['startAt'])}#{event['id']}" and matches(event, words, prefix):
+                    found.append(event)
+                    if len(found) == page_size:
+                        break
+            if len(found) == page_size:
+                break
+            after = next_after
+            if after is None:
+                break
+
+        return EventSearchResponse(
+            items=[Event(**event) for event in found],
+            page_size=page_size,
+            next_cursor=encode_cursor({'posting': after} if after else None, scope)
+        )
+
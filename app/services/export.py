@@ -0,0 +1,83 @@
+# app/services/export.py
+import csv
+import io
+import json
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List
+from app.repositories.user import UserRepository
+from app.repositories.event import EventRepository
+from app.repositories.user_event import UserEventRepository
+from app.models.user import User
+from app.models.event import Event
+
+USER_EXPORT_FIELDS = list(User.model_fields)
+EVENT_EXPORT_FIELDS = list(Event.model_fields)
+ATTENDEE_EXPORT_FIELDS = ['userId', 'eventId', 'role', 'createdAt', 'updatedAt']
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Rows are written to the response in chunks of this many, to keep per-chunk overhead low.
+ROWS_PER_CHUNK = 500
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (list, set)):
+        return ";".join(str(v) for v in value)
+    return _json_default(value) if isinstance(value, Decimal) else value
+
+
+class ExportService:
+    def __init__(self, user_repo: UserRepository, event_repo: EventRepository, user_event_repo: UserEventRepository):
+        self.user_repo = user_repo
+        self.event_repo = event_repo
+        self.user_event_repo = user_event_repo
+
+    def export_users(self, export_format: str) -> AsyncIterator[bytes]:
+        return self._encode(self.user_repo.scan_all(projection=USER_EXPORT_FIELDS), USER_EXPORT_FIELDS, export_format)
+
+    def export_events(self, export_format: str) -> AsyncIterator[bytes]:
+        return self._encode(self.event_repo.scan_all(projection=EVENT_EXPORT_FIELDS), EVENT_EXPORT_FIELDS, export_format)
+
+    def export_attendees(self, event_id: str, export_format: str) -> AsyncIterator[bytes]:
+        rows = self.user_event_repo.iter_users_for_event(event_id)
+        return self._encode(rows, ATTENDEE_EXPORT_FIELDS, export_format)
+
+    def _encode(self, rows: AsyncIterator[Dict[str, Any]], fields: List[str], export_format: str) -> AsyncIterator[bytes]:
+        if export_format == "csv":
+            return self._csv_chunks(rows, fields)
+        return self._ndjson_chunks(rows, fields)
+
+    async def _ndjson_chunks(self, rows: AsyncIterator[Dict[str, Any]], fields: List[str]) -> AsyncIterator[bytes]:
+        lines = []
+        async for row in rows:
+            lines.append(json.dumps({field: row.get(field) for field in fields}, default=_json_default))
+            if len(lines) >= ROWS_PER_CHUNK:
+                yield ("\n".join(lines) + "\n").encode()
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode()
+
+    async def _csv_chunks(self, rows: AsyncIterator[Dict[str, Any]], fields: List[str]) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        pending = 0
+        async for row in rows:
+            writer.writerow([_csv_value(row.get(field)) for field in fields])
+            pending += 1
+            if pending >= ROWS_PER_CHUNK:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if buffer.tell():
+            yield buffer.getvalue().encode()
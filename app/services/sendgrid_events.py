@@ -0,0 +1,209 @@
+# app/services/sendgrid_events.py
+"""
+SendGrid Event Webhook ingestion. SendGrid POSTs events in batches (a JSON array, often thousands
+per body) and delivers them at least once, so the same event may arrive twice. The body is parsed
+as it streams in, events already seen (by `sg_event_id`) are dropped, and the rest are handed to
+AnalyticsService in batches as email status records. Bodies must carry a valid Signed Event
+Webhook signature, so nothing but SendGrid can feed the delivery counters.
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+from sendgrid.helpers.eventwebhook import EventWebhook
+from app.core.json_stream import iter_json_array
+from app.services.analytics import AnalyticsService
+
+SIGNATURE_HEADER = "X-Twilio-Email-Event-Webhook-Signature"
+TIMESTAMP_HEADER = "X-Twilio-Email-Event-Webhook-Timestamp"
+# Size of the slices a verified body is handed to the parser in.
+BODY_CHUNK_SIZE = 64 * 1024
+
+# SendGrid event type -> recorded email status (other event types are recorded as is).
+EVENT_STATUSES = {
+    "delivered": "delivered",
+    "open": "opened",
+    "click": "clicked",
+    "bounce": "bounced",
+    "dropped": "dropped",
+    "deferred": "deferred",
+    "processed": "processed",
+    "spamreport": "spam_reported",
+    "unsubscribe": "unsubscribed",
+    "group_unsubscribe": "unsubscribed",
+    "group_resubscribe": "resubscribed",
+}
+# Record ids derive from sg_event_id, so a duplicate that gets past the in-memory window (e.g.
+# delivered to another process) overwrites the same AnalyticsEvents item instead of adding one.
+_RECORD_ID_NAMESPACE = uuid.UUID("6f1c2a8e-1b7d-4c52-9a43-5e0f3d2b7c19")
+_UTM_PARAMETERS = {"utm_source": "utmSource", "utm_medium": "utmMedium", "utm_campaign": "utmCampaign",
+                   "utm_term": "utmTerm", "utm_content": "utmContent"}
+
+
+class WebhookSignatureError(ValueError):
+    pass
+
+
+class WebhookBodyTooLargeError(ValueError):
+    pass
+
+
+class SendGridEventIngestor:
+    def __init__(
+        self,
+        analytics_service: AnalyticsService,
+        batch_size: int = 500,
+        dedup_window: int = 500000,
+        verification_key: str = "",
+        max_age: int = 600,
+        max_body_bytes: int = 16 * 1024 * 1024
+    ):
+        self.analytics_service = analytics_service
+        self.batch_size = batch_size
+        # `verification_key` is the base64 public key SendGrid signs webhooks with; signatures
+        # older than `max_age` seconds are rejected as replays.
+        self._verifier = EventWebhook(verification_key) if verification_key else None
+        self.max_age = max_age
+        # Bodies are held whole until verified, so their size is bounded.
+        self.max_body_bytes = max_body_bytes
+        # Seen event ids in two generations: once the current one holds `dedup_window` ids it
+        # replaces the previous one, so between dedup_window and twice that many recent ids are remembered.
+        self.dedup_window = dedup_window
+        self._seen: Set[str] = set()
+        self._previously_seen: Set[str] = set()
+
+    async def ingest_signed(
+        self,
+        chunks: AsyncIterable[bytes],
+        signature: Optional[str],
+        timestamp: Optional[str],
+        content_length: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Checks the signature of one webhook body (the SIGNATURE_HEADER and TIMESTAMP_HEADER
+        values), then records its events with ingest. The body is received whole first, since no
+        event may be recorded before it is known to come from SendGrid; it is then parsed slice by
+        slice. Raises WebhookBodyTooLargeError, before reading past the limit, for a body (or
+        declared `content_length`) over max_body_bytes, and WebhookSignatureError for a missing,
+        invalid or stale signature.
+        """
+        body = await self._read_body(chunks, content_length)
+        self.verify(body, signature, timestamp)
+        return await self.ingest(_slices(body, BODY_CHUNK_SIZE))
+
+    async def _read_body(self, chunks: AsyncIterable[bytes], content_length: Optional[str]) -> bytes:
+        too_large = WebhookBodyTooLargeError(f"Event webhook body exceeds {self.max_body_bytes} bytes.")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            raise too_large
+        parts: List[bytes] = []
+        size = 0
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                raise too_large
+            parts.append(chunk)
+        return b"".join(parts)
+
+    def verify(self, body: bytes, signature: Optional[str], timestamp: Optional[str]) -> None:
+        if self._verifier is None:
+            raise WebhookSignatureError("Event webhook signature verification is not configured.")
+        if not signature or not timestamp:
+            raise WebhookSignatureError("Missing event webhook signature.")
+        try:
+            stale = abs(time.time() - int(timestamp)) > self.max_age
+            valid = self._verifier.verify_signature(body.decode("utf-8"), signature, timestamp)
+        except Exception:
+            valid = False
+        if not valid:
+            raise WebhookSignatureError("Invalid event webhook signature.")
+        if stale:
+            raise WebhookSignatureError("Event webhook signature has expired.")
+
+    async def ingest(self, chunks: AsyncIterable[bytes]) -> Dict[str, int]:
+        """
+        Records the events of one webhook body. Returns how many were received, recorded, dropped as
+        duplicates and ignored (not an event object). Raises JSONStreamError for a malformed body
+        (or whatever error cut the stream short); the events before the error are recorded all the
+        same, and are dropped as duplicates when SendGrid retries.
+        """
+        counts = {"received": 0, "recorded": 0, "duplicates": 0, "ignored": 0}
+        batch: List[Dict[str, Any]] = []
+        try:
+            async for event in iter_json_array(chunks):
+                counts["received"] += 1
+                event_id = event.get("sg_event_id") if isinstance(event, dict) else None
+                if not event_id or not event.get("event"):
+                    counts["ignored"] += 1
+                    continue
+                if self._is_duplicate(event_id):
+                    counts["duplicates"] += 1
+                    continue
+                batch.append(self._to_entry(event))
+                if len(batch) >= self.batch_size:
+                    pending, batch = batch, []
+                    counts["recorded"] += await self._record(pending)
+        finally:
+            if batch:
+                counts["recorded"] += await self._record(batch)
+        return counts
+
+    async def _record(self, batch: List[Dict[str, Any]]) -> int:
+        try:
+            await self.analytics_service.record_email_events(batch)
+        except BaseException:
+            # Not recorded, so a retry of these events must not be dropped as a duplicate.
+            self._forget(entry["sgEventId"] for entry in batch)
+            raise
+        # A large body is handled batch by batch, letting other requests run in between.
+        await asyncio.sleep(0)
+        return len(batch)
+
+    def _is_duplicate(self, event_id: str) -> bool:
+        # Marked as seen right away, so the same event in a concurrent request is dropped too.
+        if event_id in self._seen or event_id in self._previously_seen:
+            return True
+        self._seen.add(event_id)
+        if len(self._seen) >= self.dedup_window:
+            self._previously_seen, self._seen = self._seen, set()
+        return False
+
+    def _forget(self, event_ids: Iterable[str]) -> None:
+        for event_id in event_ids:
+            self._seen.discard(event_id)
+            self._previously_seen.discard(event_id)
+
+    @staticmethod
+    def _to_entry(event: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            timestamp = datetime.utcfromtimestamp(int(event["timestamp"])).isoformat()
+        except (KeyError, TypeError, ValueError):
+            timestamp = datetime.utcnow().isoformat()
+        entry = {
+            "id": str(uuid.uuid5(_RECORD_ID_NAMESPACE, str(event["sg_event_id"]))),
+            "timestamp": timestamp,
+            "userId": event.get("user_id"), # custom args set on every personalization / message
+            "campaignId": event.get("campaign_id"),
+            "email": event.get("email"),
+            "status": EVENT_STATUSES.get(event["event"], event["event"]),
+            "errorMessage": event.get("reason") or event.get("response"),
+            "sgEventId": event["sg_event_id"],
+            "sgMessageId": event.get("sg_message_id"),
+            "url": event.get("url"),
+        }
+        entry.update(_utm_parameters(event.get("url")))
+        return entry
+
+
+async def _slices(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _utm_parameters(url: Optional[str]) -> Dict[str, str]:
+    """UTM parameters of a clicked link."""
+    if not url:
+        return {}
+    query = parse_qs(urlsplit(url).query)
+    return {attribute: query[parameter][0] for parameter, attribute in _UTM_PARAMETERS.items() if query.get(parameter)}
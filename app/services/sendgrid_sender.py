@@ -0,0 +1,113 @@
+# app/services/sendgrid_sender.py
+"""
+Sends mail through the SendGrid v3 API with bounded concurrency and retries. SendGrid accepts
+up to 1,000 personalizations (recipients, each with its own substitutions) per request, so a
+campaign is a handful of calls; at most `max_concurrency` of them are in flight at once.
+
+A 429 pauses every sender until the rate-limit window resets (Retry-After / X-RateLimit-Reset);
+5xx responses and network errors are retried with jittered exponential backoff. Other 4xx
+responses (bad request, auth) are not retried.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping, Optional
+from python_http_client.exceptions import HTTPError
+from sendgrid.helpers.mail import Mail
+from app.core.config import settings
+
+# Hard limit of the v3 mail/send API.
+MAX_PERSONALIZATIONS_PER_REQUEST = 1000
+
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+TOO_MANY_REQUESTS = 429
+
+
+@dataclass
+class SendResult:
+    success: bool
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+
+class SendGridSender:
+    def __init__(
+        self,
+        client: Any,
+        max_concurrency: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.client = client
+        self.max_attempts = max(1, max_attempts or settings.SENDGRID_MAX_ATTEMPTS)
+        self.base_delay = base_delay if base_delay is not None else settings.SENDGRID_RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else settings.SENDGRID_MAX_RETRY_DELAY
+        self.clock = clock
+        self._semaphore = asyncio.Semaphore(max_concurrency or settings.SENDGRID_MAX_CONCURRENT_REQUESTS)
+        self._resume_at = 0.0 # wall-clock time before which no request is sent (after a 429)
+
+    async def send(self, message: Mail) -> SendResult:
+        attempt = 0
+        while True:
+            attempt += 1
+            async with self._semaphore:
+                await self._wait_for_rate_limit()
+                try:
+                    response = await asyncio.to_thread(self.client.send, message)
+                except HTTPError as e:
+                    status_code, error, headers = e.status_code, _error_text(e.body), e.headers
+                except OSError as e: # connection errors and timeouts (urllib.error.URLError is an OSError)
+                    status_code, error, headers = None, str(e), None
+                else:
+                    if 200 <= response.status_code < 300:
+                        return SendResult(True, response.status_code, attempts=attempt)
+                    status_code, error, headers = response.status_code, _error_text(response.body), response.headers
+
+            if status_code == TOO_MANY_REQUESTS:
+                delay = self._rate_limit_delay(headers, attempt)
+                self._resume_at = max(self._resume_at, self.clock() + delay)
+            elif status_code is None or status_code in RETRYABLE_STATUS_CODES:
+                delay = self._backoff(attempt)
+            else:
+                return SendResult(False, status_code, error, attempt)
+
+            if attempt >= self.max_attempts:
+                return SendResult(False, status_code, error, attempt)
+            await asyncio.sleep(delay)
+
+    async def _wait_for_rate_limit(self) -> None:
+        delay = self._resume_at - self.clock()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: a random delay up to the exponential cap spreads out concurrent retries.
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _rate_limit_delay(self, headers: Optional[Mapping[str, str]], attempt: int) -> float:
+        headers = headers or {}
+        retry_after = _header_float(headers, 'Retry-After')
+        if retry_after is not None:
+            return min(self.max_delay, max(0.0, retry_after))
+        reset_at = _header_float(headers, 'X-RateLimit-Reset') # epoch seconds
+        if reset_at is not None:
+            return min(self.max_delay, max(0.0, reset_at - self.clock()))
+        return self._backoff(attempt)
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _error_text(body: Any) -> str:
+    return body.decode('utf-8', 'replace') if isinstance(body, bytes) else str(body)
@@ -0,0 +1,100 @@
+# app/services/templates.py
+"""
+Named email templates: `<EMAIL_TEMPLATE_DIR>/<name>.html` files with `{{ field }}` placeholders
+(HTML-escaped) and `{{ field | safe }}` (inserted as is). A template is parsed once into literal
+segments and field slots and cached under its name and version (the file's mtime), so editing a
+file takes effect on the next send without a restart.
+"""
+import html
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+DEFAULT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "email")
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*(\|\s*safe\s*)?\}\}")
+_TEMPLATE_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class TemplateNotFoundError(LookupError):
+    pass
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """
+    `literals` has one more entry than `slots`; rendering interleaves them, so a render is a
+    single join with no re-parsing.
+    """
+    name: str
+    version: int
+    literals: Tuple[str, ...]
+    slots: Tuple[Tuple[str, bool], ...] # (field, raw)
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(field for field, _ in self.slots))
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """Fills every slot; fields missing from `values` render as an empty string."""
+        parts = [self.literals[0]]
+        for (field, raw), literal in zip(self.slots, self.literals[1:]):
+            parts.append(_format(values.get(field, ""), raw))
+            parts.append(literal)
+        return "".join(parts)
+
+    def bind(self, values: Mapping[str, Any]) -> "CompiledTemplate":
+        """
+        Fills only the slots whose field is in `values` and returns the template of what is left,
+        e.g. a campaign's template with everything but the recipient fields rendered once.
+        """
+        literals = [self.literals[0]]
+        slots = []
+        for (field, raw), literal in zip(self.slots, self.literals[1:]):
+            if field in values:
+                literals[-1] += _format(values[field], raw) + literal
+            else:
+                slots.append((field, raw))
+                literals.append(literal)
+        return CompiledTemplate(self.name, self.version, tuple(literals), tuple(slots))
+
+
+def compile_template(source: str, name: str = "<string>", version: int = 0) -> CompiledTemplate:
+    literals, slots, position = [], [], 0
+    for match in _PLACEHOLDER.finditer(source):
+        literals.append(source[position:match.start()])
+        slots.append((match.group(1), match.group(2) is not None))
+        position = match.end()
+    literals.append(source[position:])
+    return CompiledTemplate(name, version, tuple(literals), tuple(slots))
+
+
+def _format(value: Any, raw: bool) -> str:
+    text = "" if value is None else str(value)
+    return text if raw else html.escape(text)
+
+
+class TemplateRegistry:
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or DEFAULT_TEMPLATE_DIR
+        self._compiled: Dict[str, CompiledTemplate] = {}
+
+    def get(self, name: str) -> CompiledTemplate:
+        """
+        The compiled template `name`, recompiled only when its file changed since the last call.
+        Raises TemplateNotFoundError for unknown (or malformed) names.
+        """
+        if not _TEMPLATE_NAME.match(name):
+            raise TemplateNotFoundError(name)
+        path = os.path.join(self.directory, f"{name}.html")
+        try:
+            version = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            raise TemplateNotFoundError(name)
+        compiled = self._compiled.get(name)
+        if compiled is None or compiled.version != version:
+            with open(path, encoding="utf-8") as f:
+                compiled = compile_template(f.read(), name, version)
+            self._compiled[name] = compiled
+        return compiled
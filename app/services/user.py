@@ -1,11 +1,20 @@
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Set, Tuple
 from app.repositories.user import UserRepository
 from app.repositories.user_event import UserEventRepository
 from app.apis.v1.schemas.user import UserCreate, UserUpdate, UserFilter, PaginatedUsersResponse
-from app.models.user import User
+from app.apis.v1.schemas.common import BulkItemResult, BulkCreateResponse
+from app.models.user import Recipient, User
+from app.models.event import Event
+from app.database.dataloader import DataLoader
 from app.core.exceptions import NotFoundException, BadRequestException
+from app.core.pagination import decode_cursor, encode_cursor, make_scope
+from pydantic import ValidationError
+import asyncio
 import math
 
+# Concurrent EmailIndex lookups issued while checking a bulk import for existing users.
+MAX_CONCURRENT_EXISTENCE_CHECKS = 16
+
 class UserService:
     def __init__(self, user_repo: UserRepository, user_event_repo: UserEventRepository):
         self.user_repo = user_repo
@@ -19,10 +28,79 @@ class UserService:
         created_user = await self.user_repo.create(user_dict)
         return User(**created_user)
 
+    async def bulk_create_users(
+        self,
+        rows: List[Dict[str, Any]],
+        start_index: int = 0,
+        seen_keys: Optional[Set[str]] = None
+    ) -> BulkCreateResponse:
+        """
+        Validates each row against UserCreate, drops emails repeated within the batch (or in
+        `seen_keys`, carried across the chunks of one upload) or already registered, and writes
+        the rest with BatchWriteItem. Reports a result per row.
+        """
+        seen_keys = set() if seen_keys is None else seen_keys
+        results: Dict[int, BulkItemResult] = {}
+        # Emails are matched exactly, as by create_user and the EmailIndex lookup.
+        candidates: Dict[str, tuple] = {} # email -> (index, UserCreate)
+        for offset, row in enumerate(rows):
+            index = start_index + offset
+            try:
+                if "__error__" in row:
+                    raise ValueError(row["__error__"])
+                user_create = UserCreate(**row)
+            except (ValidationError, ValueError, TypeError) as e:
+                results[index] = BulkItemResult(index=index, status="invalid", error=str(e))
+                continue
+            if user_create.email in seen_keys:
+                results[index] = BulkItemResult(index=index, status="duplicate", error=f"Email '{user_create.email}' is repeated in this batch.")
+                continue
+            seen_keys.add(user_create.email)
+            candidates[user_create.email] = (index, user_create)
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXISTENCE_CHECKS)
+
+        async def find_existing(user_create: UserCreate):
+            async with semaphore:
+                return await self.user_repo.get_by_email(user_create.email)
+
+        existing = await asyncio.gather(*(find_existing(user_create) for _, user_create in candidates.values()))
+        to_create = []
+        for (index, user_create), existing_user in zip(candidates.values(), existing):
+            if existing_user:
+                results[index] = BulkItemResult(index=index, status="exists", id=existing_user['id'],
+                                                error=f"User with email '{user_create.email}' already exists.")
+            else:
+                to_create.append((index, User(**user_create.model_dump())))
+
+        created, failed_ids = await self.user_repo.bulk_create([user.model_dump() for _, user in to_create])
+        failed_ids = set(failed_ids)
+        for index, user in to_create:
+            if user.id in failed_ids:
+                results[index] = BulkItemResult(index=index, status="failed", id=user.id, error="Write was not processed.")
+            else:
+                results[index] = BulkItemResult(index=index, status="created", id=user.id)
+
+        return BulkCreateResponse(
+            created_count=len(created),
+            failed_count=len(results) - len(created),
+            results=[results[index] for index in sorted(results)]
+        )
+
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
         user_data = await self.user_repo.get_by_id(user_id)
         return User(**user_data) if user_data else None
 
+    async def get_user_events(self, user_id: str, events: DataLoader, role: Optional[str] = None) -> Optional[List[Event]]:
+        """
+        Returns the events a user hosts or participates in (None if the user does not exist).
+        """
+        if not await self.get_user_by_id(user_id):
+            return None
+        registrations = await self.user_event_repo.get_events_for_user(user_id, role=role)
+        event_items = await events.load_many([registration['eventId'] for registration in registrations])
+        return [Event(**item) for item in event_items if item]
+
     async def update_user(self, user_id: str, user_update: UserUpdate) -> Optional[User]:
         updates = user_update.model_dump(exclude_unset=True)
         if not updates:
@@ -34,6 +112,39 @@ class UserService:
     async def delete_user(self, user_id: str) -> bool:
         return await self.user_repo.delete(user_id)
 
+    async def list_users(self, filters: UserFilter, page_size: int = 10, cursor: Optional[str] = None) -> PaginatedUsersResponse:
+        """
+        Cursor-paginated listing: reads only one page of matches per call, in index order.
+        Pass the returned `next_cursor` back to fetch the following page.
+        """
+        criteria, count_ranges = self._filter_arguments(filters)
+        scope = make_scope("users", filters.model_dump())
+        users_data, last_key = await self.user_repo.find_page(
+            criteria, count_ranges, limit=page_size, exclusive_start_key=decode_cursor(cursor, scope)
+        )
+        return PaginatedUsersResponse(
+            items=[User(**data) for data in users_data],
+            page_size=page_size,
+            next_cursor=encode_cursor(last_key, scope)
+        )
+
+    async def iter_recipients(
+        self,
+        filters: UserFilter,
+        page_size: int,
+        exclusive_start_key: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Tuple[List[Recipient], Optional[Dict[str, Any]]]]:
+        """
+        Streams the users matching `filters` as email recipients, page by page, each page with the
+        raw LastEvaluatedKey to resume after it (None after the last page). Only the recipient
+        attributes are read, and memory use does not depend on the size of the audience.
+        """
+        criteria, count_ranges = self._filter_arguments(filters)
+        async for items, last_key in self.user_repo.iter_pages(
+            criteria, count_ranges, page_size, exclusive_start_key, projection=list(Recipient._fields)
+        ):
+            yield [Recipient(item['id'], item['email'], item.get('firstName', '')) for item in items], last_key
+
     async def filter_users(
         self,
         filters: UserFilter,
@@ -42,56 +153,10 @@ class UserService:
         sort_by: Optional[str] = None,
         sort_order: str = "asc"
     ) -> PaginatedUsersResponse:
-        # Step 1: Get all users (this is a full table scan from user_repo.query())
-        all_users_data = await self.user_repo.query() # Remember: This is a SCAN operation
-
-        # Initialize the list to be filtered
-        current_filtered_users = all_users_data
-
-        if filters.email is not None:
-            target_email_lower = filters.email.lower()
-            current_filtered_users = [
-                user_data for user_data in current_filtered_users
-                if user_data.get('email', '').lower() == target_email_lower
-            ]
-
-        if filters.city is not None:
-            target_city_lower = filters.city.lower()
-            current_filtered_users = [
-                user_data for user_data in current_filtered_users
-                if user_data.get('city', '').lower() == target_city_lower
-            ]
-
-        if filters.company is not None:
-            company = filters.company.lower()
-            current_filtered_users = [
-                user_data for user_data in current_filtered_users
-                if user_data.get('company', '').lower() == company
-            ]
-
-        final_filtered_users = []
-        for user_data in current_filtered_users: # Iterate over the potentially pre-filtered list
-            user_id = user_data.get('id')
-            hosted_events = await self.user_event_repo.get_events_for_user(user_id, role="host")
-            attended_events = await self.user_event_repo.get_events_for_user(user_id, role="participant")
-
-            hosted_count = len(hosted_events)
-            attended_count = len(attended_events)
-
-            match_hosted = True
-            if filters.min_events_hosted is not None and hosted_count < filters.min_events_hosted:
-                match_hosted = False
-            if filters.max_events_hosted is not None and hosted_count > filters.max_events_hosted:
-                match_hosted = False
-
-            match_attended = True
-            if filters.min_events_attended is not None and attended_count < filters.min_events_attended:
-                match_attended = False
-            if filters.max_events_attended is not None and attended_count > filters.max_events_attended:
-                match_attended = False
-
-            if match_hosted and match_attended:
-                final_filtered_users.append(user_data) # Use a new list to avoid modifying in place incorrectly
+        # Step 1: Resolve the attribute filters through the best matching GSI (scan only as a fallback).
+        # Event-count ranges are evaluated server-side against the counters kept on the user item.
+        criteria, count_ranges = self._filter_arguments(filters)
+        final_filtered_users = await self.user_repo.find_by_attributes(criteria, count_ranges)
 
         # Step 4: Apply sorting
         if sort_by:
@@ -111,4 +176,19 @@ class UserService:
             total_count=total_count,
             page=page,
             page_size=page_size
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def _filter_arguments(filters: UserFilter):
+        criteria = {
+            'email': filters.email,
+            'company': filters.company,
+            'jobTitle': filters.jobTitle,
+            'city': filters.city,
+            'state': filters.state,
+        }
+        count_ranges = {
+            'hostedCount': (filters.min_events_hosted, filters.max_events_hosted),
+            'attendedCount': (filters.min_events_attended, filters.max_events_attended),
+        }
+        return {attribute: value for attribute, value in criteria.items() if value is not None}, count_ranges
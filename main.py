@@ -1,17 +1,35 @@
 # main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.core.config import settings
-from app.apis.v1.endpoints import user, email, event
+from app.apis.dependencies import init_dependencies
+from app.apis.v1.endpoints import user, email, event, metrics, analytics
 import uvicorn
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_dependencies(app)
+    app.state.analytics_service.start()
+    app.state.engagement_service.start()
+    # Resumes unfinished email campaigns, and hands running ones back on shutdown.
+    await app.state.email_job_service.start()
+    yield
+    await app.state.email_job_service.stop()
+    await app.state.engagement_service.stop()
+    # Last, so the records of the jobs stopped above are written too.
+    await app.state.analytics_service.close()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 app.include_router(user.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
 app.include_router(event.router, prefix=f"{settings.API_V1_STR}/events", tags=["events"])
 app.include_router(email.router, prefix=f"{settings.API_V1_STR}/emails", tags=["emails"])
+app.include_router(analytics.router, prefix=f"{settings.API_V1_STR}/analytics", tags=["analytics"])
+app.include_router(metrics.router, prefix=f"{settings.API_V1_STR}/metrics", tags=["metrics"])
 
 @app.get("/")
 async def root():